@@ -0,0 +1,126 @@
+"""
+Benchmark for the MICE imputation settings.
+
+Compares the time and the peak memory of imputing a synthetic wide frame with
+the former clean_data call (whole frame converted with ``df.to_numpy()``, all
+iterations kept) and with the settings of the ``imputation`` section of the
+data transformation config. Every setting runs in a fresh process, so the peak
+resident memory of one setting does not hide the one of the next.
+
+Usage:
+    python -m benchmarks.benchmark_imputation --rows 1000 --cols 50 --nan-cols 3
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+import miceforest as mf
+import numpy as np
+import pandas as pd
+
+from src.components.imputer import create_imputer
+
+SETTINGS = {
+    "former": None,
+    "all_iterations": {"method": "mice", "save_all_iterations": True},
+    "last_iteration": {"method": "mice"},
+    "2_workers": {"method": "mice", "workers": 2},
+    "2_iterations": {"method": "mice", "iterations": 2},
+    "all_columns_2_it": {"method": "mice", "iterations": 2, "nan_columns_only": False},
+    "median": {"method": "median"},
+}
+
+
+def create_data(rows, cols, nan_cols) -> pd.DataFrame:
+    """
+    Creates a synthetic wide frame with NaN values in some columns and an integer
+    column, so that the frame has mixed dtypes like the sensor data.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of float columns.
+        nan_cols (int): Number of columns with NaN values.
+
+    Returns:
+        pd.DataFrame: A synthetic DataFrame with random data.
+    """
+    rng = np.random.default_rng(42)
+    base = rng.normal(size=(rows, 1))
+    data = pd.DataFrame(
+        base + rng.normal(scale=0.5, size=(rows, cols)),
+        columns=[f"sensor_{i}" for i in range(cols)],
+    )
+    data["Temperatur (°C)"] = rng.integers(20, 90, size=rows)
+    for column in data.columns[:nan_cols]:
+        data.loc[rng.random(rows) < 0.05, column] = np.nan
+    return data
+
+
+def impute(data, setting):
+    """
+    Imputes the data with a benchmark setting.
+
+    Args:
+        data (pd.DataFrame): The data to be imputed.
+        setting (dict): The imputation config, None for the former clean_data call.
+
+    Returns:
+        pd.DataFrame: The imputed data.
+    """
+    if setting is None:
+        kds = mf.ImputationKernel(
+            data.to_numpy(), save_all_iterations=True, random_state=42
+        )
+        kds.mice(10)
+        return pd.DataFrame(kds.complete_data(), columns=data.columns)
+    return create_imputer(setting).fit_transform(data)
+
+
+def run_setting(args, name, results):
+    """
+    Runs a benchmark setting and stores its time and peak memory.
+
+    Args:
+        args (argparse.Namespace): The benchmark arguments.
+        name (str): The name of the setting.
+        results (dict): Shared dictionary the results are stored in.
+    """
+    data = create_data(args.rows, args.cols, args.nan_cols)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    imputed = impute(data, SETTINGS[name])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    assert not imputed.isna().any().any()
+    results[name] = (elapsed, peak / 2**20, rss / 2**10)
+
+
+def main():
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--nan-cols", type=int, default=3)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    print(f"Imputing {args.rows} rows x {args.cols + 1} columns")
+    print(f"{'setting':>17} {'time':>9} {'traced peak':>13} {'rss growth':>12}")
+    for name in SETTINGS:
+        process = context.Process(target=run_setting, args=(args, name, results))
+        process.start()
+        process.join()
+        elapsed, traced_peak, rss = results[name]
+        print(f"{name:>17} {elapsed:7.2f} s {traced_peak:9.1f} MiB {rss:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
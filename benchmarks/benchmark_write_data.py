@@ -0,0 +1,87 @@
+"""
+Benchmark for writing prediction results to Postgres.
+
+Compares DataIngestion.write_data (DataFrame.to_sql INSERTs) with
+DataIngestion.bulk_write_data (COPY FROM STDIN) on a synthetic wide frame.
+The database is taken from the DB_* environment variables, so it should point
+to a local stand-in, e.g. a throwaway PostgreSQL docker container.
+
+Usage:
+    python -m benchmarks.benchmark_write_data --rows 100000 --cols 100
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.components.data_ingestion import DataIngestion
+
+
+def create_data(rows, cols) -> pd.DataFrame:
+    """
+    Creates a synthetic frame shaped like the prediction results.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of float columns.
+
+    Returns:
+        pd.DataFrame: A synthetic DataFrame with random data.
+    """
+    rng = np.random.default_rng(42)
+    data = pd.DataFrame(
+        rng.normal(size=(rows, cols)), columns=[f"sensor_{i}" for i in range(cols)]
+    )
+    data.iloc[::10, 0] = np.nan
+    return data
+
+
+def time_write(write, data, table_name) -> float:
+    """
+    Times a single write of the data into an emptied table.
+
+    Args:
+        write (callable): The write method to benchmark.
+        data (pd.DataFrame): The data to write.
+        table_name (str): The name of the table to write data to.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    data_ingestion = DataIngestion()
+    data_ingestion.bulk_write_data(data.head(0), table_name, replace=True)
+    start = time.perf_counter()
+    write(data, table_name)
+    elapsed = time.perf_counter() - start
+    data_ingestion.delete_data(table_name)
+    return elapsed
+
+
+def main():
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--cols", type=int, default=100)
+    args = parser.parse_args()
+
+    data = create_data(args.rows, args.cols)
+    data_ingestion = DataIngestion()
+    writers = {
+        "to_sql": data_ingestion.write_data,
+        "copy": data_ingestion.bulk_write_data,
+        "copy_replace": lambda data, table: data_ingestion.bulk_write_data(
+            data, table, replace=True
+        ),
+    }
+
+    print(f"Writing {args.rows} rows x {args.cols} columns")
+    for name, write in writers.items():
+        elapsed = time_write(write, data, "benchmark_write_data")
+        print(f"{name:>12}: {elapsed:8.2f} s  {args.rows / elapsed:12.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
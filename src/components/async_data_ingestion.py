@@ -0,0 +1,117 @@
+"""
+Async Data Ingestion Module.
+
+This module provides an asyncio interface to the DataIngestion component, so
+that the I/O bound reads and writes of a pipeline can overlap.
+
+Example:
+    from src.components.async_data_ingestion import AsyncDataIngestion
+
+    async def load():
+        ingestion = AsyncDataIngestion()
+        return await asyncio.gather(
+            ingestion.initiate_data_ingestion(),
+            ingestion.get_sql_table("predict_data"),
+        )
+"""
+import asyncio
+from typing import List
+
+import pandas as pd
+
+from src.components.data_ingestion import DataIngestion
+
+
+class AsyncDataIngestion:
+    """
+    Async data ingestion class.
+
+    Every call runs the matching DataIngestion method in a worker thread.
+    The database calls check out their own connection from the shared pool
+    and psycopg2 releases the GIL while waiting on the server, so awaited
+    calls run concurrently.
+
+    Attributes:
+        data_ingestion (DataIngestion): The wrapped synchronous component.
+    """
+
+    def __init__(self):
+        """
+        Initialize the AsyncDataIngestion instance.
+        """
+        self.data_ingestion = DataIngestion()
+
+    async def initiate_data_ingestion(self, columns=None) -> pd.DataFrame:
+        """
+        Read the training data, see ``DataIngestion.initiate_data_ingestion``.
+
+        Args:
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the ingested data.
+        """
+        return await asyncio.to_thread(
+            self.data_ingestion.initiate_data_ingestion, columns
+        )
+
+    async def get_data_columns(self) -> List[str]:
+        """
+        Get the column names of the training data, see
+        ``DataIngestion.get_data_columns``.
+
+        Returns:
+            List[str]: The column names of the training data.
+        """
+        return await asyncio.to_thread(self.data_ingestion.get_data_columns)
+
+    async def get_sql_table(self, table_name, columns=None, filters=None):
+        """
+        Read a table, see ``DataIngestion.get_sql_table``.
+
+        Args:
+            table_name (str): The name of the table
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters as
+                ``(column, operator, value)`` triples.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the ingested data.
+        """
+        return await asyncio.to_thread(
+            self.data_ingestion.get_sql_table, table_name, columns, filters
+        )
+
+    async def write_data(self, data, table_name):
+        """
+        Append data to a table, see ``DataIngestion.write_data``.
+
+        Args:
+            data (pandas.DataFrame): The data to write.
+            table_name (str): The name of the table to write data to.
+        """
+        await asyncio.to_thread(self.data_ingestion.write_data, data, table_name)
+
+    async def bulk_write_data(self, data, table_name, batch_size=None, replace=False):
+        """
+        Write data to a table with COPY, see ``DataIngestion.bulk_write_data``.
+
+        Args:
+            data (pandas.DataFrame): The data to write.
+            table_name (str): The name of the table to write data to.
+            batch_size (int, optional): Number of rows per COPY batch.
+            replace (bool): Whether the table content is replaced.
+        """
+        await asyncio.to_thread(
+            self.data_ingestion.bulk_write_data, data, table_name, batch_size, replace
+        )
+
+    async def delete_data(self, table_name, filters=None):
+        """
+        Delete data from a table, see ``DataIngestion.delete_data``.
+
+        Args:
+            table_name (str): The name of the table
+            filters (List[tuple], optional): Row filters. Defaults to all rows.
+        """
+        await asyncio.to_thread(self.data_ingestion.delete_data, table_name, filters)
@@ -0,0 +1,216 @@
+"""
+Connection Manager Module.
+
+This module provides a process-wide pool of Postgres connections shared by all
+DataIngestion instances, together with checkout-latency and saturation stats.
+
+Example:
+    from src.components.connection_manager import get_connection_manager
+
+    with get_connection_manager().connection() as connection:
+        ...
+    print(get_connection_manager().get_stats())
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.errors.data_ingestion_errors import PostgreSQLConnectionError
+from src.logger import logging
+from src.utility import get_cfg
+
+
+@dataclass
+class PoolStats:  # pylint: disable=R0902
+    """
+    Snapshot of the connection pool usage.
+    """
+
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checkouts: int
+    avg_checkout_ms: float
+    max_checkout_ms: float
+    saturation: float
+    peak_saturation: float
+
+
+class ConnectionManager:  # pylint: disable=R0902
+    """
+    Pooled connection manager for the Postgres database.
+
+    The connection details are read once from the DB_* environment variables.
+    Connections are handed out from a SQLAlchemy QueuePool and returned to it
+    instead of being closed.
+
+    Attributes:
+        pool_config (dict): The configuration settings for the connection pool.
+        engine (sqlalchemy.engine.Engine): The pooled engine.
+        pid (int): The id of the process the pool was created in.
+    """
+
+    def __init__(self, pool_config):
+        """
+        Initialize the ConnectionManager instance.
+
+        Args:
+            pool_config (dict): Pool settings (pool_size, max_overflow,
+                pool_pre_ping, pool_recycle, pool_timeout).
+        """
+        self.pool_config = pool_config
+        url = URL.create(
+            "postgresql+psycopg2",
+            username=os.environ.get("DB_USERNAME"),
+            password=os.environ.get("DB_PASSWORD"),
+            host=os.environ.get("DB_HOSTNAME"),
+            database=os.environ.get("DB_NAME"),
+        )
+        self.engine = create_engine(
+            url,
+            pool_size=pool_config["pool_size"],
+            max_overflow=pool_config["max_overflow"],
+            pool_pre_ping=pool_config["pool_pre_ping"],
+            pool_recycle=pool_config["pool_recycle"],
+            pool_timeout=pool_config["pool_timeout"],
+        )
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._total_checkout_time = 0.0
+        self._max_checkout_time = 0.0
+        self._peak_checked_out = 0
+        event.listen(self.engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, *_):
+        """
+        Record the peak number of simultaneously checked out connections.
+        """
+        checked_out = self.engine.pool.checkedout()
+        with self._lock:
+            self._peak_checked_out = max(self._peak_checked_out, checked_out)
+
+    def _record_checkout(self, elapsed):
+        """
+        Record the latency of a single checkout.
+
+        Args:
+            elapsed (float): Time in seconds spent waiting for the connection.
+        """
+        with self._lock:
+            self._checkouts += 1
+            self._total_checkout_time += elapsed
+            self._max_checkout_time = max(self._max_checkout_time, elapsed)
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a raw psycopg2 connection from the pool.
+
+        The connection is returned to the pool (and rolled back) on exit,
+        so callers have to commit their own changes.
+
+        Yields:
+            A DBAPI connection proxied by the pool.
+        """
+        start = time.perf_counter()
+        try:
+            connection = self.engine.raw_connection()
+        except SQLAlchemyError as e:
+            logging.error("Error connecting to PostgreSQL: %s", e)
+            raise PostgreSQLConnectionError from e
+        self._record_checkout(time.perf_counter() - start)
+
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def begin(self):
+        """
+        Check out a SQLAlchemy connection with an open transaction.
+
+        The transaction is committed on exit, or rolled back if an error occurred.
+
+        Yields:
+            sqlalchemy.engine.Connection: A pooled SQLAlchemy connection.
+        """
+        start = time.perf_counter()
+        try:
+            connection = self.engine.connect()
+        except SQLAlchemyError as e:
+            logging.error("Error connecting to PostgreSQL: %s", e)
+            raise PostgreSQLConnectionError from e
+        self._record_checkout(time.perf_counter() - start)
+
+        try:
+            with connection.begin():
+                yield connection
+        finally:
+            connection.close()
+
+    def get_stats(self) -> PoolStats:
+        """
+        Get the usage statistics of the pool.
+
+        Saturation is the share of the pool capacity (pool_size + max_overflow)
+        that is checked out.
+
+        Returns:
+            PoolStats: A snapshot of the pool statistics.
+        """
+        pool_size = self.pool_config["pool_size"]
+        max_overflow = self.pool_config["max_overflow"]
+        capacity = pool_size + max_overflow
+        checked_out = self.engine.pool.checkedout()
+
+        with self._lock:
+            checkouts = self._checkouts
+            avg_checkout = self._total_checkout_time / checkouts if checkouts else 0.0
+            return PoolStats(
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                checked_out=checked_out,
+                checkouts=checkouts,
+                avg_checkout_ms=avg_checkout * 1000,
+                max_checkout_ms=self._max_checkout_time * 1000,
+                saturation=checked_out / capacity,
+                peak_saturation=self._peak_checked_out / capacity,
+            )
+
+    def dispose(self):
+        """
+        Close all pooled connections.
+        """
+        self.engine.dispose()
+
+
+_MANAGER = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_connection_manager() -> ConnectionManager:
+    """
+    Get the process-wide connection manager.
+
+    The manager is created on first use from the ``connection_pool`` section of
+    the data ingestion config. A new pool is created after a fork, since pooled
+    connections must not be shared between processes.
+
+    Returns:
+        ConnectionManager: The shared connection manager.
+    """
+    global _MANAGER  # pylint: disable=W0603
+    with _MANAGER_LOCK:
+        if _MANAGER is None or _MANAGER.pid != os.getpid():
+            pool_config = get_cfg("components/data_ingestion.yaml")["connection_pool"]
+            _MANAGER = ConnectionManager(pool_config)
+        return _MANAGER
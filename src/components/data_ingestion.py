@@ -3,22 +3,43 @@ Data Ingestion Module.
 
 This module provides a class with a method for data ingestion tasks
 """
+import glob
+import hashlib
+import io
+import json
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
 import psycopg2
-from sqlalchemy import create_engine
-
+from psycopg2 import sql
+from pyarrow import ArrowException
+from pyarrow import parquet as pq
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.components.connection_manager import get_connection_manager
+from src.components.duplicate_detector import hash_rows
+from src.components.sql_queries import build_select, build_where, fetch_data
+from src.components.watermark_store import (
+    WatermarkStore,
+    from_watermark,
+    to_watermark,
+)
 from src.errors.data_ingestion_errors import (
     DeletionError,
     MultipleFilesError,
-    PostgreSQLConnectionError,
     ReadingError,
     UnsupportedFileTypeError,
     WritingError,
 )
 from src.logger import logging
-from src.utility import get_cfg, get_root
+from src.utility import get_cfg, get_root, prune_cache
 
 
 class DataIngestion:
@@ -40,52 +61,476 @@ class DataIngestion:
         """
         self.ingestion_config = get_cfg("components/data_ingestion.yaml")
 
-    def _get_supported_file(self) -> str:
+    def _get_supported_files(self) -> List[str]:
         """
-        Retrieve the supported training data file from the specified directory.
+        Retrieve all supported training data files from the specified directory.
 
-        This method checks the training data folder for files with supported extensions
-        (xls, xlsx, csv) and returns the matching file.
+        If ``multiple_files`` is set in the config, the training data folder is
+        searched recursively, so partitioned datasets (e.g.
+        ``campaign=2024/part-0.parquet``) are found as well. Otherwise only the
+        files directly in the folder are returned. Entries starting with "." or
+        "_" are skipped.
         If no supported files are found, an `UnsupportedFileTypeError` is raised.
-        If more than one supported file is found, a `MultipleFilesError` is raised.
 
         Returns:
-            str: Path to the supported training data file
+            List[str]: Sorted paths to the supported training data files
         """
         dir_path = os.path.join(
             get_root(), self.ingestion_config["training_data_folder_path"]
         )
 
-        file_list = os.listdir(dir_path)
-
-        supported_file_types = ["xls", "xlsx", "csv"]
+        supported_file_types = ["xls", "xlsx", "csv", "parquet"]
 
         supported_files = []
 
-        for file_name in file_list:
-            file_extension = file_name.split(".")[-1]
-            if file_extension in supported_file_types:
-                supported_files.append(os.path.join(dir_path, file_name))
+        for root, dir_list, file_list in os.walk(dir_path):
+            # Hidden and metadata entries (.cache, _SUCCESS, ...) are not data files
+            dir_list[:] = [name for name in dir_list if not name.startswith((".", "_"))]
+            if not self.ingestion_config["multiple_files"]:
+                dir_list.clear()
+            for file_name in file_list:
+                if file_name.startswith((".", "_")):
+                    continue
+                file_extension = file_name.split(".")[-1]
+                if file_extension in supported_file_types:
+                    supported_files.append(os.path.join(root, file_name))
 
         if not supported_files:
             logging.error("No supported files found in the training data folder")
             raise UnsupportedFileTypeError(dir_path)
 
+        return sorted(supported_files)
+
+    def _get_supported_file(self) -> str:
+        """
+        Retrieve the supported training data file from the specified directory.
+
+        This method checks the training data folder for files with supported extensions
+        (xls, xlsx, csv, parquet) and returns the matching file.
+        If no supported files are found, an `UnsupportedFileTypeError` is raised.
+        If more than one supported file is found, a `MultipleFilesError` is raised.
+
+        Returns:
+            str: Path to the supported training data file
+        """
+        supported_files = self._get_supported_files()
+
         if len(supported_files) > 1:
             logging.error(
-                "Only one file of supported format (xlsx, xls, csv) "
+                "Only one file of supported format (xlsx, xls, csv, parquet) "
                 "should exist in the training data folder"
             )
             raise MultipleFilesError
 
         return supported_files[0]
 
-    def initiate_data_ingestion(self) -> pd.DataFrame:
+    def _get_partition_values(self, file_path) -> dict:
+        """
+        Parse the hive-style partition values (``key=value`` folders) of a file.
+
+        Args:
+            file_path (str): Path to the training data file
+
+        Returns:
+            dict: The partition values by partition column.
+        """
+        dir_path = os.path.join(
+            get_root(), self.ingestion_config["training_data_folder_path"]
+        )
+        folders = os.path.relpath(os.path.dirname(file_path), dir_path).split(os.sep)
+        return dict(folder.split("=", 1) for folder in folders if "=" in folder)
+
+    @staticmethod
+    def _get_file_hash(file_path) -> str:
+        """
+        Compute the content hash of a file.
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: The SHA-256 hex digest of the file content.
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def _get_cache_key(self, file_path) -> str:
+        """
+        Get the cache key of a training data file.
+
+        The key is made of the file name and a hash of its path relative to the
+        training data folder, so same-named files in different folders get
+        different keys.
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: The cache key.
+        """
+        dir_path = os.path.join(
+            get_root(), self.ingestion_config["training_data_folder_path"]
+        )
+        relative_path = os.path.relpath(file_path, dir_path)
+        path_hash = hashlib.sha256(relative_path.encode()).hexdigest()[:16]
+        return f"{os.path.basename(file_path)}-{path_hash}"
+
+    def _get_cached_file_hash(self, file_path) -> str:
+        """
+        Get the content hash of a file, hashing the file only if its size or
+        modification time changed since it was last hashed.
+
+        The hash is kept in a small index file next to the Parquet cache.
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: The SHA-256 hex digest of the file content.
+        """
+        cache_dir = os.path.join(get_root(), self.ingestion_config["cache_folder"])
+        index_path = os.path.join(cache_dir, f"{self._get_cache_key(file_path)}.json")
+        file_stat = os.stat(file_path)
+        stamp = [file_stat.st_size, file_stat.st_mtime_ns]
+
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as file:
+                index = json.load(file)
+            if index["stamp"] == stamp:
+                return index["hash"]
+
+        file_hash = self._get_file_hash(file_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"stamp": stamp, "hash": file_hash}, file)
+        os.replace(tmp_path, index_path)
+        return file_hash
+
+    def _get_cache_path(self, file_path) -> str:
+        """
+        Get the path of the Parquet cache of a file.
+
+        Args:
+            file_path (str): Path to the xls, xlsx or csv file
+
+        Returns:
+            str: The cache path, keyed by the cache key and the content hash.
+        """
+        cache_dir = os.path.join(get_root(), self.ingestion_config["cache_folder"])
+        cache_key = self._get_cache_key(file_path)
+        return os.path.join(
+            cache_dir, f"{cache_key}-{self._get_cached_file_hash(file_path)}.parquet"
+        )
+
+    @staticmethod
+    def _select_columns(data, columns) -> pd.DataFrame:
+        """
+        Select columns from a DataFrame, filling columns it lacks with NaN.
+
+        Args:
+            data (pandas.DataFrame): The DataFrame to select from.
+            columns (List[str], optional): Columns to select. Defaults to all columns.
+
+        Returns:
+            pandas.DataFrame: A DataFrame with the requested columns.
+        """
+        if columns is None:
+            return data
+        if all(column in data for column in columns):
+            return data[columns]
+        return data.reindex(columns=columns)
+
+    def _read_parquet(self, file_path, columns=None) -> pd.DataFrame:
+        """
+        Read a Parquet file memory-mapped, loading only the requested columns.
+
+        Args:
+            file_path (str): Path to the parquet file
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the file content.
+        """
+        if columns is not None:
+            file_columns = pq.read_schema(file_path).names
+            columns = [column for column in columns if column in file_columns]
+        return pd.read_parquet(file_path, columns=columns, memory_map=True)
+
+    def _read_file(self, file_path, columns=None) -> pd.DataFrame:
+        """
+        Read a training data file through the Parquet cache.
+
+        The parsed file is cached as Parquet under its cache key and its content
+        hash, so the cache is invalidated as soon as the file changes.
+        The file is hashed only if its size or modification time changed.
+        Cached files are read memory-mapped and only the requested columns are loaded.
+        Parquet files are read directly, with the values of their partition folders
+        added as columns. Requested columns that the file lacks are filled with NaN.
+
+        Args:
+            file_path (str): Path to the xls, xlsx, csv or parquet file
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the file content.
+        """
+        if file_path.endswith("parquet"):
+            data = self._read_parquet(file_path, columns)
+            for column, value in self._get_partition_values(file_path).items():
+                data[column] = value
+            return self._select_columns(data, columns)
+
+        file_name = os.path.basename(file_path)
+        cache_path = None
+        if self.ingestion_config["use_cache"]:
+            cache_path = self._get_cache_path(file_path)
+            if os.path.exists(cache_path):
+                logging.info("Reading %s from cache", file_name)
+                data = self._read_parquet(cache_path, columns)
+                return self._select_columns(data, columns)
+
+        if file_path.endswith("csv"):
+            data = pd.read_csv(file_path)
+        else:
+            data = pd.read_excel(file_path)
+
+        if cache_path is not None:
+            cache_key = glob.escape(self._get_cache_key(file_path))
+            prune_cache(os.path.dirname(cache_path), f"{cache_key}-*.parquet", 0)
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                data.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, cache_path)
+            except (ValueError, TypeError, ArrowException) as e:
+                logging.warning("Could not cache %s: %s", file_name, e)
+
+        return self._select_columns(data, columns)
+
+    @staticmethod
+    def _read_parquet_columns(file_path) -> List[str]:
+        """
+        Read the column names of a Parquet file from its schema.
+
+        Args:
+            file_path (str): Path to the parquet file
+
+        Returns:
+            List[str]: The column names, without stored index columns.
+        """
+        schema = pq.read_schema(file_path)
+        index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+        return [name for name in schema.names if name not in index_columns]
+
+    def _read_file_columns(self, file_path) -> List[str]:
+        """
+        Read the column names of a training data file without reading its rows.
+
+        Args:
+            file_path (str): Path to the xls, xlsx, csv or parquet file
+
+        Returns:
+            List[str]: The column names of the file.
+        """
+        if file_path.endswith("parquet"):
+            partition_columns = list(self._get_partition_values(file_path))
+            return self._read_parquet_columns(file_path) + partition_columns
+        if self.ingestion_config["use_cache"]:
+            cache_path = self._get_cache_path(file_path)
+            if os.path.exists(cache_path):
+                return self._read_parquet_columns(cache_path)
+            # Parsing the file fills the cache for the following read
+            return self._read_file(file_path).columns.tolist()
+        if file_path.endswith("csv"):
+            return pd.read_csv(file_path, nrows=0).columns.tolist()
+        return pd.read_excel(file_path, nrows=0).columns.tolist()
+
+    def get_data_columns(self) -> List[str]:
+        """
+        Get the column names of the training data, e.g. to resolve the columns
+        to be read by ``initiate_data_ingestion``.
+
+        Returns:
+            List[str]: The column names of all training data files in file order.
+        """
+        if self.ingestion_config["multiple_files"]:
+            file_paths = self._get_supported_files()
+        else:
+            file_paths = [self._get_supported_file()]
+
+        columns = {}
+        for file_path in file_paths:
+            columns.update(dict.fromkeys(self._read_file_columns(file_path)))
+        return list(columns)
+
+    def iter_data_files(self, columns=None) -> Iterator[pd.DataFrame]:
+        """
+        Lazily read every training data file, one DataFrame per file.
+
+        The files are read in parallel by a thread pool of ``max_workers`` threads,
+        with at most ``max_workers`` files read ahead of the consumer. The frames
+        are yielded in file order.
+
+        Args:
+            columns (List[str], optional): Columns to read. Files lacking one of
+                the columns get it filled with NaN. Defaults to all columns of each file.
+
+        Yields:
+            pandas.DataFrame: A DataFrame containing the content of the next file.
+        """
+        supported_files = self._get_supported_files()
+        max_workers = self.ingestion_config["max_workers"]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = deque()
+            for file_path in supported_files:
+                futures.append(executor.submit(self._read_file, file_path, columns))
+                if len(futures) >= max_workers:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+
+    @staticmethod
+    def _reconcile_schemas(frames) -> pd.DataFrame:
+        """
+        Concatenate DataFrames with differing schemas.
+
+        The result has the union of all columns in order of first appearance.
+        A column keeps its dtype if it is the same in all files, numeric dtypes
+        are promoted to a common type, and other conflicts fall back to object.
+
+        Args:
+            frames (List[pandas.DataFrame]): The DataFrames to concatenate.
+
+        Returns:
+            pandas.DataFrame: The concatenated DataFrame.
+        """
+        dtypes = {}
+        for frame in frames:
+            for column, dtype in frame.dtypes.items():
+                dtypes.setdefault(column, []).append(dtype)
+
+        target_dtypes = {}
+        for column, column_dtypes in dtypes.items():
+            if len(column_dtypes) < len(frames) or len(set(column_dtypes)) > 1:
+                if all(pd.api.types.is_numeric_dtype(dtype) for dtype in column_dtypes):
+                    target_dtypes[column] = np.result_type(*column_dtypes, np.float64)
+                else:
+                    target_dtypes[column] = object
+
+        frames = [
+            frame.astype(
+                {
+                    column: dtype
+                    for column, dtype in target_dtypes.items()
+                    if column in frame
+                }
+            )
+            for frame in frames
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _downcast_column(values, float_tolerance, category_max_ratio) -> pd.Series:
+        """
+        Downcast a single column to a smaller dtype.
+
+        Args:
+            values (pandas.Series): The column to downcast.
+            float_tolerance (float): Maximum relative error allowed when casting
+                float64 to float32. 0 only allows lossless casts.
+            category_max_ratio (float): Maximum ratio of unique values to rows
+                for a string column to become categorical.
+
+        Returns:
+            pandas.Series: The downcast column, or the column itself if it is kept.
+        """
+        if values.dtype == np.float64:
+            array = values.to_numpy()
+            downcast = array.astype(np.float32)
+            if float_tolerance:
+                lossless = np.allclose(
+                    downcast, array, rtol=float_tolerance, atol=0, equal_nan=True
+                )
+            else:
+                lossless = np.array_equal(downcast, array, equal_nan=True)
+            if lossless:
+                return values.astype(np.float32)
+
+        elif values.dtype == np.int64 and len(values):
+            int_info = np.iinfo(np.int32)
+            if int_info.min <= values.min() and values.max() <= int_info.max:
+                return values.astype(np.int32)
+
+        elif (
+            values.dtype == object
+            and pd.api.types.infer_dtype(values, skipna=True) == "string"
+            and values.nunique() <= category_max_ratio * len(values)
+        ):
+            return values.astype("category")
+
+        return values
+
+    def downcast_data(self, data) -> pd.DataFrame:
+        """
+        Downcast the columns of ingested data to reduce its memory usage.
+
+        float64 columns become float32 and int64 columns become int32 where this
+        is lossless (or within ``float_tolerance``), low-cardinality string columns
+        become categoricals. The bytes saved are logged per column.
+        Only runs if ``downcast.enabled`` is set in the config.
+
+        Args:
+            data (pandas.DataFrame): The ingested data.
+
+        Returns:
+            pandas.DataFrame: The downcast data.
+        """
+        downcast_config = self.ingestion_config["downcast"]
+        if not downcast_config["enabled"]:
+            return data
+
+        data = data.copy(deep=False)
+        total_saved = 0
+        for position, column in enumerate(data.columns):
+            values = data.iloc[:, position]
+            downcast = self._downcast_column(
+                values,
+                downcast_config["float_tolerance"],
+                downcast_config["category_max_ratio"],
+            )
+            if downcast is values:
+                continue
+
+            saved = values.memory_usage(index=False, deep=True) - downcast.memory_usage(
+                index=False, deep=True
+            )
+            total_saved += saved
+            data.isetitem(position, downcast)
+            logging.info(
+                "Downcast column %s from %s to %s, saved %d bytes",
+                column,
+                values.dtype,
+                downcast.dtype,
+                saved,
+            )
+
+        logging.info("Downcasting saved %d bytes in total", total_saved)
+        return data
+
+    def initiate_data_ingestion(self, columns=None) -> pd.DataFrame:
         """
         Initiate the data ingestion process.
 
         This method triggers the ingestion of data.
-        It returns the pandas dataframe
+        It returns the pandas dataframe. If ``multiple_files`` is set in the config,
+        all files in the training data folder are read in parallel and concatenated.
+
+        Args:
+            columns (List[str], optional): Columns to read. Defaults to all columns.
 
         Returns:
             pandas.DataFrame: A DataFrame containing the ingested training data
@@ -93,109 +538,400 @@ class DataIngestion:
 
         logging.info("Initiating data ingestion")
 
-        supported_file = self._get_supported_file()
-
-        if supported_file.endswith("csv"):
-            data = pd.read_csv(supported_file)
+        if self.ingestion_config["multiple_files"]:
+            data = self._reconcile_schemas(list(self.iter_data_files(columns)))
         else:
-            data = pd.read_excel(supported_file)
+            supported_file = self._get_supported_file()
+            data = self._read_file(supported_file, columns)
 
         logging.info("Data ingestion completed successfully")
+        return self.downcast_data(data)
+
+    def get_table_columns(self, table_name) -> List[str]:
+        """
+        Get the column names of a table without reading any rows.
+
+        Args:
+            table_name (str): The name of the table
+
+        Returns:
+            List[str]: The column names in table order.
+        """
+        query = sql.SQL("SELECT * FROM {} LIMIT 0;").format(sql.Identifier(table_name))
+
+        with get_connection_manager().connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                    return [column.name for column in cursor.description]
+            except psycopg2.Error as e:
+                logging.error("Error executing SQL query: %s", e)
+                raise ReadingError from e
+
+    def _read_table(self, table_name, columns=None, filters=None) -> pd.DataFrame:
+        """
+        Read the requested columns and the rows matching the filters of a table.
+
+        Args:
+            table_name (str): The name of the table
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters, see ``build_where``.
+
+        Returns:
+            pandas.DataFrame: The data with its database dtypes.
+        """
+        query, params = build_select(table_name, columns, filters)
+
+        with get_connection_manager().connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    data = fetch_data(cursor)
+            except psycopg2.Error as e:
+                logging.error("Error executing SQL query: %s", e)
+                raise ReadingError from e
+
         return data
 
-    def get_sql_table(self, table_name) -> pd.DataFrame:
+    def get_sql_table(self, table_name, columns=None, filters=None) -> pd.DataFrame:
         """
         Initiate the data ingestion process from a Postgres database.
 
-        This method triggers the ingestion of data from the database
+        This method triggers the ingestion of data from the database.
+        Only the requested columns and the rows matching the filters are read.
 
         Args:
             table_name (str): The name of the table
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters as
+                ``(column, operator, value)`` triples, see ``build_where``.
 
         Returns:
             pandas.DataFrame: A DataFrame containing the ingested data.
         """
-        hostname = os.environ.get("DB_HOSTNAME")
-        database_name = os.environ.get("DB_NAME")
-        username = os.environ.get("DB_USERNAME")
-        password = os.environ.get("DB_PASSWORD")
+        return self.downcast_data(self._read_table(table_name, columns, filters))
+
+    def get_sql_table_chunks(
+        self, table_name, chunksize=None, columns=None, filters=None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a Postgres table in bounded-size chunks.
+
+        The rows are fetched through a server-side (named) cursor, so at most
+        ``chunksize`` rows are held in memory at a time, regardless of the table size.
+
+        Args:
+            table_name (str): The name of the table
+            chunksize (int, optional): Number of rows per chunk.
+                Defaults to the ``chunksize`` from the ingestion config.
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters, see ``build_where``.
+
+        Yields:
+            pandas.DataFrame: A DataFrame containing the next chunk of the table.
+        """
+        chunksize = chunksize or self.ingestion_config["chunksize"]
+        query, params = build_select(table_name, columns, filters)
+
+        with get_connection_manager().connection() as connection:
+            yield from self._stream_chunks(connection, query, params, chunksize)
 
+    def _stream_chunks(
+        self, connection, query, params, chunksize
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the result of a query through a server-side (named) cursor.
+
+        Args:
+            connection: The raw connection to stream on.
+            query (psycopg2.sql.Composable): The query.
+            params (list): The parameters of the query.
+            chunksize (int): Number of rows per chunk.
+
+        Yields:
+            pandas.DataFrame: A DataFrame containing the next chunk of the result.
+        """
         try:
-            connection = psycopg2.connect(
-                host=hostname, database=database_name, user=username, password=password
+            with connection.cursor(name="stream_cursor") as cursor:
+                cursor.itersize = chunksize
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    yield self.downcast_data(fetch_data(cursor, rows))
+        except psycopg2.Error as e:
+            logging.error("Error executing SQL query: %s", e)
+            raise ReadingError from e
+
+    @contextmanager
+    def consume_data(
+        self, table_name, chunksize=None, columns=None, filters=None
+    ) -> Iterator[Iterator[pd.DataFrame]]:
+        """
+        Stream a Postgres table in chunks and delete the streamed rows afterwards.
+
+        The rows are streamed and deleted in one ``REPEATABLE READ`` transaction,
+        so rows inserted while the stream runs are neither streamed nor deleted.
+        The deletion is committed when the block exits without an error. All rows
+        matching the filters at the start are deleted, so consume every chunk.
+
+        Args:
+            table_name (str): The name of the table
+            chunksize (int, optional): Number of rows per chunk.
+                Defaults to the ``chunksize`` from the ingestion config.
+            columns (List[str], optional): Columns to read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters, see ``build_where``.
+
+        Yields:
+            Iterator[pandas.DataFrame]: The chunks of the table.
+        """
+        chunksize = chunksize or self.ingestion_config["chunksize"]
+        query, params = build_select(table_name, columns, filters)
+        where, where_params = build_where(filters)
+        delete_query = sql.SQL("DELETE FROM {}{};").format(
+            sql.Identifier(table_name), where
+        )
+
+        with get_connection_manager().connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ;")
+                    yield self._stream_chunks(connection, query, params, chunksize)
+                    cursor.execute(delete_query, where_params)
+                connection.commit()
+            except psycopg2.Error as e:
+                logging.error("Error executing SQL query: %s", e)
+                raise DeletionError from e
+
+    @contextmanager
+    def claim_data(
+        self, table_name, batch_size=None
+    ) -> Iterator[Tuple[pd.DataFrame, Connection]]:
+        """
+        Atomically claim a batch of rows from a queue table.
+
+        Up to ``batch_size`` rows are removed with ``DELETE ... RETURNING``. The rows
+        are picked with ``FOR UPDATE SKIP LOCKED``, so concurrent workers never claim
+        the same rows. The deletion is committed when the block exits without an error,
+        otherwise it is rolled back and the rows go back to the queue. Results
+        written through the yielded connection commit in the same transaction, so
+        a batch is either removed and written or neither.
+
+        Example:
+            with DataIngestion().claim_data("predict_data") as (data, connection):
+                DataIngestion().bulk_write_data(results, "results", connection=connection)
+
+        Args:
+            table_name (str): The name of the queue table
+            batch_size (int, optional): Maximum number of rows to claim.
+                Defaults to the ``chunksize`` from the ingestion config.
+
+        Yields:
+            Tuple[pandas.DataFrame, sqlalchemy.engine.Connection]: The claimed rows,
+                empty if the queue is empty, and the connection of the claim.
+        """
+        batch_size = batch_size or self.ingestion_config["chunksize"]
+        table = sql.Identifier(table_name)
+        claim_query = sql.SQL(
+            "DELETE FROM {} WHERE ctid IN "
+            "(SELECT ctid FROM {} LIMIT %s FOR UPDATE SKIP LOCKED) RETURNING *;"
+        ).format(table, table)
+
+        with get_connection_manager().begin() as connection:
+            try:
+                with connection.connection.cursor() as cursor:
+                    cursor.execute(claim_query, (batch_size,))
+                    data = self.downcast_data(fetch_data(cursor))
+            except psycopg2.Error as e:
+                logging.error("Error executing SQL query: %s", e)
+                raise ReadingError from e
+
+            yield data, connection
+
+    @contextmanager
+    def incremental_data(
+        self, table_name, watermark_column, columns=None, filters=None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read the rows of a table that were added since the last processed watermark.
+
+        The watermark is the largest value of ``watermark_column`` (a timestamp or
+        sequence id) that was processed so far. Rows from ``watermark_lag`` (seconds
+        for timestamps, ids for sequence ids) before the watermark on are read again,
+        and the rows of this window that were already processed are recognized by
+        their hashes and dropped. So every row is processed exactly once if it
+        commits at most ``watermark_lag`` behind the watermark, which includes rows
+        with a value equal to the watermark. Rows that commit later are skipped.
+        Rows that are equal in all read columns are processed once.
+
+        The state is kept in the local watermark store and advanced only when the
+        block exits without an error, so a failed run reads the same rows again.
+
+        Example:
+            with DataIngestion().incremental_data("predictions", "timestamp") as data:
+                ...
+
+        Args:
+            table_name (str): The name of the table
+            watermark_column (str): The increasing timestamp or sequence id column.
+            columns (List[str], optional): Columns to read. The watermark column
+                is always read. Defaults to all columns.
+            filters (List[tuple], optional): Row filters, see ``build_where``.
+
+        Yields:
+            pandas.DataFrame: The rows that were not processed yet.
+        """
+        store = WatermarkStore(self.ingestion_config["watermark_store_path"])
+        key = f"{table_name}.{watermark_column}"
+        state = store.get(key) or {"watermark": None, "hashes": []}
+        lag = self.ingestion_config["watermark_lag"]
+
+        if columns is not None and watermark_column not in columns:
+            columns = [*columns, watermark_column]
+        filters = list(filters or [])
+        if state["watermark"] is not None:
+            lower_bound = from_watermark(state["watermark"], lag)
+            filters.append((watermark_column, ">=", lower_bound))
+        data = self._read_table(table_name, columns, filters)
+
+        # Hashed before downcasting, so the hashes do not depend on the dtypes
+        hashes = hash_rows(data)
+        processed = np.isin(hashes, np.array(state["hashes"], dtype=np.uint64))
+        logging.info(
+            "Read %s new rows from %s after watermark %s",
+            len(data) - processed.sum(),
+            table_name,
+            state["watermark"],
+        )
+        yield self.downcast_data(data[~processed])
+
+        if not data.empty:
+            watermark = to_watermark(data[watermark_column].max())
+            in_window = data[watermark_column] >= from_watermark(watermark, lag)
+            store.set(
+                key,
+                {"watermark": watermark, "hashes": hashes[in_window].tolist()},
             )
 
-        except PostgreSQLConnectionError as e:
-            logging.error("Error connecting to PostgreSQL:", e)
-            raise e
-        query = f"SELECT * FROM {table_name};"
+    @staticmethod
+    def _begin(connection=None):
+        """
+        Open a transaction, or join the one of the given connection.
 
-        try:
-            data = pd.read_sql_query(query, connection)
-        except ReadingError as e:
-            logging.error("Error executing SQL query:", e)
-            raise e
+        Args:
+            connection (sqlalchemy.engine.Connection, optional): Connection of an
+                open transaction, which is committed by its owner.
 
-        if connection:
-            connection.close()
-        return data
+        Returns:
+            A context manager yielding the connection of the transaction.
+        """
+        if connection is not None:
+            return nullcontext(connection)
+        return get_connection_manager().begin()
 
-    def write_data(self, data, table_name):
+    def write_data(self, data, table_name, connection=None):
         """
-        Write predictions to a table.
+        Write data to a table.
 
         Args:
             data (pd.DataFrame): A dataframe containing the data that is to be written
             table_name (str): The name of the table to write data to.
+            connection (sqlalchemy.engine.Connection, optional): Connection of an
+                open transaction to write in, e.g. the one of ``claim_data``.
+                Defaults to writing in a transaction of its own.
         """
-        hostname = os.environ.get("DB_HOSTNAME")
-        database_name = os.environ.get("DB_NAME")
-        username = os.environ.get("DB_USERNAME")
-        password = os.environ.get("DB_PASSWORD")
-        try:
-            engine = create_engine(
-                f"postgresql://{username}:{password}@{hostname}/{database_name}"
-            )
-        except PostgreSQLConnectionError as e:
-            logging.error("Error connecting to PostgreSQL:", e)
-            raise e
         try:
-            data.to_sql(table_name, engine, if_exists="append", index=False)
-        except WritingError as e:
-            logging.error("Error executing SQL query:", e)
-            raise e
+            with self._begin(connection) as transaction:
+                data.to_sql(table_name, transaction, if_exists="append", index=False)
+        except SQLAlchemyError as e:
+            logging.error("Error executing SQL query: %s", e)
+            raise WritingError from e
+
+    # pylint: disable=R0913
+    def bulk_write_data(
+        self, data, table_name, batch_size=None, replace=False, connection=None
+    ):
+        """
+        Write data to a table using PostgreSQL COPY.
+
+        The frame is streamed as CSV through ``COPY ... FROM STDIN`` in batches of
+        ``batch_size`` rows. Creating the table from the frame if it does not exist,
+        emptying it with ``replace`` and the COPY batches all run in one
+        transaction, so a failed write leaves the table as it was. The table keeps
+        its sequences, grants and dependent views. ``TRUNCATE`` takes an ACCESS
+        EXCLUSIVE lock, so with ``replace`` concurrent readers of the table block
+        until the transaction commits and then see the new rows.
 
-    def delete_data(self, table_name):
+        Args:
+            data (pd.DataFrame): A dataframe containing the data that is to be written
+            table_name (str): The name of the table to write data to.
+            batch_size (int, optional): Number of rows per COPY batch.
+                Defaults to the ``copy_batch_size`` from the ingestion config.
+            replace (bool): Whether to replace the contents of the table instead
+                of appending to them.
+            connection (sqlalchemy.engine.Connection, optional): Connection of an
+                open transaction to write in, e.g. the one of ``claim_data``.
+                Defaults to writing in a transaction of its own.
         """
-        Delete data from a table.
+        batch_size = batch_size or self.ingestion_config["copy_batch_size"]
+        try:
+            with self._begin(connection) as transaction:
+                self._copy_data(transaction, data, table_name, batch_size, replace)
+        except (SQLAlchemyError, psycopg2.Error) as e:
+            logging.error("Error executing SQL query: %s", e)
+            raise WritingError from e
+
+    @staticmethod
+    def _copy_data(connection, data, table_name, batch_size, replace):
+        """
+        Write data to a table with COPY in the transaction of the connection.
 
         Args:
-            table_name (str): The name of the table to be deleted
+            connection (sqlalchemy.engine.Connection): Connection of an open transaction.
+            data (pd.DataFrame): A dataframe containing the data that is to be written
+            table_name (str): The name of the table to write data to.
+            batch_size (int): Number of rows per COPY batch.
+            replace (bool): Whether to empty the table before writing.
         """
+        table = sql.Identifier(table_name)
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+        copy_query = copy_query.format(
+            table, sql.SQL(", ").join(map(sql.Identifier, data.columns))
+        )
 
-        hostname = os.environ.get("DB_HOSTNAME")
-        database_name = os.environ.get("DB_NAME")
-        username = os.environ.get("DB_USERNAME")
-        password = os.environ.get("DB_PASSWORD")
+        data.head(0).to_sql(table_name, connection, if_exists="append", index=False)
+        with connection.connection.cursor() as cursor:
+            if replace:
+                cursor.execute(sql.SQL("TRUNCATE TABLE {};").format(table))
 
-        try:
-            connection = psycopg2.connect(
-                host=hostname, database=database_name, user=username, password=password
-            )
+            for start in range(0, len(data), batch_size):
+                buffer = io.StringIO()
+                data.iloc[start : start + batch_size].to_csv(
+                    buffer, index=False, header=False, na_rep="\\N"
+                )
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
 
-        except PostgreSQLConnectionError as e:
-            logging.error("Error connecting to PostgreSQL:", e)
-            raise e
+    def delete_data(self, table_name, filters=None):
+        """
+        Delete data from a table.
 
-        cursor = connection.cursor()
+        Args:
+            table_name (str): The name of the table to be deleted
+            filters (List[tuple], optional): Row filters, see ``build_where``.
+                Defaults to deleting all rows.
+        """
+        where, params = build_where(filters)
+        delete_query = sql.SQL("DELETE FROM {}{};").format(
+            sql.Identifier(table_name), where
+        )
 
-        delete_query = f"DELETE FROM {table_name}"
-        try:
-            cursor.execute(delete_query)
-            connection.commit()
-        except DeletionError as e:
-            logging.error("Error executing SQL query:", e)
-            raise e
-        finally:
-            cursor.close()
-            connection.close()
+        with get_connection_manager().connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(delete_query, params)
+                connection.commit()
+            except psycopg2.Error as e:
+                logging.error("Error executing SQL query: %s", e)
+                raise DeletionError from e
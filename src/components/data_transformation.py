@@ -3,22 +3,41 @@ Data Transformation Module.
 
 This module provides a class with a method for data transformation tasks
 """
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 
-import miceforest as mf
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import ShuffleSplit, train_test_split
 
+from src.components.duplicate_detector import DuplicateDetector
+from src.components.imputer import Imputer, create_imputer
 from src.logger import logging
 from src.utility import get_cfg
 
+TARGET_PREFIXES = ("Red KBE", "Energie")
+# Prefixes of the non-feature columns excluded by the "all" features option
+EXCLUDED_PREFIXES = (
+    "Ziel",
+    "Innoculum",
+    "Waschen",
+    "Ablagerung",
+    "Prozess",
+    "DoE",
+    "timestamp",
+)
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 42
+
 
 @dataclass
 class TrainTestData:
     """
     Container for training and testing data along with feature names.
+
+    In the view split mode the arrays are views of one shared array and the
+    index arrays hold the positions of their rows in the transformed data.
     """
 
     x_train: np.ndarray
@@ -26,6 +45,80 @@ class TrainTestData:
     x_test: np.ndarray
     y_test: np.ndarray
     feature_names: List[str]
+    train_index: Optional[np.ndarray] = None
+    test_index: Optional[np.ndarray] = None
+
+
+@dataclass
+class SelectionPlan:
+    """
+    Container for a compiled column selection of a column schema.
+
+    Attributes:
+        columns (List[str]): The selected column names in source order.
+        index (numpy.ndarray): The positions of the selected columns.
+        indexer (Union[slice, numpy.ndarray]): The positions as a slice if they
+            are contiguous, so the selection is a view of the data.
+    """
+
+    columns: List[str]
+    index: np.ndarray
+    indexer: Union[slice, np.ndarray] = field(init=False)
+
+    def __post_init__(self):
+        if len(self.index) and np.all(np.diff(self.index) == 1):
+            self.indexer = slice(self.index[0], self.index[-1] + 1)
+        else:
+            self.indexer = self.index
+
+    def apply(self, data) -> Union[pd.DataFrame, np.ndarray]:
+        """
+        Selects the planned columns of a DataFrame or of a 2D array with the
+        column schema the plan was compiled for.
+
+        Args:
+            data (Union[pandas.DataFrame, numpy.ndarray]): The data to be selected.
+
+        Returns:
+            Union[pandas.DataFrame, numpy.ndarray]: The selected columns.
+        """
+        if isinstance(data, pd.DataFrame):
+            return data.iloc[:, self.indexer]
+        if isinstance(self.indexer, slice):
+            return data[:, self.indexer]
+        return np.take(data, self.indexer, axis=1)
+
+
+@lru_cache(maxsize=32)
+def compile_selection(
+    columns: Tuple[str, ...], features: Tuple[str, ...], select_target=True
+) -> SelectionPlan:
+    """
+    Compiles the selection of the columns that start with the feature prefixes.
+    The plan is cached, so every column schema is resolved once per process.
+
+    Args:
+        columns (Tuple[str, ...]): The column names of the data.
+        features (Tuple[str, ...]): The feature prefixes of the config file, or
+            "all" for every column that is not excluded.
+        select_target (bool): Whether the target columns are selected.
+
+    Returns:
+        SelectionPlan: The compiled selection.
+    """
+    names = pd.Index(columns, dtype=object)
+    if "all" in features:
+        excluded = EXCLUDED_PREFIXES
+        if not select_target:
+            excluded += TARGET_PREFIXES
+        mask = ~names.str.startswith(excluded)
+    else:
+        prefixes = features + TARGET_PREFIXES if select_target else features
+        mask = names.str.startswith(prefixes)
+    index = np.flatnonzero(mask)
+    # The plan is shared by all callers with the same schema
+    index.flags.writeable = False
+    return SelectionPlan(names[index].tolist(), index)
 
 
 class DataTransformation:
@@ -48,6 +141,24 @@ class DataTransformation:
         """
         self.transformation_config = get_cfg("components/data_transformation.yaml")
 
+    def selection_plan(self, columns, select_target=True) -> SelectionPlan:
+        """
+        Returns the cached selection plan of the columns that start with the
+        specified in the config file strings.
+
+        Args:
+            columns (List[str]): The column names to be processed.
+            select_target (bool): Whether the target columns are selected.
+
+        Returns:
+            SelectionPlan: The compiled selection.
+        """
+        return compile_selection(
+            tuple(columns),
+            tuple(self.transformation_config["features"]),
+            select_target,
+        )
+
     def select_data(self, df, select_target=True) -> pd.DataFrame:
         """
         Selects columns from the DataFrame that start with the
@@ -57,67 +168,135 @@ class DataTransformation:
             df: The DataFrame to be processed.
 
         Returns:
-            A new DataFrame that contains only the columns that start with the specified strings.
+            A DataFrame that contains only the columns that start with the specified strings.
 
         """
         logging.info("Selecting the data")
-        column_startswith = self.transformation_config["features"]
-
-        if "all" in column_startswith:
-            start_names = [
-                "Ziel",
-                "Innoculum",
-                "Waschen",
-                "Ablagerung",
-                "Prozess",
-                "DoE",
-                "timestamp",
-            ]
+        return self.selection_plan(df.columns, select_target).apply(df)
+
+    def resolve_columns(self, columns, select_target=True) -> List[str]:
+        """
+        Resolves the column names that select_data would keep, so that only
+        these columns have to be read from the database.
 
-            if not select_target:
-                start_names.extend(["Red KBE", "Energie"])
+        Args:
+            columns (List[str]): The column names of the source table.
+            select_target (bool): Whether the target columns are selected.
 
-            column_mapping = ~df.columns.str.startswith(tuple(start_names))
+        Returns:
+            List[str]: The selected column names in source order.
+        """
+        return list(self.selection_plan(columns, select_target).columns)
 
-        else:
-            if select_target:
-                column_startswith.extend(["Red KBE", "Energie"])
-            start_names = tuple(column_startswith)
-            column_mapping = df.columns.str.startswith(start_names)
+    def resolve_target_columns(self, columns) -> List[str]:
+        """
+        Resolves the names of the target columns, which are selected only
+        together with the target.
 
-        return df.loc[:, column_mapping]
+        Args:
+            columns (List[str]): The column names of the source table.
+
+        Returns:
+            List[str]: The target column names in source order.
+        """
+        features = set(self.resolve_columns(columns, select_target=False))
+        return [
+            column
+            for column in self.resolve_columns(columns, select_target=True)
+            if column not in features
+        ]
 
-    def clean_data(self, df, validation_issues) -> pd.DataFrame:
+    def create_imputer(self) -> Imputer:
+        """
+        Creates an unfitted imputer of the method set in the config file.
+
+        Returns:
+            Imputer: The unfitted imputer.
+        """
+        return create_imputer(self.transformation_config["imputation"])
+
+    def fit_imputer(self, df) -> Imputer:
+        """
+        Fits an imputer on the feature columns of the training data, so that it
+        can be persisted with the models and applied to prediction data.
+
+        Args:
+            df: The selected training DataFrame, before cleaning.
+
+        Returns:
+            The fitted imputer.
+        """
+        logging.info("Fitting imputer")
+        features = self.resolve_columns(df.columns, select_target=False)
+        return self.create_imputer().fit(df[features])
+
+    def clean_data(self, df, validation_issues, imputer=None) -> pd.DataFrame:
         """
         Cleans the data by imputing missing values and removing duplicates.
 
+        A fitted imputer only fills the columns it was fitted on. The other
+        columns, e.g. the targets of training data, are kept as they are and
+        the rows with NaN values in them are dropped.
+
         Args:
             df: The DataFrame to be cleaned.
             validation_issues: A list of validation issues detected by the data validation step.
+            imputer: A fitted imputer to be applied. If not provided, an imputer
+                is fitted on the DataFrame itself.
 
         Returns:
-            The cleaned DataFrame.
+            The cleaned DataFrame with a new range index if NaN values were imputed.
         """
         logging.info("Data cleaning started")
 
         if "duplicates" in validation_issues:
             logging.info("Removing duplicates")
-            df.drop_duplicates(inplace=True)
+            df = df[~DuplicateDetector().update(df)]
 
         if "nan_imputable" in validation_issues:
             logging.info("Imputing NaN")
-            df_array = df.to_numpy()
-            kds = mf.ImputationKernel(
-                df_array, save_all_iterations=True, random_state=42
-            )
-            kds.mice(10)
-            imputed_array = kds.complete_data()
-            df = pd.DataFrame(imputed_array, columns=df.columns)
+            if imputer is None:
+                df = self.create_imputer().fit_transform(df)
+            else:
+                df = self._apply_imputer(df, imputer)
         return df
 
+    @staticmethod
+    def _apply_imputer(df, imputer) -> pd.DataFrame:
+        """
+        Fills the imputer columns of the data and drops the rows with NaN values
+        in the other columns.
+
+        Args:
+            df: The DataFrame to be imputed.
+            imputer: The fitted imputer.
+
+        Returns:
+            The imputed DataFrame with a new range index.
+        """
+        other_columns = df.columns.difference(imputer.columns, sort=False)
+        imputed = pd.concat(
+            [
+                imputer.transform(df),
+                df[other_columns].reset_index(drop=True),
+            ],
+            axis=1,
+        )[df.columns]
+
+        nan_rows = imputed[other_columns].isna().any(axis=1)
+        if nan_rows.any():
+            logging.warning(
+                "Dropping %d rows with NaN values in the columns %s",
+                nan_rows.sum(),
+                other_columns[imputed[other_columns].isna().any()].tolist(),
+            )
+            imputed = imputed[~nan_rows].reset_index(drop=True)
+        return imputed
+
     def create_train_test_split(self, transformed_data) -> TrainTestData:
         """
-        Splits the data into training and testing sets.
+        Splits the data into training and testing sets with the split mode set
+        in the config file.
 
         Args:
             transformed_data: The transformed DataFrame.
@@ -127,13 +306,72 @@ class DataTransformation:
             as well as the feature names.
         """
         logging.info("Creating train test splits")
+        if self.transformation_config["split_mode"] == "view":
+            return self._create_view_split(transformed_data)
+        return self._create_copy_split(transformed_data)
+
+    @staticmethod
+    def _create_view_split(transformed_data) -> TrainTestData:
+        """
+        Splits the data into views of a single float array.
+
+        The rows are written in split order and the columns with the features
+        first, so the training and testing features and targets are slices of
+        the array and the data is copied only once. The rows are the same as
+        the ones of the copy split mode.
+
+        Args:
+            transformed_data: The transformed DataFrame.
+
+        Returns:
+            A TrainTestData object with views of the data and the row positions
+            of the training and testing sets.
+        """
+        is_target = transformed_data.columns.str.startswith(TARGET_PREFIXES)
+        feature_index = np.flatnonzero(~is_target)
+        column_order = np.concatenate((feature_index, np.flatnonzero(is_target)))
+
+        train_index, test_index = next(
+            ShuffleSplit(
+                n_splits=1, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE
+            ).split(transformed_data)
+        )
+        row_order = np.concatenate((train_index, test_index))
+
+        values = np.empty((len(row_order), len(column_order)), dtype=np.float64)
+        for position, column in enumerate(column_order):
+            column_values = transformed_data.iloc[:, column].to_numpy(dtype=np.float64)
+            values[:, position] = column_values[row_order]
+
+        n_train, n_features = len(train_index), len(feature_index)
+        return TrainTestData(
+            x_train=values[:n_train, :n_features],
+            y_train=values[:n_train, n_features:],
+            x_test=values[n_train:, :n_features],
+            y_test=values[n_train:, n_features:],
+            feature_names=transformed_data.columns[feature_index],
+            train_index=train_index,
+            test_index=test_index,
+        )
+
+    @staticmethod
+    def _create_copy_split(transformed_data) -> TrainTestData:
+        """
+        Splits the data into separate copies of the training and testing sets.
+
+        Args:
+            transformed_data: The transformed DataFrame.
+
+        Returns:
+            A TrainTestData object containing the training and testing data,
+            as well as the feature names.
+        """
         train_data, test_data = train_test_split(
             transformed_data,
             shuffle=True,
-            test_size=0.2,
-            random_state=42,
+            test_size=TEST_SIZE,
+            random_state=SPLIT_RANDOM_STATE,
         )
-
         y_train = train_data[
             [
                 col
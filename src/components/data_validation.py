@@ -4,19 +4,43 @@ It can be employed to assess data quality
 """
 import logging
 import os
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import List
 
+import numpy as np
+import pandas as pd
 from evidently.metric_preset import (
     DataDriftPreset,
     DataQualityPreset,
     TargetDriftPreset,
 )
 from evidently.report import Report
-from scipy.stats import kruskal, ks_2samp
 
-from src.errors.data_validation_errors import ColumnsDiffError, DtypeDiffError, NanError
-from src.utility import get_cfg, get_root
+from src.components.drift_decision import ColumnDrift, DriftDecision, DriftResult
+from src.components.drift_detector import OnlineDriftDetector
+from src.components.duplicate_detector import DuplicateDetector
+from src.components.reference_profile import ReferenceProfile, SchemaFingerprint
+from src.components.rule_engine import RuleEngine, RuleResult
+from src.errors.data_validation_errors import (
+    ColumnsDiffError,
+    DtypeDiffError,
+    NanError,
+    ReferenceProfileNotFoundError,
+)
+from src.utility import get_cfg, get_root, prune_cache
+
+
+@dataclass
+class DataProfile:
+    """
+    Container for the NaN ratios and the duplicate mask of a DataFrame.
+    """
+
+    nan_ratios: pd.Series
+    duplicated: np.ndarray
 
 
 class DataValidation:
@@ -39,12 +63,39 @@ class DataValidation:
         """
         self.validation_config = get_cfg("components/data_validation.yaml")
 
-    def _check_nan(self, data) -> str:
+    @staticmethod
+    def profile_data(data, duplicate_detector=None) -> DataProfile:
+        """
+        Profiles NaN values and duplicate rows of the provided DataFrame in one pass.
+
+        The rows are hashed once for the duplicate mask. The NaN ratios are computed
+        over the unique rows from a single boolean NaN mask of the whole frame.
+
+        Args:
+            data (pandas.DataFrame): The DataFrame to be profiled.
+            duplicate_detector (DuplicateDetector, optional): Detector holding the
+                rows of earlier chunks, which are then duplicates as well.
+
+        Returns:
+            DataProfile: The NaN ratio of every column and the duplicate row mask.
+        """
+        if duplicate_detector is None:
+            duplicate_detector = DuplicateDetector()
+        duplicated = duplicate_detector.update(data)
+        unique_rows = ~duplicated
+        nan_counts = np.count_nonzero(data.isna().to_numpy()[unique_rows], axis=0)
+        n_unique = np.count_nonzero(unique_rows)
+        nan_ratios = nan_counts / n_unique if n_unique else np.zeros(len(data.columns))
+        return DataProfile(pd.Series(nan_ratios, index=data.columns), duplicated)
+
+    def _check_nan(self, data, profile=None) -> str:
         """
         Checks for NaN values in the provided DataFrame.
 
         Args:
             data (pandas.DataFrame): The DataFrame to be checked.
+            profile (DataProfile, optional): The profile of the data.
+                Computed if not provided.
 
         Returns:
             str: Indicates the presence of NaN values:
@@ -53,17 +104,13 @@ class DataValidation:
                 - None: If there are no NaN values
         """
         logging.info("Checking for NaN values")
-        nan_thresh = self.validation_config["nan_thresh"]
-        nan_present = False
-        df = data.drop_duplicates()
-        for column in df:
-            nan_count = df[column].isna().sum()
-            if nan_count / len(df) > nan_thresh:
-                return "nan_nonimputable"
-            if nan_count != 0:
-                nan_present = True
-
-        if nan_present:
+        if profile is None:
+            profile = self.profile_data(data)
+
+        nan_ratios = profile.nan_ratios.to_numpy()
+        if (nan_ratios > self.validation_config["nan_thresh"]).any():
+            return "nan_nonimputable"
+        if nan_ratios.any():
             return "nan_imputable"
 
         return None
@@ -83,7 +130,8 @@ class DataValidation:
         logging.info("Validating training data")
 
         validation_issues = []
-        nan_message = self._check_nan(train_df)
+        profile = self.profile_data(train_df)
+        nan_message = self._check_nan(train_df, profile)
 
         if nan_message == "nan_nonimputable":
             logging.error("NanError encountered")
@@ -91,29 +139,156 @@ class DataValidation:
         if nan_message is not None:
             validation_issues.append(nan_message)
 
-        duplicates_present = train_df.duplicated().any()
+        duplicates_present = profile.duplicated.any()
         if duplicates_present:
             validation_issues.append("duplicates")
+
         return validation_issues
 
+    def create_rule_engine(self, scope=None) -> RuleEngine:
+        """
+        Creates a rule engine with the data quality rules of the config.
+
+        Args:
+            scope (str, optional): "train" or "predict" to use only the rules of
+                that scope. Defaults to all rules.
+
+        Returns:
+            RuleEngine: The engine, to be used for all batches of a stream.
+        """
+        return RuleEngine(self.validation_config["rules"], scope)
+
+    def check_rules(self, data, rule_engine=None) -> RuleResult:
+        """
+        Checks the data against the data quality rules of the config.
+        If a rule is violated, warning is raised.
+
+        Rules may read any ingested column, e.g. a timestamp, so the data is
+        checked before the features are selected.
+
+        Args:
+            data (pandas.DataFrame): The ingested data to be checked.
+            rule_engine (RuleEngine, optional): Engine that checked the previous
+                batches of the data. Defaults to a new engine with all rules.
+
+        Returns:
+            RuleResult: The violating rows of every violated rule.
+        """
+        logging.info("Checking data quality rules")
+        if rule_engine is None:
+            rule_engine = self.create_rule_engine()
+        result = rule_engine.evaluate(data)
+        for rule, rows in result.violations.items():
+            logging.warning(
+                "Rule %s violated by %d rows: %s", rule, len(rows), rows[:10].tolist()
+            )
+            warnings.warn(f"Rule {rule} violated by {len(rows)} rows. Proceeding...")
+        return result
+
+    def get_reference_profile(self, train_df, data_digest=None) -> ReferenceProfile:
+        """
+        Gets the profile of the reference data used for drift checks.
+
+        Profiles are cached in the reference profile folder by the hash of
+        the reference data, so they are only computed once per dataset. Only
+        the ``max_cached_profiles`` most recently used profiles are kept.
+
+        Args:
+            train_df (pandas.DataFrame): The training DataFrame.
+            data_digest (str, optional): Digest of the training DataFrame from
+                ``hash_data``, computed if not given.
+
+        Returns:
+            ReferenceProfile: The profile of the training data.
+        """
+        cat_cols = [
+            col for col in self.validation_config["cat_cols"] if col is not None
+        ]
+        signature = ReferenceProfile.compute_signature(train_df, cat_cols, data_digest)
+
+        dir_path = os.path.join(
+            get_root(), self.validation_config["reference_profile_folder"]
+        )
+        file_path = os.path.join(dir_path, f"reference-{signature}.pkl")
+        if os.path.exists(file_path):
+            logging.info("Loading cached reference profile %s", file_path)
+            os.utime(file_path)
+            return ReferenceProfile.load(file_path)
+
+        logging.info("Creating reference profile %s", file_path)
+        profile = ReferenceProfile.from_data(train_df, cat_cols, signature)
+        os.makedirs(dir_path, exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        profile.save(tmp_path)
+        os.replace(tmp_path, file_path)
+        prune_cache(
+            dir_path, "reference-*.pkl", self.validation_config["max_cached_profiles"]
+        )
+        return profile
+
+    def store_reference_profile(self, profile):
+        """
+        Stores the reference profile for prediction runs.
+
+        Prediction runs load the stored profile instead of the reference data.
+
+        Args:
+            profile (ReferenceProfile): The profile of the reference data.
+        """
+        file_path = os.path.join(
+            get_root(), self.validation_config["stored_profile_path"]
+        )
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        profile.save(tmp_path)
+        os.replace(tmp_path, file_path)
+        logging.info(
+            "Stored reference profile with schema %s at %s",
+            profile.schema.digest,
+            file_path,
+        )
+
+    def load_reference_profile(self) -> ReferenceProfile:
+        """
+        Loads the reference profile stored by the last training run.
+
+        Returns:
+            ReferenceProfile: The profile of the reference data.
+        """
+        file_path = os.path.join(
+            get_root(), self.validation_config["stored_profile_path"]
+        )
+        if not os.path.exists(file_path):
+            logging.error("ReferenceProfileNotFoundError encountered")
+            raise ReferenceProfileNotFoundError(file_path)
+        return ReferenceProfile.load(file_path)
+
     def check_prediction_data(self, pred_df, train_df) -> List[str]:
         """
         Validates prediction data.
 
         Args:
             pred_df (pandas.DataFrame): The prediction DataFrame.
-            train_df (pandas.DataFrame): The training DataFrame.
+            train_df (pandas.DataFrame | ReferenceProfile): The training DataFrame
+                or its profile.
 
         Returns:
             List[str]: A list of validation issues identified, including:
                 - "nan_imputable": If NaN count is present but below the threshold
+                - "duplicates": If the DataFrame contains duplicate rows
+                - "drift_detected": If data drift is detected
         """
         logging.info("Validating prediction data")
 
+        if isinstance(train_df, pd.DataFrame):
+            train_df = self.get_reference_profile(train_df)
+        pred_df = train_df.schema.conform(pred_df)
+
         validation_issues = []
-        nan_message = self._check_nan(pred_df)
+        profile = self.profile_data(pred_df)
+        nan_message = self._check_nan(pred_df, profile)
 
-        duplicates_present = pred_df.duplicated().any()
+        duplicates_present = profile.duplicated.any()
         if duplicates_present:
             validation_issues.append("duplicates")
 
@@ -121,60 +296,247 @@ class DataValidation:
             logging.error("NanError encountered")
             raise NanError
         validation_issues.append(nan_message)
-        if not all(pred_df.columns == train_df.columns):
-            logging.error("ColumnsDiffError encountered")
-            raise ColumnsDiffError
-        if not all(pred_df.dtypes == train_df.dtypes):
-            logging.error("DtypeDiffError encountered")
-            raise DtypeDiffError
+
+        schema = SchemaFingerprint.from_data(pred_df)
+        if schema != train_df.schema:
+            diff = "; ".join(schema.diff(train_df.schema))
+            if schema.columns != train_df.schema.columns:
+                logging.error("ColumnsDiffError encountered: %s", diff)
+                raise ColumnsDiffError(diff)
+            logging.error("DtypeDiffError encountered: %s", diff)
+            raise DtypeDiffError(diff)
 
         drift_detected = self.check_data_drift(pred_df, train_df)
         if drift_detected:
             validation_issues.append("drift_detected")
         return validation_issues
 
-    def check_data_drift(self, pred_df, train_df):
+    def _get_effect_size(self, train_df, column, values, statistic):
         """
-        Checks for data drift between the prediction data and the training data.
-        If present, warning is raised.
+        Computes the configured effect size of a column drift.
+
+        Args:
+            train_df (ReferenceProfile): The profile of the training data.
+            column (str): Name of the column.
+            values (pd.Series): Values of the prediction data.
+            statistic (float): Statistic of the drift test.
+
+        Returns:
+            float: The effect size, None if not configured or not defined for the column.
+        """
+        effect_size = self.validation_config["drift_decision"]["effect_size"]
+        is_categorical = column in train_df.category_counts
+        if effect_size == "psi":
+            return train_df.psi(column, values, self.validation_config["sketch_bins"])
+        if effect_size == "ks" and not is_categorical:
+            return statistic
+        if effect_size == "wasserstein" and not is_categorical:
+            return train_df.wasserstein_distance(column, values)
+        return None
+
+    def evaluate_drift(self, pred_df, train_df) -> DriftResult:
+        """
+        Runs the drift tests of all columns and decides which of them drifted.
+
+        The p-values are corrected for multiple testing and the effect sizes are
+        compared to the floor as configured in ``drift_decision``.
 
         Args:
             pred_df (pd.DataFrame): The prediction data to be compared against the training data.
-            train_df (pd.DataFrame): The training data to be used as the reference data.
+            train_df (pd.DataFrame | ReferenceProfile): The training data to be used as
+                the reference data, or its profile.
 
         Returns:
-            bool: True if drift is present, false otherwise
+            DriftResult: The per-column results and the overall decision.
         """
+        if isinstance(train_df, pd.DataFrame):
+            train_df = self.get_reference_profile(train_df)
 
-        drift_thresh = self.validation_config["drift_thresh"]
         cat_cols = self.validation_config["cat_cols"]
         num_cols = [col for col in pred_df.columns if col not in cat_cols]
-        drift_present = False
-        for column in num_cols:
-            _, p_value = ks_2samp(pred_df[column], train_df[column])
-            if p_value < drift_thresh:
-                warnings.warn(
-                    f"Numerical drift detected in column {column}. Proceeding..."
-                )
-                logging.info("Numerical drift detected in column %s", column)
-                drift_present = True
 
+        drift_tests = [("Numerical", column, train_df.ks_test) for column in num_cols]
         if cat_cols != [None]:
-            for column in cat_cols:
-                _, p_value = kruskal(pred_df[column], train_df[column])
-                if p_value < drift_thresh:
-                    warnings.warn(
-                        f"Categorical drift detected in column {column}. Proceeding..."
-                    )
-                    logging.info("Categorical drift detected in column %s", column)
-                    drift_present = True
+            drift_tests.extend(
+                ("Categorical", column, train_df.kruskal_test) for column in cat_cols
+            )
+
+        def run_test(drift_test):
+            kind, column, test = drift_test
+            statistic, p_value = test(column, pred_df[column])
+            effect_size = self._get_effect_size(
+                train_df, column, pred_df[column], statistic
+            )
+            return ColumnDrift(column, kind, statistic, p_value, effect_size)
+
+        drift_workers = self.validation_config["drift_workers"]
+        if drift_workers > 1:
+            with ThreadPoolExecutor(max_workers=drift_workers) as executor:
+                columns = list(executor.map(run_test, drift_tests))
+        else:
+            columns = [run_test(drift_test) for drift_test in drift_tests]
+
+        return self._get_drift_decision().decide(columns)
+
+    def _get_drift_decision(self) -> DriftDecision:
+        """
+        Creates the drift decision configured in ``drift_decision``.
+
+        Returns:
+            DriftDecision: The decision with ``drift_thresh`` as significance level.
+        """
+        decision_config = self.validation_config["drift_decision"]
+        return DriftDecision(
+            alpha=self.validation_config["drift_thresh"],
+            correction=decision_config["correction"],
+            effect_size_floor=decision_config["effect_size_floor"],
+            drift_share=decision_config["drift_share"],
+        )
+
+    def check_data_drift(self, pred_df, train_df) -> DriftResult:
+        """
+        Checks for data drift between the prediction data and the training data.
+        If present, warning is raised.
+
+        Args:
+            pred_df (pd.DataFrame): The prediction data to be compared against the training data.
+            train_df (pd.DataFrame | ReferenceProfile): The training data to be used as
+                the reference data, or its profile.
+
+        Returns:
+            DriftResult: The per-column results, evaluates to True if drift is present
+        """
+        # The tests may run in parallel, warnings are raised here in column order
+        drift_result = self.evaluate_drift(pred_df, train_df)
+        for column_drift in drift_result.drifted_columns:
+            kind, column = column_drift.kind, column_drift.column
+            warnings.warn(f"{kind} drift detected in column {column}. Proceeding...")
+            logging.info("%s drift detected in column %s", kind, column)
+
+        return drift_result
+
+    def create_drift_detector(self, train_df) -> OnlineDriftDetector:
+        """
+        Creates an online drift detector for streamed prediction data.
+
+        Args:
+            train_df (pd.DataFrame | ReferenceProfile): The training data to be used as
+                the reference data, or its profile.
+
+        Returns:
+            OnlineDriftDetector: An empty detector with bins from the training data.
+        """
+        if isinstance(train_df, pd.DataFrame):
+            train_df = self.get_reference_profile(train_df)
+        return OnlineDriftDetector(train_df, self.validation_config["sketch_bins"])
+
+    def check_stream_drift(self, drift_detector) -> DriftResult:
+        """
+        Checks for data drift between the streamed prediction data summarized in
+        the detector and the training data. If present, warning is raised.
+
+        The sketch statistics are decided on like those of ``evaluate_drift``,
+        as configured in ``drift_decision``. The effect size is the PSI or the
+        KS statistic if configured, the Wasserstein distance is not available
+        from the sketches.
+
+        Args:
+            drift_detector (OnlineDriftDetector): The detector fed with the prediction data.
 
-        return drift_present
+        Returns:
+            DriftResult: The per-column results, evaluates to True if drift is present
+        """
+        effect_size = self.validation_config["drift_decision"]["effect_size"]
+        columns = []
+        statistics = drift_detector.get_statistics()
+        for column, (test, statistic, p_value, psi) in statistics.iterrows():
+            kind = "Categorical" if test == "kruskal" else "Numerical"
+            column_effect_size = None
+            if effect_size == "psi":
+                column_effect_size = psi
+            elif effect_size == "ks" and test == "ks":
+                column_effect_size = statistic
+            columns.append(
+                ColumnDrift(column, kind, statistic, p_value, column_effect_size)
+            )
+
+        drift_result = self._get_drift_decision().decide(columns)
+        for column_drift in drift_result.drifted_columns:
+            kind, column = column_drift.kind, column_drift.column
+            warnings.warn(f"{kind} drift detected in column {column}. Proceeding...")
+            logging.info("%s stream drift detected in column %s", kind, column)
+        logging.info(
+            "Stream drift share %.3f, drift detected: %s",
+            drift_result.drift_share,
+            drift_result.drift_detected,
+        )
+
+        return drift_result
+
+    def create_stream_report(self, drift_detector):
+        """
+        Save the drift statistics of streamed prediction data as a CSV report.
+
+        Args:
+            drift_detector (OnlineDriftDetector): The detector fed with the prediction data.
+
+        Returns:
+            None
+        """
+        drift_reports_folder = self.validation_config["drift_reports_folder"]
+
+        dir_path = os.path.join(get_root(), drift_reports_folder)
+        os.makedirs(dir_path, exist_ok=True)
+        file_path = os.path.join(dir_path, "stream_drift_report.csv")
+        drift_detector.get_statistics().to_csv(file_path, index_label="column")
+
+    @staticmethod
+    def sample_rows(data, n_rows, seed, stratify_column=None) -> pd.DataFrame:
+        """
+        Samples at most ``n_rows`` rows of the DataFrame.
+
+        With a stratify column, the budget is split between its values by the
+        largest remainder method, so every value gets its proportional share
+        rounded up or down and the shares add up to exactly ``n_rows``.
+
+        Args:
+            data (pandas.DataFrame): The DataFrame to be sampled.
+            n_rows (int): The row budget.
+            seed (int): Seed of the random sampling.
+            stratify_column (str, optional): Column whose value proportions are kept.
+
+        Returns:
+            pandas.DataFrame: The sampled rows in their original order.
+        """
+        if len(data) <= n_rows:
+            return data
+        if stratify_column is None:
+            return data.sample(n=n_rows, random_state=seed).sort_index()
+
+        codes, _ = pd.factorize(data[stratify_column], use_na_sentinel=False)
+        quotas = np.bincount(codes) * n_rows / len(data)
+        shares = np.floor(quotas).astype(int)
+        remainder = n_rows - shares.sum()
+        shares[np.argsort(shares - quotas, kind="stable")[:remainder]] += 1
+
+        rng = np.random.default_rng(seed)
+        positions = np.concatenate(
+            [
+                rng.choice(np.flatnonzero(codes == code), share, replace=False)
+                for code, share in enumerate(shares)
+            ]
+        )
+        return data.iloc[np.sort(positions)]
 
     def create_drift_reports(self, pred_df, train_df):
         """
         Generate drift reports comparing prediction data to training data.
 
+        If ``sample_rows`` is set in the report config, both frames are sampled
+        down to that many rows, stratified by ``stratify_column`` if it is set.
+        If ``drifted_columns_only`` is set, the report only covers the columns
+        in which drift was detected and the stratify column.
+
         Args:
             pred_df (pandas.DataFrame): DataFrame containing the prediction data.
             train_df (pandas.DataFrame): DataFrame containing the training data.
@@ -182,6 +544,43 @@ class DataValidation:
         Returns:
             None
         """
+        report_config = self.validation_config["report"]
+        stratify_column = report_config["stratify_column"]
+        if report_config["sample_rows"] and stratify_column not in pred_df.columns:
+            if stratify_column is not None:
+                logging.warning(
+                    "Stratify column %s not found, sampling without stratification",
+                    stratify_column,
+                )
+            stratify_column = None
+        start_time = time.perf_counter()
+
+        if report_config["drifted_columns_only"]:
+            drifted_columns = [
+                column_drift.column
+                for column_drift in self.evaluate_drift(
+                    pred_df, train_df
+                ).drifted_columns
+            ]
+            if drifted_columns:
+                if stratify_column is not None and (
+                    stratify_column not in drifted_columns
+                ):
+                    drifted_columns.append(stratify_column)
+                pred_df = pred_df[drifted_columns]
+                train_df = train_df[drifted_columns]
+
+        if report_config["sample_rows"]:
+            pred_df, train_df = (
+                self.sample_rows(
+                    data,
+                    report_config["sample_rows"],
+                    report_config["seed"],
+                    stratify_column,
+                )
+                for data in (pred_df, train_df)
+            )
+
         report = Report(
             metrics=[
                 DataQualityPreset(),
@@ -198,3 +597,12 @@ class DataValidation:
         os.makedirs(dir_path, exist_ok=True)
         file_path = os.path.join(dir_path, "drift_report.html")
         report.save_html(file_path)
+
+        logging.info(
+            "Drift report of %d current and %d reference rows with %d columns "
+            "created in %.2f s",
+            len(pred_df),
+            len(train_df),
+            len(pred_df.columns),
+            time.perf_counter() - start_time,
+        )
@@ -0,0 +1,168 @@
+"""
+Drift Decision Module.
+
+This module decides which columns drifted and whether the data drifted as a whole,
+from the per-column drift test results. It corrects the p-values for testing many
+columns at once, applies effect-size floors and a drift-share threshold.
+
+Example:
+    from src.components.drift_decision import ColumnDrift, DriftDecision
+
+    decision = DriftDecision(alpha=0.05, correction="bh")
+    result = decision.decide([ColumnDrift("sensor", "Numerical", 0.2, 0.001, 0.2)])
+    if result:
+        print(result.drifted_columns)
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from src.errors.data_validation_errors import UnknownCorrectionError
+
+
+def _bonferroni(p_values) -> np.ndarray:
+    """
+    Bonferroni correction controlling the family-wise error rate.
+
+    Args:
+        p_values (numpy.ndarray): The p-values.
+
+    Returns:
+        numpy.ndarray: The adjusted p-values.
+    """
+    return np.minimum(p_values * len(p_values), 1)
+
+
+def _benjamini_hochberg(p_values) -> np.ndarray:
+    """
+    Benjamini-Hochberg correction controlling the false discovery rate.
+
+    Args:
+        p_values (numpy.ndarray): The p-values.
+
+    Returns:
+        numpy.ndarray: The adjusted p-values.
+    """
+    order = np.argsort(p_values)
+    ranked = p_values[order] * len(p_values) / np.arange(1, len(p_values) + 1)
+    adjusted = np.empty_like(ranked)
+    adjusted[order] = np.minimum.accumulate(ranked[::-1])[::-1]
+    return np.minimum(adjusted, 1)
+
+
+CORRECTIONS = {
+    "none": lambda p_values: p_values,
+    "bonferroni": _bonferroni,
+    "bh": _benjamini_hochberg,
+}
+
+
+# pylint: disable=R0902
+@dataclass
+class ColumnDrift:
+    """
+    Container for the drift test result of a single column.
+    """
+
+    column: str
+    kind: str
+    statistic: float
+    p_value: float
+    effect_size: Optional[float] = None
+    adjusted_p_value: float = np.nan
+    drifted: bool = False
+
+
+@dataclass
+class DriftResult:
+    """
+    Container for the drift decision over all columns.
+
+    Evaluates to True if drift was detected, so it can be used like the bool
+    returned by the drift checks before.
+    """
+
+    columns: List[ColumnDrift] = field(default_factory=list)
+    drift_share: float = 0.0
+    drift_detected: bool = False
+
+    def __bool__(self):
+        return self.drift_detected
+
+    @property
+    def drifted_columns(self) -> List[ColumnDrift]:
+        """
+        The results of the drifted columns, in column order.
+        """
+        return [column for column in self.columns if column.drifted]
+
+
+class DriftDecision:  # pylint: disable=R0903
+    """
+    Drift decision class.
+
+    A column drifted if its adjusted p-value is below ``alpha`` and its effect size
+    is at least ``effect_size_floor``. The data drifted if the share of drifted
+    columns is above ``drift_share``.
+
+    Attributes:
+        alpha (float): Significance level of the adjusted p-values.
+        correction (str): Multiple testing correction, "none", "bonferroni" or "bh".
+        effect_size_floor (float): Minimum effect size of a drifted column.
+        drift_share (float): Share of drifted columns above which the data drifted.
+    """
+
+    def __init__(
+        self, alpha, correction="none", effect_size_floor=0.0, drift_share=0.0
+    ):
+        """
+        Initialize the DriftDecision instance.
+
+        Args:
+            alpha (float): Significance level of the adjusted p-values.
+            correction (str): Multiple testing correction, "none", "bonferroni" or "bh".
+            effect_size_floor (float): Minimum effect size of a drifted column.
+            drift_share (float): Share of drifted columns above which the data drifted.
+        """
+        if correction not in CORRECTIONS:
+            raise UnknownCorrectionError(correction)
+
+        self.alpha = alpha
+        self.correction = correction
+        self.effect_size_floor = effect_size_floor
+        self.drift_share = drift_share
+
+    def decide(self, columns) -> DriftResult:
+        """
+        Decides which columns drifted and whether the data drifted.
+
+        Columns with a NaN p-value are not tested and never drift. Columns without
+        an effect size are not held to the effect-size floor.
+
+        Args:
+            columns (List[ColumnDrift]): The drift test results of all columns.
+
+        Returns:
+            DriftResult: The per-column results and the overall decision.
+        """
+        p_values = np.array([column.p_value for column in columns], dtype=np.float64)
+        tested = ~np.isnan(p_values)
+        adjusted = np.full_like(p_values, np.nan)
+        adjusted[tested] = CORRECTIONS[self.correction](p_values[tested])
+
+        for column, adjusted_p_value in zip(columns, adjusted):
+            column.adjusted_p_value = float(adjusted_p_value)
+            large_effect = (
+                column.effect_size is None
+                or column.effect_size >= self.effect_size_floor
+            )
+            column.drifted = bool(adjusted_p_value < self.alpha and large_effect)
+
+        n_drifted = sum(column.drifted for column in columns)
+        drift_share = n_drifted / len(columns) if columns else 0.0
+        return DriftResult(
+            columns=columns,
+            drift_share=drift_share,
+            drift_detected=n_drifted > 0 and drift_share > self.drift_share,
+        )
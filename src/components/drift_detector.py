@@ -0,0 +1,211 @@
+"""
+Online Drift Detector Module.
+
+This module provides a drift detector that summarizes streamed prediction data
+in fixed-size, mergeable per-column sketches, so drift can be checked over
+unbounded volumes in constant memory.
+
+Example:
+    from src.components.drift_detector import OnlineDriftDetector
+
+    detector = OnlineDriftDetector(reference_profile, n_bins=50)
+    for chunk in chunks:
+        detector.update(chunk)
+    print(detector.get_statistics())
+"""
+import numpy as np
+import pandas as pd
+from scipy.stats import kstwo
+
+from src.components.reference_profile import kruskal_from_counts, psi_from_counts
+from src.errors.data_validation_errors import SketchMergeError
+
+
+def _merge_counts(categories, counts, new_categories, new_counts):
+    """
+    Adds two sets of category counts.
+
+    Args:
+        categories (numpy.ndarray): Sorted unique categories.
+        counts (numpy.ndarray): Counts of the categories.
+        new_categories (numpy.ndarray): Sorted unique categories to be added.
+        new_counts (numpy.ndarray): Counts of the categories to be added.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: The sorted union of the categories
+            and their summed counts.
+    """
+    all_categories = np.union1d(categories, new_categories)
+    all_counts = np.zeros(len(all_categories), dtype=np.int64)
+    np.add.at(all_counts, np.searchsorted(all_categories, categories), counts)
+    np.add.at(all_counts, np.searchsorted(all_categories, new_categories), new_counts)
+    return all_categories, all_counts
+
+
+class OnlineDriftDetector:
+    """
+    Online drift detector class.
+
+    Numerical columns are counted in histograms whose bin edges are quantiles of
+    the reference data, categorical columns in exact category counts. The sketches
+    of detectors built from the same reference can be merged, so chunks can be
+    processed by several workers.
+
+    Attributes:
+        signature (str): Signature of the reference data.
+        edges (Dict[str, numpy.ndarray]): Bin edges of the numerical columns.
+        ref_counts (Dict[str, numpy.ndarray]): Reference bin counts of the
+            numerical columns.
+        counts (Dict[str, numpy.ndarray]): Bin counts of the numerical columns.
+        ref_categories (Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]): Reference
+            categories and counts of the categorical columns.
+        categories (Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]): Categories
+            and counts of the categorical columns.
+        n_rows (int): Number of rows seen.
+    """
+
+    def __init__(self, reference_profile, n_bins):
+        """
+        Initialize the OnlineDriftDetector instance.
+
+        Args:
+            reference_profile (ReferenceProfile): Profile of the reference data.
+            n_bins (int): Maximum number of histogram bins per numerical column.
+        """
+        self.signature = reference_profile.signature
+        self.edges = {}
+        self.ref_counts = {}
+        self.counts = {}
+        for column in reference_profile.sorted_values:
+            edges, ref_counts = reference_profile.get_bins(column, n_bins)
+            self.edges[column] = edges
+            self.ref_counts[column] = ref_counts
+            self.counts[column] = np.zeros(len(edges) + 1, dtype=np.int64)
+
+        self.ref_categories = dict(reference_profile.category_counts)
+        self.categories = {
+            column: (categories[:0], np.zeros(0, dtype=np.int64))
+            for column, (categories, _) in self.ref_categories.items()
+        }
+        self.n_rows = 0
+
+    def update(self, data):
+        """
+        Adds a chunk of data to the sketches. NaN values are not counted.
+
+        Args:
+            data (pandas.DataFrame): The chunk to be added.
+        """
+        for column, edges in self.edges.items():
+            values = data[column].to_numpy()
+            if values.dtype.kind == "f":
+                values = values[~np.isnan(values)]
+            bins = np.searchsorted(edges, values, side="right")
+            self.counts[column] += np.bincount(bins, minlength=len(edges) + 1)
+
+        for column, (categories, counts) in self.categories.items():
+            values = data[column].dropna().to_numpy()
+            new_categories, new_counts = np.unique(values, return_counts=True)
+            self.categories[column] = _merge_counts(
+                categories, counts, new_categories, new_counts
+            )
+
+        self.n_rows += len(data)
+
+    def merge(self, other) -> "OnlineDriftDetector":
+        """
+        Merges the sketches of another detector into this one.
+
+        Args:
+            other (OnlineDriftDetector): A detector built from the same reference.
+
+        Returns:
+            OnlineDriftDetector: This detector.
+        """
+        if other.signature != self.signature or any(
+            not np.array_equal(edges, other.edges[column])
+            for column, edges in self.edges.items()
+        ):
+            raise SketchMergeError
+
+        for column, counts in other.counts.items():
+            self.counts[column] += counts
+        for column, (categories, counts) in other.categories.items():
+            self.categories[column] = _merge_counts(
+                *self.categories[column], categories, counts
+            )
+        self.n_rows += other.n_rows
+        return self
+
+    def _numerical_statistics(self, column) -> tuple:
+        """
+        Computes the KS statistic, its p-value and the PSI of a numerical column.
+
+        Args:
+            column (str): Name of the column.
+
+        Returns:
+            tuple: The test name, statistic, p-value and PSI.
+        """
+        counts, ref_counts = self.counts[column], self.ref_counts[column]
+        n_values, n_reference = counts.sum(), ref_counts.sum()
+        if n_values == 0:
+            return "ks", np.nan, np.nan, np.nan
+
+        cdf = np.cumsum(counts)[:-1] / n_values
+        ref_cdf = np.cumsum(ref_counts)[:-1] / n_reference
+        statistic = float(np.max(np.abs(cdf - ref_cdf), initial=0))
+        effective_n = n_values * n_reference / (n_values + n_reference)
+        p_value = float(np.clip(kstwo.sf(statistic, np.round(effective_n)), 0, 1))
+        return "ks", statistic, p_value, psi_from_counts(counts, ref_counts)
+
+    def _categorical_statistics(self, column) -> tuple:
+        """
+        Computes the Kruskal-Wallis H statistic, its p-value and the PSI of a
+        categorical column.
+
+        Args:
+            column (str): Name of the column.
+
+        Returns:
+            tuple: The test name, statistic, p-value and PSI.
+        """
+        categories, counts = self.categories[column]
+        ref_categories, ref_counts = self.ref_categories[column]
+        if counts.sum() == 0:
+            return "kruskal", np.nan, np.nan, np.nan
+
+        all_categories = np.union1d(categories, ref_categories)
+        group_counts = np.zeros((2, len(all_categories)))
+        group_counts[0, np.searchsorted(all_categories, categories)] = counts
+        group_counts[1, np.searchsorted(all_categories, ref_categories)] = ref_counts
+        statistic, p_value = kruskal_from_counts(group_counts)
+        return (
+            "kruskal",
+            statistic,
+            p_value,
+            psi_from_counts(group_counts[0], group_counts[1]),
+        )
+
+    def get_statistics(self) -> pd.DataFrame:
+        """
+        Computes the drift statistics of every column from the sketches.
+
+        Numerical columns get a KS statistic, the largest CDF difference at the bin
+        edges, with its asymptotic p-value. Categorical columns get the exact
+        Kruskal-Wallis H-test from the category counts. All columns get the PSI.
+
+        Returns:
+            pandas.DataFrame: The test, statistic, p_value and psi of every column.
+        """
+        statistics = {
+            column: self._numerical_statistics(column) for column in self.counts
+        }
+        statistics.update(
+            (column, self._categorical_statistics(column)) for column in self.categories
+        )
+        return pd.DataFrame.from_dict(
+            statistics,
+            orient="index",
+            columns=["test", "statistic", "p_value", "psi"],
+        )
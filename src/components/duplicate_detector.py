@@ -0,0 +1,102 @@
+"""
+Duplicate Detector Module.
+
+This module provides a duplicate row detector that keeps only a 64-bit hash per
+unique row, so duplicates can be found across chunks, files or SQL batches
+without holding the rows in memory.
+
+Example:
+    from src.components.duplicate_detector import DuplicateDetector
+
+    detector = DuplicateDetector()
+    for chunk in chunks:
+        unique_chunk = chunk[~detector.update(chunk)]
+"""
+import numpy as np
+import pandas as pd
+
+
+def hash_rows(data) -> np.ndarray:
+    """
+    Hashes every row of a DataFrame to a 64-bit integer.
+
+    Rows with equal values and dtypes get equal hashes, NaN values are equal to
+    each other like in ``DataFrame.duplicated``. The index is ignored.
+
+    Args:
+        data (pandas.DataFrame): The data to be hashed.
+
+    Returns:
+        numpy.ndarray: The uint64 hash of every row.
+    """
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+class DuplicateDetector:
+    """
+    Streaming duplicate detector class.
+
+    The hashes of the seen rows are kept in sorted runs whose sizes at least
+    double from the newest to the oldest, so adding a chunk merges only a few
+    small runs and a lookup searches a logarithmic number of them. Different
+    rows collide with a probability of about n^2 / 2^65 for n unique rows.
+
+    Attributes:
+        runs (List[numpy.ndarray]): Sorted, disjoint runs of the seen row hashes.
+    """
+
+    def __init__(self):
+        """
+        Initialize the DuplicateDetector instance.
+        """
+        self.runs = []
+
+    @property
+    def n_unique(self) -> int:
+        """
+        Number of unique rows seen.
+        """
+        return sum(len(run) for run in self.runs)
+
+    def _seen(self, hashes) -> np.ndarray:
+        """
+        Checks which hashes were seen in earlier chunks.
+
+        Args:
+            hashes (numpy.ndarray): The hashes to be looked up.
+
+        Returns:
+            numpy.ndarray: True for every hash that was seen.
+        """
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            seen |= run[positions] == hashes
+        return seen
+
+    def update(self, data) -> np.ndarray:
+        """
+        Adds a chunk of data and marks its duplicate rows.
+
+        A row is a duplicate if an equal row was seen in an earlier chunk or
+        earlier in this chunk, so the first occurrence of a row is kept like
+        in ``DataFrame.duplicated``.
+
+        Args:
+            data (pandas.DataFrame): The chunk to be added.
+
+        Returns:
+            numpy.ndarray: The boolean duplicate mask of the rows of the chunk.
+        """
+        hashes = hash_rows(data)
+        duplicated = pd.Series(hashes).duplicated().to_numpy()
+        duplicated |= self._seen(hashes)
+
+        run = np.sort(hashes[~duplicated])
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.concatenate((self.runs.pop(), run))
+            run.sort(kind="mergesort")
+        if len(run):
+            self.runs.append(run)
+        return duplicated
@@ -0,0 +1,139 @@
+"""
+Feature Pipeline Module.
+
+This module provides the fitted feature pipeline, which captures everything
+that serving needs to know about the training data: the selected feature
+columns and their dtypes, the target names, the fitted imputer and the
+reference profile for the drift checks. It is logged to MLflow with the models,
+so prediction runs neither read the training data nor re-derive the selection
+from the config.
+
+Example:
+    from src.components.feature_pipeline import FeaturePipeline
+
+    feature_pipeline = FeaturePipeline(ref_profile, imputer)
+    selected_df = feature_pipeline.select(pred_df)
+"""
+import pickle
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.components.imputer import Imputer
+from src.components.reference_profile import ReferenceProfile
+from src.errors.data_transformation_errors import FeaturePipelineVersionError
+from src.errors.data_validation_errors import ColumnsDiffError
+
+# Location of the feature pipeline in the MLflow run of the models
+PREPROCESSING_PATH = "preprocessing"
+FEATURE_PIPELINE_ARTIFACT = "feature_pipeline.pkl"
+
+# Bumped when stored feature pipelines become incompatible
+FEATURE_PIPELINE_VERSION = 1
+
+
+@dataclass
+class FeaturePipeline:
+    """
+    Container for the fitted feature pipeline.
+
+    Attributes:
+        reference_profile (ReferenceProfile): Profile of the validated training
+            features, with their schema and the target names.
+        imputer (Imputer): Imputer fitted on the training features, None to fit
+            one on the prediction data.
+        version (int): Version of the feature pipeline format.
+    """
+
+    reference_profile: ReferenceProfile
+    imputer: Optional[Imputer] = None
+    version: int = FEATURE_PIPELINE_VERSION
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """
+        Names of the feature columns in training order.
+        """
+        return list(self.reference_profile.schema.columns)
+
+    @property
+    def dtypes(self) -> Dict[str, str]:
+        """
+        Training dtype of every feature column.
+        """
+        schema = self.reference_profile.schema
+        return dict(zip(schema.columns, schema.dtypes))
+
+    @property
+    def target_columns(self) -> List[str]:
+        """
+        Names of the target columns the models predict.
+        """
+        return self.reference_profile.target_columns
+
+    @property
+    def signature(self) -> Tuple:
+        """
+        Identity of the feature pipeline: its version, the signature and the
+        schema digest of the reference profile, the target names and the digest
+        of the fitted imputer.
+        """
+        profile = self.reference_profile
+        return (
+            self.version,
+            profile.signature,
+            profile.schema.digest,
+            tuple(profile.target_columns),
+            None if self.imputer is None else self.imputer.digest(),
+        )
+
+    def select(self, data) -> pd.DataFrame:
+        """
+        Selects the feature columns of the data in training order and casts
+        downcast columns to their training dtypes.
+
+        Args:
+            data (pandas.DataFrame): The data to be processed.
+
+        Returns:
+            pandas.DataFrame: The feature columns of the data.
+        """
+        positions = data.columns.get_indexer(self.feature_columns)
+        if (positions < 0).any():
+            missing = [
+                column
+                for column, position in zip(self.feature_columns, positions)
+                if position < 0
+            ]
+            raise ColumnsDiffError(f"missing columns {missing}")
+        return self.reference_profile.schema.conform(data.iloc[:, positions])
+
+    def save(self, path):
+        """
+        Saves the feature pipeline to a file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path) -> "FeaturePipeline":
+        """
+        Loads a feature pipeline from a file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            FeaturePipeline: The loaded feature pipeline.
+        """
+        with open(path, "rb") as file:
+            feature_pipeline = pickle.load(file)
+        if feature_pipeline.version != FEATURE_PIPELINE_VERSION:
+            raise FeaturePipelineVersionError(
+                feature_pipeline.version, FEATURE_PIPELINE_VERSION
+            )
+        return feature_pipeline
@@ -0,0 +1,270 @@
+"""
+Imputer Module.
+
+This module provides the imputation backends used to fill NaN values. An imputer
+is fitted once on the training data, persisted with the feature pipeline and then
+applied to every prediction batch as a fast transform.
+
+Supported methods:
+
+- median: Fills every column with its training median.
+- knn: Fills NaN values from the nearest training rows (scikit-learn KNNImputer).
+- mice: Fills NaN values with a fitted miceforest kernel through
+  ``impute_new_data``. By default the kernel models only the columns that had
+  NaN values in the training data and all other columns are filled with their
+  training median.
+
+Example:
+    from src.components.imputer import create_imputer
+
+    imputer = create_imputer({"method": "median"}).fit(train_df)
+    imputed_df = imputer.transform(pred_df)
+"""
+import hashlib
+import pickle
+
+import miceforest as mf
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer as SklearnKNNImputer
+
+from src.errors.data_transformation_errors import UnknownImputerError
+
+# Seed of the random parts of the imputation, so imputed values are reproducible
+RANDOM_STATE = 42
+
+
+class Imputer:
+    """
+    Base imputer class.
+
+    Attributes:
+        columns (List[str]): The columns the imputer was fitted on.
+        medians (numpy.ndarray): The training median of every column.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Imputer instance.
+        """
+        self.columns = []
+        self.medians = np.zeros(0)
+
+    def fit(self, data) -> "Imputer":
+        """
+        Fits the imputer on the training data.
+
+        Args:
+            data (pandas.DataFrame): The training data.
+
+        Returns:
+            Imputer: This imputer.
+        """
+        self.columns = data.columns.tolist()
+        self.medians = np.nanmedian(data.to_numpy(dtype=np.float64), axis=0)
+        return self
+
+    def _impute(self, values) -> np.ndarray:
+        """
+        Fills the NaN values of an array with the training medians.
+
+        Args:
+            values (numpy.ndarray): The float array to be imputed.
+
+        Returns:
+            numpy.ndarray: The imputed array.
+        """
+        rows, cols = np.nonzero(np.isnan(values))
+        values[rows, cols] = self.medians[cols]
+        return values
+
+    def transform(self, data) -> pd.DataFrame:
+        """
+        Fills the NaN values of the data.
+
+        Args:
+            data (pandas.DataFrame): The data to be imputed, with the training columns.
+
+        Returns:
+            pandas.DataFrame: The imputed data with a new range index.
+        """
+        values = data[self.columns].to_numpy(dtype=np.float64, copy=True)
+        return pd.DataFrame(self._impute(values), columns=self.columns)
+
+    def fit_transform(self, data) -> pd.DataFrame:
+        """
+        Fits the imputer on the data and fills its NaN values.
+
+        Args:
+            data (pandas.DataFrame): The data to be imputed.
+
+        Returns:
+            pandas.DataFrame: The imputed data with a new range index.
+        """
+        return self.fit(data).transform(data)
+
+    def digest(self) -> str:
+        """
+        Computes a digest of the imputer and its fitted parameters.
+
+        Returns:
+            str: The SHA-256 hex digest of the pickled imputer.
+        """
+        pickled = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        return hashlib.sha256(pickled).hexdigest()
+
+    def save(self, path):
+        """
+        Saves the imputer to a file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path) -> "Imputer":
+        """
+        Loads an imputer from a file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            Imputer: The loaded imputer.
+        """
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+
+class MedianImputer(Imputer):
+    """
+    Median imputer class. Fills every column with its training median.
+    """
+
+
+class KNNImputer(Imputer):
+    """
+    KNN imputer class. Fills NaN values with the mean of the nearest training rows.
+
+    Attributes:
+        knn (sklearn.impute.KNNImputer): The fitted scikit-learn imputer.
+    """
+
+    def __init__(self, n_neighbors=5):
+        """
+        Initialize the KNNImputer instance.
+
+        Args:
+            n_neighbors (int): Number of neighboring rows.
+        """
+        super().__init__()
+        self.knn = SklearnKNNImputer(n_neighbors=n_neighbors, keep_empty_features=True)
+
+    def fit(self, data) -> "KNNImputer":
+        super().fit(data)
+        self.knn.fit(data.to_numpy(dtype=np.float64))
+        return self
+
+    def _impute(self, values) -> np.ndarray:
+        return self.knn.transform(values)
+
+
+class MiceImputer(Imputer):
+    """
+    MICE imputer class. Fills NaN values with a miceforest kernel fitted on the
+    training data.
+
+    Attributes:
+        iterations (int): Number of MICE iterations.
+        save_all_iterations (bool): Whether the imputed values of all iterations
+            are kept instead of only the last ones.
+        nan_columns_only (bool): Whether models are trained only for the columns
+            with NaN values in the training data. Other columns are then
+            imputed with their training median.
+        workers (int): Number of LightGBM threads.
+        kernel (miceforest.ImputationKernel): The fitted kernel.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self, iterations=10, save_all_iterations=False, nan_columns_only=True, workers=1
+    ):
+        """
+        Initialize the MiceImputer instance.
+
+        Args:
+            iterations (int): Number of MICE iterations.
+            save_all_iterations (bool): Whether the imputed values of all
+                iterations are kept.
+            nan_columns_only (bool): Whether models are trained only for the
+                columns with NaN values in the training data.
+            workers (int): Number of LightGBM threads.
+        """
+        super().__init__()
+        self.iterations = iterations
+        self.save_all_iterations = save_all_iterations
+        self.nan_columns_only = nan_columns_only
+        self.workers = workers
+        self.kernel = None
+
+    def fit(self, data) -> "MiceImputer":
+        super().fit(data)
+        # The float copy is owned by the kernel, so it does not copy it again
+        self.kernel = mf.ImputationKernel(
+            data.to_numpy(dtype=np.float64, copy=True),
+            train_nonmissing=not self.nan_columns_only,
+            save_all_iterations=self.save_all_iterations,
+            copy_data=False,
+            random_state=RANDOM_STATE,
+        )
+        self.kernel.mice(self.iterations, num_threads=self.workers)
+        return self
+
+    def _impute(self, values) -> np.ndarray:
+        # Columns without a kernel model are filled with their training median
+        modeled = np.zeros(len(self.columns), dtype=bool)
+        modeled[list(self.kernel.variable_training_order)] = True
+        rows, cols = np.nonzero(np.isnan(values) & ~modeled)
+        values[rows, cols] = self.medians[cols]
+        if not np.isnan(values).any():
+            return values
+        imputed = self.kernel.impute_new_data(
+            values,
+            save_all_iterations=self.save_all_iterations,
+            copy_data=False,
+            random_state=RANDOM_STATE,
+        )
+        return imputed.complete_data()
+
+    def fit_transform(self, data) -> pd.DataFrame:
+        self.fit(data)
+        return pd.DataFrame(self.kernel.complete_data(), columns=self.columns)
+
+
+IMPUTERS = {
+    "median": lambda config: MedianImputer(),
+    "knn": lambda config: KNNImputer(config.get("n_neighbors", 5)),
+    "mice": lambda config: MiceImputer(
+        config.get("iterations", 10),
+        config.get("save_all_iterations", False),
+        config.get("nan_columns_only", True),
+        config.get("workers", 1),
+    ),
+}
+
+
+def create_imputer(config) -> Imputer:
+    """
+    Creates an unfitted imputer of the configured method.
+
+    Args:
+        config (dict): The imputation config with the ``method`` and its parameters.
+
+    Returns:
+        Imputer: The unfitted imputer.
+    """
+    if config["method"] not in IMPUTERS:
+        raise UnknownImputerError(config["method"])
+    return IMPUTERS[config["method"]](config)
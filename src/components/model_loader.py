@@ -6,10 +6,17 @@ from the MLFlow model registry.
 """
 
 import ast
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import mlflow
 
+from src.components.feature_pipeline import (
+    FEATURE_PIPELINE_ARTIFACT,
+    PREPROCESSING_PATH,
+    FeaturePipeline,
+)
+from src.errors.data_transformation_errors import FeaturePipelineMismatchError
+
 
 # pylint: disable=R0903
 class Predictor:
@@ -17,13 +24,15 @@ class Predictor:
     A class for making ensemble predictions using MLFlow models and weights.
     """
 
-    def __init__(self, models, weights):
+    def __init__(self, models, weights, feature_pipeline=None):
         """
         Initialize the Predictor.
 
         Args:
             models (dict): Dictionary of MLFlow models.
             weights (dict): Dictionary of model weights.
+            feature_pipeline (FeaturePipeline): Feature pipeline fitted on the
+                training data. (Optional)
         """
         if len(models) == 0 or len(weights) == 0:
             raise ValueError("Models and weights must not be empty")
@@ -33,6 +42,16 @@ class Predictor:
 
         self.models = models
         self.weights = weights
+        self.feature_pipeline = feature_pipeline
+
+    @property
+    def imputer(self):
+        """
+        Imputer fitted on the training features, None if there is none.
+        """
+        if self.feature_pipeline is None:
+            return None
+        return self.feature_pipeline.imputer
 
     def predict(self, input_data):
         """
@@ -71,6 +90,7 @@ def get_models(model_names: Tuple[str] = ("xgb", "rf")) -> Predictor:
     """
     models = {}
     weights = []
+    feature_pipelines = {}
 
     for model_name in model_names:
         latest_versions = mlflow.tracking.MlflowClient().get_latest_versions(
@@ -100,9 +120,61 @@ def get_models(model_names: Tuple[str] = ("xgb", "rf")) -> Predictor:
             except:  # pylint: disable=W0702
                 pass
 
+            if latest_version.run_id not in feature_pipelines:
+                feature_pipelines[latest_version.run_id] = load_feature_pipeline(
+                    latest_version.run_id
+                )
+
     weight = check_weights(weights, model_names)
 
-    return Predictor(models, weight)
+    return Predictor(models, weight, check_feature_pipelines(feature_pipelines))
+
+
+def load_feature_pipeline(run_id: str) -> Optional[FeaturePipeline]:
+    """
+    Load the feature pipeline logged with the models of an MLFlow run.
+
+    Args:
+        run_id (str): ID of the MLFlow run.
+
+    Returns:
+        FeaturePipeline: The fitted feature pipeline, None if the run has none.
+    """
+    try:
+        pipeline_path = mlflow.artifacts.download_artifacts(
+            run_id=run_id,
+            artifact_path=f"{PREPROCESSING_PATH}/{FEATURE_PIPELINE_ARTIFACT}",
+        )
+    except mlflow.exceptions.MlflowException:
+        return None
+    return FeaturePipeline.load(pipeline_path)
+
+
+def check_feature_pipelines(
+    feature_pipelines: Dict[str, Optional[FeaturePipeline]]
+) -> Optional[FeaturePipeline]:
+    """
+    Check that the runs of the models logged the same feature pipeline.
+
+    Models retrained on their own are logged in a new run, so their feature
+    pipeline can differ from the one of the other models. The pipelines are
+    compared by their signature, which covers the reference profile, the
+    targets and the fitted imputer.
+
+    Args:
+        feature_pipelines (Dict[str, Optional[FeaturePipeline]]): Feature
+            pipeline of every MLFlow run, None for runs without one.
+
+    Returns:
+        FeaturePipeline: The shared feature pipeline, None if the runs have none.
+    """
+    signatures = {
+        run_id: None if feature_pipeline is None else feature_pipeline.signature
+        for run_id, feature_pipeline in feature_pipelines.items()
+    }
+    if len(set(signatures.values())) > 1:
+        raise FeaturePipelineMismatchError(signatures)
+    return next(iter(feature_pipelines.values()), None)
 
 
 def check_weights(weights: List[dict], model_names: Tuple[str]) -> dict:
@@ -16,6 +16,7 @@ import os
 import shutil
 import subprocess
 import sys
+import tempfile
 
 import matplotlib.pyplot as plt
 import mlflow
@@ -31,6 +32,11 @@ from sklearn.model_selection import KFold
 from xgboost import XGBRegressor
 
 from src.components.data_transformation import TrainTestData
+from src.components.feature_pipeline import (
+    FEATURE_PIPELINE_ARTIFACT,
+    PREPROCESSING_PATH,
+    FeaturePipeline,
+)
 from src.errors.model_training_errors import (
     EnsembleMetricsError,
     PlotError,
@@ -46,15 +52,20 @@ class ModelTrainer:
     Class for training and evaluating machine learning models.
     """
 
-    def __init__(self, train_test_data: TrainTestData):
+    def __init__(
+        self, train_test_data: TrainTestData, feature_pipeline: FeaturePipeline = None
+    ):
         """
         Initialize the ModelTrainer.
 
         Args:
             train_test_data (TrainTestData): Data for training and testing.
+            feature_pipeline (FeaturePipeline): Feature pipeline fitted on the
+                training data, logged with the models. (Optional)
         """
         self.current_model_name = None
         self.data = train_test_data
+        self.feature_pipeline = feature_pipeline
         self.git_hash = self._get_git_hash()
         self.train_config = get_cfg("components/model_training.yaml")
         self.explainability_path = os.path.join(
@@ -366,6 +377,9 @@ class ModelTrainer:
             mlflow.log_metric(f"{model_name}_test_r2_microbiology", r2[0])
             mlflow.log_metric(f"{model_name}_test_r2_energy", r2[1])
 
+            if self.feature_pipeline is not None:
+                self.log_feature_pipeline()
+
             if self.data.feature_names is not None:
                 self.feature_importance_plot(best_model, model_name)
 
@@ -382,6 +396,22 @@ class ModelTrainer:
             )
             raise TrainLogError(error_message, sys) from error_message
 
+    def log_feature_pipeline(self):
+        """
+        Log the feature pipeline to the active MLflow run, so it is loaded with
+        the models.
+        """
+        mlflow.log_params(
+            {
+                "feature_pipeline_version": self.feature_pipeline.version,
+                "feature_schema": self.feature_pipeline.reference_profile.schema.digest,
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pipeline_path = os.path.join(tmp_dir, FEATURE_PIPELINE_ARTIFACT)
+            self.feature_pipeline.save(pipeline_path)
+            mlflow.log_artifact(pipeline_path, artifact_path=PREPROCESSING_PATH)
+
     def regression_report(self, train_pred, test_pred, model_name):
         """
         This method is responsible for generating regression report and saving it
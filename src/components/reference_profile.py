@@ -0,0 +1,507 @@
+"""
+Reference Profile Module.
+
+This module provides precomputed statistics of the reference (training) data,
+so drift checks only have to process the incoming batch.
+
+Example:
+    from src.components.reference_profile import ReferenceProfile
+
+    profile = ReferenceProfile.from_data(train_df, cat_cols=["category"])
+    statistic, p_value = profile.ks_test("sensor", pred_df["sensor"])
+"""
+import hashlib
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, ks_2samp, kstwo
+
+# ks_2samp computes exact p-values up to this sample size and asymptotic ones above
+MAX_EXACT_KS_SIZE = 10000
+
+# Part of the profile signatures, bumped when cached profiles become incompatible
+PROFILE_VERSION = 2
+
+# Floor of the bin proportions in the PSI, so empty bins do not divide by zero
+PSI_EPSILON = 1e-4
+
+
+def _has_nan(values) -> bool:
+    """
+    Checks whether a numpy array contains NaN values.
+
+    Args:
+        values (numpy.ndarray): The array to be checked.
+
+    Returns:
+        bool: True if a NaN value is present, false otherwise
+    """
+    return values.dtype.kind == "f" and bool(np.isnan(values).any())
+
+
+def _count_groups(values, ref_categories, ref_counts) -> np.ndarray:
+    """
+    Counts the batch and the reference values of every category.
+
+    Args:
+        values (numpy.ndarray): Values of the batch.
+        ref_categories (numpy.ndarray): Sorted unique values of the reference.
+        ref_counts (numpy.ndarray): Counts of the reference values.
+
+    Returns:
+        numpy.ndarray: The batch (first row) and the reference (second row) counts
+            of all categories in sorted order.
+    """
+    categories, counts = np.unique(values, return_counts=True)
+    all_categories = np.union1d(ref_categories, categories)
+    group_counts = np.zeros((2, len(all_categories)))
+    group_counts[0, np.searchsorted(all_categories, categories)] = counts
+    group_counts[1, np.searchsorted(all_categories, ref_categories)] = ref_counts
+    return group_counts
+
+
+def kruskal_from_counts(group_counts) -> Tuple[float, float]:
+    """
+    Kruskal-Wallis H-test computed from the value counts of the groups.
+
+    Args:
+        group_counts (numpy.ndarray): Counts of every group (rows) for every
+            distinct value in sorted order (columns).
+
+    Returns:
+        Tuple[float, float]: The H statistic and its p-value, NaN if all values
+            are identical.
+    """
+    totals = group_counts.sum(axis=0)
+    n_total = totals.sum()
+    tie_correction = 1 - np.sum(totals**3 - totals) / (n_total**3 - n_total)
+    if tie_correction == 0:
+        return np.nan, np.nan
+
+    # Tied values share the average of the ranks they occupy
+    ranks = np.cumsum(totals) - (totals - 1) / 2
+    rank_sums = group_counts @ ranks
+    statistic = 12 / (n_total * (n_total + 1)) * np.sum(
+        rank_sums**2 / group_counts.sum(axis=1)
+    ) - 3 * (n_total + 1)
+    statistic /= tie_correction
+    return float(statistic), float(chi2.sf(statistic, len(group_counts) - 1))
+
+
+def psi_from_counts(counts, ref_counts) -> float:
+    """
+    Population stability index between two binned distributions.
+
+    Args:
+        counts (numpy.ndarray): Bin counts of the current data.
+        ref_counts (numpy.ndarray): Bin counts of the reference data.
+
+    Returns:
+        float: The PSI, NaN if there is no current data.
+    """
+    if counts.sum() == 0:
+        return np.nan
+    proportions = np.clip(counts / counts.sum(), PSI_EPSILON, None)
+    ref_proportions = np.clip(ref_counts / ref_counts.sum(), PSI_EPSILON, None)
+    return float(
+        np.sum((proportions - ref_proportions) * np.log(proportions / ref_proportions))
+    )
+
+
+def hash_data(data) -> str:
+    """
+    Computes a hash of the data content and the schema.
+
+    Args:
+        data (pandas.DataFrame): The data.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    data_hash = hashlib.sha256()
+    data_hash.update(pd.util.hash_pandas_object(data, index=False).to_numpy())
+    data_hash.update(repr(list(zip(data.columns, data.dtypes.astype(str)))).encode())
+    return data_hash.hexdigest()
+
+
+def _dtype_kind(dtype) -> str:
+    """
+    Maps a dtype to its kind, which the ingest downcasting does not change.
+
+    Args:
+        dtype (str | numpy.dtype): The dtype.
+
+    Returns:
+        str: "float", "int", "object" for strings and categoricals, or the
+            dtype name for other dtypes.
+    """
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+        return "object"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return "int"
+    return str(dtype)
+
+
+# Kinds of batch columns that are cast to the kind of the reference column
+CONFORMABLE_KINDS = {
+    ("float", "float"),
+    ("int", "int"),
+    ("int", "float"),
+    ("object", "object"),
+}
+
+
+@dataclass(frozen=True)
+class SchemaFingerprint:
+    """
+    Hashable fingerprint of the column names, their order and their dtypes.
+    """
+
+    columns: Tuple[str, ...]
+    dtypes: Tuple[str, ...]
+
+    @classmethod
+    def from_data(cls, data) -> "SchemaFingerprint":
+        """
+        Computes the fingerprint of a DataFrame.
+
+        Args:
+            data (pandas.DataFrame): The data.
+
+        Returns:
+            SchemaFingerprint: The schema fingerprint of the data.
+        """
+        return cls(tuple(data.columns), tuple(data.dtypes.astype(str)))
+
+    @property
+    def digest(self) -> str:
+        """
+        Short hex digest of the fingerprint, e.g. for logging.
+        """
+        return hashlib.sha256(repr(self).encode()).hexdigest()[:16]
+
+    def conform(self, data) -> pd.DataFrame:
+        """
+        Casts the columns of the data whose dtypes differ from the fingerprint
+        only in their size or representation (e.g. float32 instead of float64,
+        or category instead of object) to the fingerprint dtypes. Batches that
+        were downcast on their own then match the schema of the reference.
+        Other dtype differences are kept, so the schema check reports them.
+
+        Args:
+            data (pandas.DataFrame): The data.
+
+        Returns:
+            pandas.DataFrame: The data with the conformed dtypes.
+        """
+        expected_dtypes = dict(zip(self.columns, self.dtypes))
+        casts = {}
+        for column, dtype in data.dtypes.items():
+            expected = expected_dtypes.get(column)
+            if expected is None or str(dtype) == expected:
+                continue
+            if (_dtype_kind(dtype), _dtype_kind(expected)) in CONFORMABLE_KINDS:
+                casts[column] = expected
+        return data.astype(casts) if casts else data
+
+    def diff(self, expected) -> List[str]:
+        """
+        Describes the differences to the expected schema.
+
+        Args:
+            expected (SchemaFingerprint): The expected schema.
+
+        Returns:
+            List[str]: One message per difference, empty if the schemas are equal.
+        """
+        differences = []
+        missing = [col for col in expected.columns if col not in self.columns]
+        unexpected = [col for col in self.columns if col not in expected.columns]
+        if missing:
+            differences.append(f"missing columns {missing}")
+        if unexpected:
+            differences.append(f"unexpected columns {unexpected}")
+        if not missing and not unexpected and self.columns != expected.columns:
+            differences.append("columns are in a different order")
+
+        expected_dtypes = dict(zip(expected.columns, expected.dtypes))
+        differences.extend(
+            f"column {col} has dtype {dtype} instead of {expected_dtypes[col]}"
+            for col, dtype in zip(self.columns, self.dtypes)
+            if col in expected_dtypes and dtype != expected_dtypes[col]
+        )
+        return differences
+
+
+# pylint: disable=R0902
+@dataclass
+class ReferenceProfile:
+    """
+    Container for the statistics of the reference data that drift checks need.
+
+    Attributes:
+        schema (SchemaFingerprint): Schema of the reference data.
+        signature (str): Hash of the reference data content and schema.
+        n_rows (int): Number of rows of the reference data.
+        sorted_values (Dict[str, numpy.ndarray]): Sorted values of the numerical columns.
+        category_counts (Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]): Unique
+            values and their counts of the categorical columns.
+        nan_columns (Set[str]): Columns that contain NaN values.
+        target_columns (List[str]): Names of the target columns the reference
+            data was selected from, empty if unknown.
+    """
+
+    schema: SchemaFingerprint
+    signature: str
+    n_rows: int
+    sorted_values: Dict[str, np.ndarray]
+    category_counts: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    nan_columns: Set[str]
+    target_columns: List[str] = field(default_factory=list)
+
+    @staticmethod
+    def compute_signature(data, cat_cols, data_digest=None) -> str:
+        """
+        Computes a hash of the data content, the schema and the categorical columns.
+
+        Args:
+            data (pandas.DataFrame): The reference data.
+            cat_cols (List[str]): Names of the categorical columns.
+            data_digest (str, optional): Digest of the data from ``hash_data``,
+                computed if not given.
+
+        Returns:
+            str: The SHA-256 hex digest.
+        """
+        data_hash = hashlib.sha256(f"v{PROFILE_VERSION}".encode())
+        data_hash.update((data_digest or hash_data(data)).encode())
+        data_hash.update(repr(list(cat_cols)).encode())
+        return data_hash.hexdigest()
+
+    @classmethod
+    def from_data(cls, data, cat_cols, signature=None) -> "ReferenceProfile":
+        """
+        Builds the profile of the reference data.
+
+        Args:
+            data (pandas.DataFrame): The reference data.
+            cat_cols (List[str]): Names of the categorical columns.
+            signature (str, optional): The precomputed signature of the data.
+
+        Returns:
+            ReferenceProfile: The profile of the reference data.
+        """
+        sorted_values = {}
+        category_counts = {}
+        nan_columns = set()
+        for column in data.columns:
+            values = data[column].to_numpy()
+            if _has_nan(values):
+                nan_columns.add(column)
+            if column in cat_cols:
+                category_counts[column] = np.unique(values, return_counts=True)
+            else:
+                sorted_values[column] = np.sort(values)
+
+        return cls(
+            schema=SchemaFingerprint.from_data(data),
+            signature=signature or cls.compute_signature(data, cat_cols),
+            n_rows=len(data),
+            sorted_values=sorted_values,
+            category_counts=category_counts,
+            nan_columns=nan_columns,
+        )
+
+    def save(self, path):
+        """
+        Saves the profile to a file.
+
+        Args:
+            path (str): Path of the file.
+        """
+        with open(path, "wb") as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(path) -> "ReferenceProfile":
+        """
+        Loads a profile from a file.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            ReferenceProfile: The loaded profile.
+        """
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def _get_numeric_values(self, column) -> np.ndarray:
+        """
+        Gets the sorted values of a numerical reference column without NaN values.
+
+        Args:
+            column (str): Name of the reference column.
+
+        Returns:
+            numpy.ndarray: The sorted values.
+        """
+        reference = self.sorted_values[column]
+        if column in self.nan_columns:
+            # NaN values are sorted to the end
+            return reference[: np.searchsorted(np.isnan(reference), True)]
+        return reference
+
+    def get_bins(self, column, n_bins) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Splits a numerical reference column into bins of about equal counts.
+
+        Bin ``i`` holds the values in ``[edges[i - 1], edges[i])``, the first and
+        the last bin are open-ended.
+
+        Args:
+            column (str): Name of the reference column.
+            n_bins (int): Maximum number of bins. Tied values can merge bins.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The inner bin edges and the
+                reference count of every bin.
+        """
+        reference = self._get_numeric_values(column)
+        positions = np.linspace(0, len(reference) - 1, n_bins + 1)[1:-1]
+        edges = np.unique(reference[positions.astype(int)] if len(reference) else [])
+        bounds = np.searchsorted(reference, edges, side="left")
+        return edges, np.diff(bounds, prepend=0, append=len(reference))
+
+    def psi(self, column, values, n_bins) -> float:
+        """
+        Population stability index of the batch against a reference column.
+
+        Numerical columns are binned into reference quantiles, categorical columns
+        use their categories as bins. NaN values are not counted.
+
+        Args:
+            column (str): Name of the reference column.
+            values (array-like): Values of the incoming batch.
+            n_bins (int): Maximum number of bins of numerical columns.
+
+        Returns:
+            float: The PSI.
+        """
+        values = np.asarray(values)
+        if values.dtype.kind == "f":
+            values = values[~np.isnan(values)]
+
+        if column in self.category_counts:
+            group_counts = _count_groups(values, *self.category_counts[column])
+            return psi_from_counts(group_counts[0], group_counts[1])
+
+        edges, ref_counts = self.get_bins(column, n_bins)
+        bins = np.searchsorted(edges, values, side="right")
+        return psi_from_counts(np.bincount(bins, minlength=len(edges) + 1), ref_counts)
+
+    def wasserstein_distance(self, column, values) -> float:
+        """
+        First Wasserstein distance of the batch to a numerical reference column.
+
+        The results are the same as the ones of ``scipy.stats.wasserstein_distance``.
+        The presorted reference is merged with the sorted batch in linear time.
+
+        Args:
+            column (str): Name of the reference column.
+            values (array-like): Values of the incoming batch.
+
+        Returns:
+            float: The distance, NaN if either sample contains NaN values.
+        """
+        reference = self.sorted_values[column]
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        if column in self.nan_columns or _has_nan(values) or len(values) == 0:
+            return np.nan
+
+        # Timsort merges the two sorted runs in linear time
+        all_values = np.sort(np.concatenate([values, reference]), kind="stable")
+        deltas = np.diff(all_values)
+        cdf = np.searchsorted(values, all_values[:-1], side="right") / len(values)
+        ref_cdf = np.searchsorted(reference, all_values[:-1], side="right") / len(
+            reference
+        )
+        return float(np.sum(np.abs(cdf - ref_cdf) * deltas))
+
+    def ks_test(self, column, values) -> Tuple[float, float]:
+        """
+        Two-sided two-sample Kolmogorov-Smirnov test against a reference column.
+
+        The results are the same as the ones of ``scipy.stats.ks_2samp``. For large
+        references the statistic is computed from the presorted reference, so
+        only the batch is sorted.
+
+        Args:
+            column (str): Name of the reference column.
+            values (array-like): Values of the incoming batch.
+
+        Returns:
+            Tuple[float, float]: The KS statistic and its p-value.
+        """
+        reference = self.sorted_values[column]
+        values = np.asarray(values)
+        n_values, n_reference = len(values), len(reference)
+
+        if max(n_values, n_reference) <= MAX_EXACT_KS_SIZE:
+            statistic, p_value = ks_2samp(values, reference)
+            return float(statistic), float(p_value)
+        if column in self.nan_columns or _has_nan(values):
+            return np.nan, np.nan
+
+        values = np.sort(values)
+        # Between two batch values the batch CDF is constant while the reference
+        # CDF grows, so both extremes of their difference lie at the batch values
+        max_diff = np.max(
+            np.searchsorted(values, values, side="right") / n_values
+            - np.searchsorted(reference, values, side="right") / n_reference
+        )
+        min_diff = np.clip(
+            np.max(
+                np.searchsorted(reference, values, side="left") / n_reference
+                - np.searchsorted(values, values, side="left") / n_values
+            ),
+            0,
+            1,
+        )
+        statistic = min_diff if min_diff > max_diff else max_diff
+
+        larger, smaller = sorted([float(n_values), float(n_reference)], reverse=True)
+        effective_n = larger * smaller / (larger + smaller)
+        p_value = np.clip(kstwo.sf(statistic, np.round(effective_n)), 0, 1)
+        return float(statistic), float(p_value)
+
+    def kruskal_test(self, column, values) -> Tuple[float, float]:
+        """
+        Kruskal-Wallis H-test against a categorical reference column.
+
+        The ranks are computed from the category counts, so the results are the
+        same as the ones of ``scipy.stats.kruskal`` without ranking the reference.
+        The test is undefined if the batch is empty, if the batch or the reference
+        contain NaN, or if all values are identical. It does not raise then, so a
+        constant column does not abort the drift checks of the other columns.
+
+        Args:
+            column (str): Name of the reference column.
+            values (array-like): Values of the incoming batch.
+
+        Returns:
+            Tuple[float, float]: The H statistic and its p-value, NaN if the test
+                is undefined.
+        """
+        ref_categories, ref_counts = self.category_counts[column]
+        values = np.asarray(values)
+        if column in self.nan_columns or _has_nan(values) or len(values) == 0:
+            return np.nan, np.nan
+
+        return kruskal_from_counts(_count_groups(values, ref_categories, ref_counts))
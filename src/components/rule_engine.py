@@ -0,0 +1,263 @@
+"""
+Rule Engine Module.
+
+This module checks data against declarative data quality rules from the data
+validation config. Every rule is compiled once into a vectorized check that maps
+column arrays to a boolean violation mask, and all rules are evaluated in a
+single pass over the columns they need.
+
+Supported rule kinds:
+
+- range: ``column`` values must lie within ``min`` and ``max`` (both optional).
+- allowed: ``column`` values must be one of ``values``.
+- monotonic: ``column`` values must not decrease, or must increase if ``strict``.
+  The first row of a batch is compared to the last row of the previous batch
+  evaluated by the same engine, so chunks and batches are checked as one stream.
+- compare: ``left`` column must satisfy ``op`` against the ``right`` column or
+  the constant ``value``. Supported operators are =, !=, <, <=, >, >=.
+
+NaN values never violate a rule. A rule with a ``scope`` of "train" or "predict"
+only checks training or only prediction data, by default it checks both.
+
+Example:
+    from src.components.rule_engine import RuleEngine
+
+    engine = RuleEngine([{"kind": "range", "column": "ph", "min": 0, "max": 14}])
+    result = engine.evaluate(data)
+    if result:
+        print(result.violations)
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.errors.data_validation_errors import RuleColumnError, UnknownRuleError
+
+COMPARISONS = {
+    "=": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+SCOPES = ("train", "predict")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Container for a compiled rule.
+
+    Attributes:
+        name (str): Name of the rule.
+        columns (Tuple[str, ...]): The columns the rule reads.
+        check (Callable): Maps the column arrays to the boolean violation mask.
+    """
+
+    name: str
+    columns: Tuple[str, ...]
+    check: Callable[..., np.ndarray]
+
+
+@dataclass
+class RuleResult:
+    """
+    Container for the rule violations of a DataFrame.
+
+    Evaluates to True if any rule was violated.
+
+    Attributes:
+        violations (Dict[str, pandas.Index]): Index labels of the violating rows
+            of every violated rule.
+        mask (numpy.ndarray): True for every row that violates any rule.
+    """
+
+    violations: Dict[str, pd.Index] = field(default_factory=dict)
+    mask: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+
+    def __bool__(self):
+        return bool(self.violations)
+
+
+def _compile_range(config) -> Rule:
+    """
+    Compiles a range rule.
+
+    Args:
+        config (dict): The rule config with ``column`` and ``min`` and/or ``max``.
+
+    Returns:
+        Rule: The compiled rule.
+    """
+    low, high = config.get("min"), config.get("max")
+
+    def check(values):
+        violated = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            violated |= values < low
+        if high is not None:
+            violated |= values > high
+        return violated
+
+    return Rule(f"range:{config['column']}", (config["column"],), check)
+
+
+def _compile_allowed(config) -> Rule:
+    """
+    Compiles an allowed categories rule.
+
+    Args:
+        config (dict): The rule config with ``column`` and ``values``.
+
+    Returns:
+        Rule: The compiled rule.
+    """
+    allowed = np.asarray(config["values"])
+
+    def check(values):
+        return ~np.isin(values, allowed) & ~pd.isna(values)
+
+    return Rule(f"allowed:{config['column']}", (config["column"],), check)
+
+
+def _compile_monotonic(config) -> Rule:
+    """
+    Compiles a monotonic rule. A row violates it if its value is smaller than,
+    or for ``strict`` equal to, the value of the previous row. The last value
+    is kept, so the previous row of a batch is the last row of the batch before.
+
+    Args:
+        config (dict): The rule config with ``column`` and optionally ``strict``.
+
+    Returns:
+        Rule: The compiled rule.
+    """
+    comparison = np.less_equal if config.get("strict", False) else np.less
+    state = {}
+
+    def check(values):
+        violated = np.zeros(len(values), dtype=bool)
+        violated[1:] = comparison(values[1:], values[:-1])
+        if len(values) == 0:
+            return violated
+        if "last" in state:
+            violated[0] = comparison(values[0], state["last"])
+        state["last"] = values[-1]
+        return violated
+
+    return Rule(f"monotonic:{config['column']}", (config["column"],), check)
+
+
+def _compile_compare(config) -> Rule:
+    """
+    Compiles a cross-column comparison rule.
+
+    Args:
+        config (dict): The rule config with ``left``, ``op`` and either ``right``
+            (a column) or ``value`` (a constant).
+
+    Returns:
+        Rule: The compiled rule.
+    """
+    operator = config["op"]
+    if operator not in COMPARISONS:
+        raise UnknownRuleError(f"compare {operator}")
+    comparison = COMPARISONS[operator]
+
+    if "right" in config:
+        columns = (config["left"], config["right"])
+        name = f"compare:{config['left']} {operator} {config['right']}"
+    else:
+        columns = (config["left"],)
+        name = f"compare:{config['left']} {operator} {config['value']}"
+
+    def check(left, right=config.get("value")):
+        missing = pd.isna(left) | pd.isna(right)
+        return ~comparison(left, right) & ~missing
+
+    return Rule(name, columns, check)
+
+
+RULE_COMPILERS = {
+    "range": _compile_range,
+    "allowed": _compile_allowed,
+    "monotonic": _compile_monotonic,
+    "compare": _compile_compare,
+}
+
+
+# pylint: disable=R0903
+class RuleEngine:
+    """
+    Rule engine class.
+
+    An engine keeps the last value of its monotonic rules, so it should be
+    created once per stream of data and used for all of its batches.
+
+    Attributes:
+        rules (List[Rule]): The compiled rules.
+    """
+
+    def __init__(self, rules_config, scope=None):
+        """
+        Initialize the RuleEngine instance and compile the rules.
+
+        Args:
+            rules_config (List[dict]): The rule configs. Each has a ``kind``, the
+                parameters of the kind and optionally a ``name`` and a ``scope``.
+            scope (str, optional): "train" or "predict" to compile only the rules
+                of that scope. Defaults to all rules.
+        """
+        self.rules = []
+        for config in rules_config or []:
+            if config.get("kind") not in RULE_COMPILERS:
+                raise UnknownRuleError(config.get("kind"))
+            rule_scope = config.get("scope")
+            if rule_scope is not None and rule_scope not in SCOPES:
+                raise UnknownRuleError(f"scope {rule_scope}")
+            if None not in (scope, rule_scope) and rule_scope != scope:
+                continue
+            rule = RULE_COMPILERS[config["kind"]](config)
+            if "name" in config:
+                rule = Rule(config["name"], rule.columns, rule.check)
+            self.rules.append(rule)
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Names of the columns the rules read, in rule order.
+        """
+        return list(dict.fromkeys(c for rule in self.rules for c in rule.columns))
+
+    def evaluate(self, data) -> RuleResult:
+        """
+        Evaluates all rules on the provided DataFrame.
+
+        Every column is converted to a NumPy array once, however many rules
+        read it.
+
+        Args:
+            data (pandas.DataFrame): The data to be checked.
+
+        Returns:
+            RuleResult: The violating rows of every violated rule.
+        """
+        arrays = {}
+        for rule in self.rules:
+            for column in rule.columns:
+                if column not in data.columns:
+                    raise RuleColumnError(rule.name, column)
+                if column not in arrays:
+                    arrays[column] = data[column].to_numpy()
+
+        result = RuleResult(mask=np.zeros(len(data), dtype=bool))
+        for rule in self.rules:
+            violated = rule.check(*(arrays[column] for column in rule.columns))
+            if violated.any():
+                result.violations[rule.name] = data.index[violated]
+                result.mask |= violated
+        return result
@@ -0,0 +1,96 @@
+"""
+SQL Queries Module.
+
+This module builds the parameterized queries of the data ingestion component
+and converts their results to DataFrames.
+
+Example:
+    from src.components.sql_queries import build_select
+
+    query, params = build_select("predictions", ["ph"], [("ph", ">", 7)])
+"""
+from typing import Tuple
+
+import pandas as pd
+from psycopg2 import sql
+
+from src.errors.data_ingestion_errors import UnsupportedFilterError
+from src.logger import logging
+
+
+def build_where(filters) -> Tuple[sql.Composable, list]:
+    """
+    Build a parameterized WHERE clause from row filters.
+
+    Each filter is a ``(column, operator, value)`` triple. Supported operators are
+    =, !=, <, <=, >, >=, "in" (value is a list) and "between" (value is a
+    ``[low, high]`` pair). All filters must hold for a row to be selected.
+
+    Args:
+        filters (List[tuple], optional): The row filters.
+
+    Returns:
+        Tuple[psycopg2.sql.Composable, list]: The WHERE clause and its parameters.
+    """
+    if not filters:
+        return sql.SQL(""), []
+
+    conditions = []
+    params = []
+    for column, operator, value in filters:
+        column = sql.Identifier(column)
+        if operator == "in":
+            conditions.append(sql.SQL("{} = ANY(%s)").format(column))
+            params.append(list(value))
+        elif operator == "between":
+            conditions.append(sql.SQL("{} BETWEEN %s AND %s").format(column))
+            params.extend(value)
+        elif operator in ("=", "!=", "<", "<=", ">", ">="):
+            conditions.append(sql.SQL(f"{{}} {operator} %s").format(column))
+            params.append(value)
+        else:
+            logging.error("Unsupported filter operator %s", operator)
+            raise UnsupportedFilterError(operator)
+
+    return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), params
+
+
+def build_select(table_name, columns=None, filters=None) -> Tuple[sql.Composable, list]:
+    """
+    Build a parameterized SELECT query for a table.
+
+    Args:
+        table_name (str): The name of the table
+        columns (List[str], optional): Columns to read. Defaults to all columns.
+        filters (List[tuple], optional): Row filters, see ``build_where``.
+
+    Returns:
+        Tuple[psycopg2.sql.Composable, list]: The query and its parameters.
+    """
+    if columns is None:
+        column_list = sql.SQL("*")
+    else:
+        column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+
+    where, params = build_where(filters)
+    query = sql.SQL("SELECT {} FROM {}{};").format(
+        column_list, sql.Identifier(table_name), where
+    )
+    return query, params
+
+
+def fetch_data(cursor, rows=None) -> pd.DataFrame:
+    """
+    Convert fetched rows to a DataFrame named after the cursor columns.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): The cursor that executed the query.
+        rows (List[tuple], optional): Rows to convert. Defaults to all remaining rows.
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the rows.
+    """
+    if rows is None:
+        rows = cursor.fetchall()
+    columns = [column.name for column in cursor.description]
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
@@ -0,0 +1,170 @@
+"""
+Validation Cache Module.
+
+This module caches the validation issues and the cleaned version of a dataset
+by the hash of its content, so unchanged reference data is validated and
+cleaned once and then reused across runs and flows.
+
+Example:
+    from src.components.validation_cache import ValidationCache
+
+    validated_ref, digest = ValidationCache().validate_reference_data(ref_df)
+    print(ValidationCache.stats)
+"""
+import hashlib
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from src.components.data_transformation import DataTransformation
+from src.components.data_validation import DataValidation
+from src.components.reference_profile import hash_data
+from src.logger import logging
+from src.utility import get_root, prune_cache
+
+
+@dataclass
+class CacheStats:
+    """
+    Container for the hit and miss counters of the validation cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+
+
+@dataclass
+class ValidationEntry:
+    """
+    Container for a cached validation result.
+
+    Attributes:
+        validation_issues (List[str]): The issues found by the training data checks.
+        cleaned_data (pandas.DataFrame): The cleaned data, None if there was
+            nothing to clean.
+        cleaned_digest (str): Digest of the cleaned data from ``hash_data``,
+            None if there was nothing to clean.
+    """
+
+    validation_issues: List[str]
+    cleaned_data: Optional[pd.DataFrame] = None
+    cleaned_digest: Optional[str] = None
+
+
+class ValidationCache:
+    """
+    Validation cache class.
+
+    Entries are keyed by the content and the schema of the data and by the
+    validation and transformation configs, so changing either invalidates them.
+    Only the ``max_cached_validations`` most recently used entries are kept.
+    The counters are shared by all instances of a process.
+
+    Attributes:
+        stats (CacheStats): Process-wide hit and miss counters.
+        data_validation (DataValidation): Validates the data on a miss.
+        data_transformation (DataTransformation): Cleans the data on a miss.
+        folder (str): Directory of the cached entries.
+    """
+
+    stats = CacheStats()
+    _stats_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Initialize the ValidationCache instance.
+        """
+        self.data_validation = DataValidation()
+        self.data_transformation = DataTransformation()
+        self.folder = os.path.join(
+            get_root(),
+            self.data_validation.validation_config["validation_cache_folder"],
+        )
+
+    def compute_key(self, data_digest) -> str:
+        """
+        Computes the cache key of the data.
+
+        Args:
+            data_digest (str): Digest of the data to be validated from ``hash_data``.
+
+        Returns:
+            str: The SHA-256 hex digest.
+        """
+        data_hash = hashlib.sha256(data_digest.encode())
+        data_hash.update(repr(self.data_validation.validation_config).encode())
+        data_hash.update(repr(self.data_transformation.transformation_config).encode())
+        return data_hash.hexdigest()
+
+    @classmethod
+    def _count(cls, hit):
+        """
+        Increments the hit or the miss counter.
+
+        Args:
+            hit (bool): Whether the entry was found.
+        """
+        with cls._stats_lock:
+            if hit:
+                cls.stats.hits += 1
+            else:
+                cls.stats.misses += 1
+
+    def validate_reference_data(self, data) -> Tuple[pd.DataFrame, str]:
+        """
+        Validates the reference data and cleans it if necessary.
+
+        The digest of the returned data is passed on to the reference profile,
+        so the data is hashed once per run.
+
+        Args:
+            data (pandas.DataFrame): The selected reference data.
+
+        Returns:
+            Tuple[pandas.DataFrame, str]: The cleaned reference data, or the
+                given data if there was nothing to clean, and its digest.
+        """
+        data_digest = hash_data(data)
+        file_path = os.path.join(
+            self.folder, f"validation-{self.compute_key(data_digest)}.pkl"
+        )
+        if os.path.exists(file_path):
+            self._count(hit=True)
+            logging.info("Loading cached validation result %s", file_path)
+            os.utime(file_path)
+            with open(file_path, "rb") as file:
+                entry = pickle.load(file)
+        else:
+            self._count(hit=False)
+            logging.info("Creating validation result %s", file_path)
+            validation_issues = self.data_validation.check_training_data(data)
+            entry = ValidationEntry(validation_issues)
+            if validation_issues:
+                entry.cleaned_data = self.data_transformation.clean_data(
+                    data.copy(), validation_issues
+                )
+                entry.cleaned_digest = hash_data(entry.cleaned_data)
+
+            os.makedirs(self.folder, exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, file_path)
+            prune_cache(
+                self.folder,
+                "validation-*.pkl",
+                self.data_validation.validation_config["max_cached_validations"],
+            )
+
+        logging.info(
+            "Validation cache hits: %d, misses: %d",
+            self.stats.hits,
+            self.stats.misses,
+        )
+        if entry.cleaned_data is None:
+            return data, data_digest
+        return entry.cleaned_data, entry.cleaned_digest
@@ -0,0 +1,123 @@
+"""
+Watermark Store Module.
+
+This module provides a small local state store for ingestion watermarks,
+the last processed value of a timestamp or sequence id column of a table.
+
+Example:
+    from src.components.watermark_store import WatermarkStore
+
+    store = WatermarkStore("state/watermarks.json")
+    store.set("predictions.timestamp", "2024-01-01T00:00:00")
+    print(store.get("predictions.timestamp"))
+"""
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from src.utility import get_root
+
+
+def from_watermark(watermark, lag):
+    """
+    Convert a stored watermark to the lower bound of the rows to be read.
+
+    Args:
+        watermark (str | int | float): The stored watermark.
+        lag (float): How far rows may commit behind the watermark, in seconds
+            for timestamps.
+
+    Returns:
+        pandas.Timestamp | int | float: The watermark minus the lag.
+    """
+    if isinstance(watermark, str):
+        return pd.Timestamp(watermark) - pd.Timedelta(seconds=lag)
+    return watermark - lag
+
+
+def to_watermark(value):
+    """
+    Convert a column value to a JSON serializable watermark.
+
+    Args:
+        value: The largest processed value of the watermark column.
+
+    Returns:
+        str | int | float: The watermark.
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+class WatermarkStore:
+    """
+    Watermark store class.
+
+    The watermarks are kept in a JSON file. Updates are written to a temporary
+    file which then replaces the store, so a crash never leaves it half-written.
+
+    Attributes:
+        path (str): Absolute path of the JSON file.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, store_path):
+        """
+        Initialize the WatermarkStore instance.
+
+        Args:
+            store_path (str): Path of the JSON file relative to the project root.
+        """
+        self.path = os.path.join(get_root(), store_path)
+
+    def _read(self) -> dict:
+        """
+        Read all watermarks from the store.
+
+        Returns:
+            dict: The watermarks by key, empty if the store does not exist yet.
+        """
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def get(self, key):
+        """
+        Get a watermark.
+
+        Args:
+            key (str): The watermark key.
+
+        Returns:
+            The stored watermark, or None if nothing was processed yet.
+        """
+        with self._lock:
+            return self._read().get(key)
+
+    def set(self, key, value):
+        """
+        Store a watermark.
+
+        Args:
+            key (str): The watermark key.
+            value (str | int | float | dict): The new watermark.
+        """
+        with self._lock:
+            watermarks = self._read()
+            watermarks[key] = value
+
+            dir_path = os.path.dirname(self.path)
+            os.makedirs(dir_path, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=dir_path, delete=False
+            ) as file:
+                json.dump(watermarks, file, indent=2)
+            os.replace(file.name, self.path)
@@ -14,7 +14,7 @@ class UnsupportedFileTypeError(Exception):
     def __init__(self, file_dir):
         super().__init__(
             f"No supported files in the {file_dir} directory. "
-            "Supported extensions are .xlsx, .xls, .csv"
+            "Supported extensions are .xlsx, .xls, .csv, .parquet"
         )
 
 
@@ -64,8 +64,23 @@ class DeletionError(Exception):
 class MultipleFilesError(Exception):
     """
     Error that is raised when the folder has multiple files, that could be read.
-    The folder should have only one data file
+    The folder should have only one data file, unless multiple_files is enabled
     """
 
     def __init__(self):
         super().__init__("Multiple files error. Too many files to read.")
+
+
+class UnsupportedFilterError(Exception):
+    """
+    Error that is raised when a row filter uses an unsupported operator.
+
+    Args:
+        operator (str): The operator that is not supported.
+    """
+
+    def __init__(self, operator):
+        super().__init__(
+            f"Unsupported filter operator {operator}. "
+            "Supported operators are =, !=, <, <=, >, >=, in, between"
+        )
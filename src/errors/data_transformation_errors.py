@@ -0,0 +1,63 @@
+"""
+This module contains all the errors for data_transformation.py module
+"""
+
+
+class UnknownImputerError(Exception):
+    """
+    Error that is raised when an unknown imputation method is configured
+
+    Args:
+        method (str): The configured imputation method.
+    """
+
+    def __init__(self, method):
+        super().__init__(
+            f"Unknown imputation method {method}. "
+            "Supported methods are median, knn, mice"
+        )
+
+
+class FeaturePipelineVersionError(Exception):
+    """
+    Error that is raised when a stored feature pipeline has an incompatible version
+
+    Args:
+        version (int): The version of the stored feature pipeline.
+        expected (int): The version the code supports.
+    """
+
+    def __init__(self, version, expected):
+        super().__init__(
+            f"Feature pipeline version {version} is not supported, "
+            f"expected version {expected}. Retrain the models"
+        )
+
+
+class MissingFeaturePipelineError(Exception):
+    """
+    Error that is raised when the loaded models have no feature pipeline
+    """
+
+    def __init__(self):
+        super().__init__(
+            "The loaded models have no feature pipeline. Retrain the models "
+            "or disable use_feature_pipeline"
+        )
+
+
+class FeaturePipelineMismatchError(Exception):
+    """
+    Error that is raised when the loaded models were logged with different
+    feature pipelines
+
+    Args:
+        signatures (dict): The signature of the feature pipeline of every run,
+            None for runs without one.
+    """
+
+    def __init__(self, signatures):
+        super().__init__(
+            f"The loaded models have different feature pipelines {signatures}. "
+            "Retrain all models on the same data"
+        )
@@ -6,19 +6,27 @@ This module contains all the errors for data_validation.py module
 class ColumnsDiffError(Exception):
     """
     Error that is raised when columns are different between dataframes
+
+    Args:
+        diff (str, optional): Description of the differences.
     """
 
-    def __init__(self):
-        super().__init__("Columns are different between dataframes")
+    def __init__(self, diff=None):
+        message = "Columns are different between dataframes"
+        super().__init__(f"{message}: {diff}" if diff else message)
 
 
 class DtypeDiffError(Exception):
     """
     Error that is raised when dtypes are different between dataframes
+
+    Args:
+        diff (str, optional): Description of the differences.
     """
 
-    def __init__(self):
-        super().__init__("Dtypes are different between dataframes")
+    def __init__(self, diff=None):
+        message = "Dtypes are different between dataframes"
+        super().__init__(f"{message}: {diff}" if diff else message)
 
 
 class NanError(Exception):
@@ -28,3 +36,69 @@ class NanError(Exception):
 
     def __init__(self):
         super().__init__("Too many NaN values")
+
+
+class SketchMergeError(Exception):
+    """
+    Error that is raised when drift sketches of different reference data are merged
+    """
+
+    def __init__(self):
+        super().__init__("Sketches were built from different reference data")
+
+
+class UnknownCorrectionError(Exception):
+    """
+    Error that is raised when an unknown multiple testing correction is configured
+
+    Args:
+        correction (str): The configured correction.
+    """
+
+    def __init__(self, correction):
+        super().__init__(
+            f"Unknown multiple testing correction {correction}. "
+            "Supported corrections are none, bonferroni, bh"
+        )
+
+
+class ReferenceProfileNotFoundError(Exception):
+    """
+    Error that is raised when no reference profile was stored by a training run
+
+    Args:
+        path (str): Path of the missing profile.
+    """
+
+    def __init__(self, path):
+        super().__init__(
+            f"No reference profile at {path}. Run the training pipeline first"
+        )
+
+
+class UnknownRuleError(Exception):
+    """
+    Error that is raised when an unknown data quality rule is configured
+
+    Args:
+        kind (str): The configured rule kind.
+    """
+
+    def __init__(self, kind):
+        super().__init__(
+            f"Unknown data quality rule {kind}. "
+            "Supported rules are range, allowed, monotonic, compare"
+        )
+
+
+class RuleColumnError(Exception):
+    """
+    Error that is raised when a data quality rule reads a missing column
+
+    Args:
+        rule (str): The name of the rule.
+        column (str): The missing column.
+    """
+
+    def __init__(self, rule, column):
+        super().__init__(f"Rule {rule} reads the missing column {column}")
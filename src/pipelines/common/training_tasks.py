@@ -2,16 +2,19 @@
 Module for defining common Prefect tasks used in machine learning pipelines.
 
 Includes tasks for data ingestion, transformation, validation,
-train-test split, and model training or retraining.
+feature pipeline fitting, reference profiling, train-test split, and model training or retraining.
 
 Tasks are designed to be reusable across different pipeline configurations.
 """
 
+from dataclasses import replace
+
 from prefect import task
 
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.data_validation import DataValidation
+from src.components.feature_pipeline import FeaturePipeline
 from src.components.model_trainer import ModelTrainer
 
 
@@ -20,10 +23,17 @@ def get_data():
     """
     Task to initiate data ingestion using the DataIngestion component.
 
+    The ingested data is checked against the data quality rules of training
+    scope before the selection, so the rules can read columns that are not
+    selected, e.g. timestamps.
+
     Returns:
         The raw data obtained from the data ingestion process.
     """
-    return DataIngestion().initiate_data_ingestion()
+    data = DataIngestion().initiate_data_ingestion()
+    data_validation = DataValidation()
+    data_validation.check_rules(data, data_validation.create_rule_engine("train"))
+    return data
 
 
 @task
@@ -41,22 +51,54 @@ def select_data(result):
 
 
 @task
-def validate_data(result):
+def fit_imputer(result):
+    """
+    Task to fit the imputer on the feature columns of the selected data.
+
+    Args:
+        result: The selected subset of data.
+
+    Returns:
+        The fitted imputer.
+    """
+    return DataTransformation().fit_imputer(result)
+
+
+@task
+def validate_data(result, imputer):
     """
     Task to perform data validation using the DataValidation component.
 
+    The features are imputed with the imputer that is logged with the models,
+    so training and prediction data are imputed the same way.
+
     Args:
         result: The selected subset of data.
+        imputer: The imputer fitted on the feature columns of the selected data.
 
     Returns:
         The cleaned data after validation checks.
     """
     validation_checks = DataValidation().check_training_data(result)
     if validation_checks:
-        return DataTransformation().clean_data(result, validation_checks)
+        return DataTransformation().clean_data(result, validation_checks, imputer)
     return result
 
 
+@task
+def store_reference_profile(feature_pipeline):
+    """
+    Task to store the reference profile of the feature pipeline for prediction runs.
+
+    Args:
+        feature_pipeline: The fitted feature pipeline.
+
+    Returns:
+        None
+    """
+    DataValidation().store_reference_profile(feature_pipeline.reference_profile)
+
+
 @task
 def train_test_split(result):
     """
@@ -72,31 +114,61 @@ def train_test_split(result):
 
 
 @task
-def train_model(result):
+def fit_feature_pipeline(validated_data, imputer):
+    """
+    Task to fit the feature pipeline that is logged with the models.
+
+    The reference profile is computed over the feature columns of the validated
+    data, the target column names are stored with it.
+
+    Args:
+        validated_data: The cleaned data after validation checks.
+        imputer: The imputer the validated data was cleaned with.
+
+    Returns:
+        The fitted feature pipeline.
+    """
+    data_transformation = DataTransformation()
+    features = data_transformation.resolve_columns(
+        validated_data.columns, select_target=False
+    )
+    profile = replace(
+        DataValidation().get_reference_profile(validated_data[features]),
+        target_columns=data_transformation.resolve_target_columns(
+            validated_data.columns
+        ),
+    )
+    return FeaturePipeline(profile, imputer)
+
+
+@task
+def train_model(result, feature_pipeline):
     """
     Task to initiate model training using the ModelTrainer component.
 
     Args:
         result: The train-test split data.
+        feature_pipeline: The fitted feature pipeline, logged with the models.
 
     Returns:
         None
     """
-    ModelTrainer(result).initiate_model_training()
+    ModelTrainer(result, feature_pipeline).initiate_model_training()
 
 
 @task
-def retrain_model(result, cfg):
+def retrain_model(result, cfg, feature_pipeline):
     """
     Task to initiate model retraining using the ModelTrainer component.
 
     Args:
         result: The train-test split data.
         cfg: The config for the model retraining
+        feature_pipeline: The fitted feature pipeline, logged with the model.
 
     Returns:
         None
     """
-    ModelTrainer(result).train_and_log_model(
+    ModelTrainer(result, feature_pipeline).train_and_log_model(
         cfg["model_name"], custom_params=cfg["params"]
     )
@@ -3,13 +3,14 @@
 This Prefect flow performs the following tasks:
 
 1. Loads reference data for validation.
-2. Loads prediction data.
-3. Selects relevant columns from both datasets.
-4. Validates the prediction data against the reference data.
-5. Performs data cleaning if necessary.
-6. Creates drift reports if drift is detected.
-7. Sends email notifications using the provided SMTP server details.
-8. Cleans up temporary files.
+2. Loads prediction data, optionally only the rows added since the last run.
+3. Checks the prediction data against the data quality rules.
+4. Selects relevant columns from both datasets.
+5. Validates the prediction data against the reference data.
+6. Performs data cleaning if necessary.
+7. Creates drift reports if drift is detected.
+8. Sends email notifications using the provided SMTP server details.
+9. Cleans up temporary files.
 
 This pipeline is designed to be run periodically to monitor the
 quality and consistency of predictions.
@@ -22,7 +23,9 @@ from prefect import flow, task
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.data_validation import DataValidation
+from src.components.duplicate_detector import DuplicateDetector
 from src.components.email_service import EmailService
+from src.components.validation_cache import ValidationCache
 from src.utility import get_cfg, get_root
 
 
@@ -30,26 +33,52 @@ from src.utility import get_cfg, get_root
 def load_reference_data():
     """
     Task to load reference data for validation.
+    Only the columns kept by ``select_data`` are read.
 
     Returns:
     - ref_data (pandas.DataFrame): Reference data for validation.
     """
-    return DataIngestion().initiate_data_ingestion()
+    data_ingestion = DataIngestion()
+    columns = DataTransformation().resolve_columns(data_ingestion.get_data_columns())
+    return data_ingestion.initiate_data_ingestion(columns)
 
 
 @task
-def load_predictions_data(cfg):
+def get_columns(cfg):
+    """
+    Task to resolve the prediction table columns that are used for monitoring:
+    the selected columns and the other columns the data quality rules read.
+
+    Args:
+    - cfg (dict): Configuration containing predictions table to be loaded
+
+    Returns:
+    - columns (list): Names of the selected and the rule columns.
+    """
+    table_columns = DataIngestion().get_table_columns(cfg["historical_data"])
+    columns = DataTransformation().resolve_columns(table_columns)
+    rule_columns = DataValidation().create_rule_engine("predict").columns
+    return columns + [
+        column
+        for column in table_columns
+        if column in rule_columns and column not in columns
+    ]
+
+
+@task
+def load_predictions_data(cfg, columns=None):
     """
     Task to load the table containing predictions
 
     Args:
     - cfg (dict): Configuration containing predictions table to be loaded
+    - columns (list, optional): Names of the columns to be loaded.
 
     Returns:
     - pred_data (pandas.DataFrame): DataFrame with predictions
     """
     table_name = cfg["historical_data"]
-    return DataIngestion().get_sql_table(table_name)
+    return DataIngestion().get_sql_table(table_name, columns, cfg["filters"])
 
 
 @task
@@ -64,22 +93,91 @@ def delete_data(cfg):
     - None
     """
     table_name = cfg["historical_data"]
-    DataIngestion().delete_data(table_name)
+    DataIngestion().delete_data(table_name, cfg["filters"])
 
 
 @task
-def select_data(data):
+def check_rules(pred_data, rule_engine):
+    """
+    Task to check the prediction data against the data quality rules.
+
+    Args:
+    - pred_data (pandas.DataFrame): Prediction data with the rule columns.
+    - rule_engine (RuleEngine): Engine with the rules of prediction scope that
+      checked the previous chunks.
+
+    Returns:
+    - rule_result (RuleResult): The violating rows of every violated rule.
+    """
+    return DataValidation().check_rules(pred_data, rule_engine)
+
+
+@task
+def select_data(data, ref_profile=None):
     """
     Task to select relevant data columns for dataframe.
 
     Args:
     - data (pandas.DataFrame): data from which columns are to be selected.
+    - ref_profile (ReferenceProfile): Profile of the reference data, whose dtypes
+      are applied to the selected columns. None to keep the dtypes of the data.
 
     Returns:
     - selected_data (pandas.DataFrame): Selected data.
     """
 
-    return DataTransformation().select_data(data)
+    selected_data = DataTransformation().select_data(data)
+    if ref_profile is None:
+        return selected_data
+    return ref_profile.schema.conform(selected_data)
+
+
+@task
+def validate_reference_data(ref_df):
+    """
+    Task to validate reference data.
+
+    Performs checks for training data quality and cleans data if necessary.
+    Results are cached by the content of the reference data.
+
+    Args:
+    - ref_df (pandas.DataFrame): Reference data for validation.
+
+    Returns:
+        - validated_ref (pandas.DataFrame): Cleaned reference data (if applicable).
+        - ref_digest (str): Digest of the cleaned reference data.
+    """
+    return ValidationCache().validate_reference_data(ref_df)
+
+
+@task
+def profile_reference_data(validated_ref, ref_digest):
+    """
+    Task to profile the validated reference data for drift checks.
+
+    Args:
+    - validated_ref (pandas.DataFrame): Validated reference data.
+    - ref_digest (str): Digest of the validated reference data.
+
+    Returns:
+    - ref_profile (ReferenceProfile): Profile of the reference data.
+    """
+    return DataValidation().get_reference_profile(validated_ref, ref_digest)
+
+
+@task
+def drop_duplicates(pred_df, duplicate_detector):
+    """
+    Task to drop the rows of a chunk that were already seen in the stream.
+
+    Args:
+    - pred_df (pandas.DataFrame): Chunk of prediction data.
+    - duplicate_detector (DuplicateDetector): Detector fed with all earlier chunks.
+
+    Returns:
+    - unique_pred (pandas.DataFrame): Rows not seen in this or an earlier chunk.
+    """
+    return pred_df[~duplicate_detector.update(pred_df)]
 
 
 @task
@@ -87,25 +185,21 @@ def validate_data(pred_df, ref_df):
     """
     Task to validate prediction data against reference data.
 
-    Performs checks for training data quality and prediction data consistency.
+    Performs checks for prediction data consistency.
     Cleans data if necessary based on the identified issues.
 
     Args:
     - pred_df (pandas.DataFrame): DataFrame containing predictions.
-    - ref_df (pandas.DataFrame): Reference data for validation.
+    - ref_df (ReferenceProfile): Profile of the validated reference data.
 
     Returns:
         - validated_pred (pandas.DataFrame): Cleaned prediction data.
-        - validated_ref (pandas.DataFrame): Cleaned reference data (if applicable).
         - validation_checks (list): List of validation checks that triggered data cleaning.
     """
-    train_checks = DataValidation().check_training_data(ref_df)
-    if train_checks:
-        ref_df = DataTransformation().clean_data(ref_df, train_checks)
     prediction_checks = DataValidation().check_prediction_data(pred_df, ref_df)
     if "nan_imputable" in prediction_checks or "duplicates" in prediction_checks:
         pred_df = DataTransformation().clean_data(pred_df, prediction_checks)
-    return pred_df, ref_df, prediction_checks
+    return pred_df, prediction_checks
 
 
 @task
@@ -122,6 +216,25 @@ def create_reports(validation_checks, pred_df, ref_df):
         DataValidation().create_drift_reports(pred_df, ref_df)
 
 
+@task
+def check_stream_drift(drift_detector):
+    """
+    Task to check the streamed prediction data for drift and report it if detected.
+
+    Args:
+    - drift_detector (OnlineDriftDetector): Detector fed with all prediction chunks.
+
+    Returns:
+    - drift_result (DriftResult): The per-column results, evaluates to True if
+      drift was detected.
+    """
+    data_validation = DataValidation()
+    drift_result = data_validation.check_stream_drift(drift_detector)
+    if drift_result:
+        data_validation.create_stream_report(drift_detector)
+    return drift_result
+
+
 @task
 def alert(smtp_server, smtp_port):
     """
@@ -146,25 +259,121 @@ def cleanup():
     shutil.rmtree(path)
 
 
+def monitor_new_rows(cfg, columns, ref_profile, validated_ref, smtp_settings):
+    """
+    Monitors the prediction rows added since the last successful run.
+
+    The watermark is advanced only after the alert was sent, so a failed run
+    monitors the same rows again.
+
+    Args:
+    - cfg (dict): Configuration dictionary containing pipeline parameters.
+    - columns (list): Names of the selected and the rule columns.
+    - ref_profile (ReferenceProfile): Profile of the reference data.
+    - validated_ref (pandas.DataFrame): Cleaned reference data.
+    - smtp_settings (tuple): Address and port of the SMTP server.
+    """
+    with DataIngestion().incremental_data(
+        cfg["historical_data"], cfg["watermark_column"], columns, cfg["filters"]
+    ) as pred_data:
+        if not pred_data.empty:
+            check_rules(pred_data, DataValidation().create_rule_engine("predict"))
+            validated_pred, checks = validate_data(
+                select_data(pred_data, ref_profile), ref_profile
+            )
+            create_reports(checks, validated_pred, validated_ref)
+            alert(*smtp_settings)
+            cleanup()
+
+
+def monitor_chunks(cfg, columns, ref_profile, validated_ref):
+    """
+    Monitors the prediction table chunk by chunk.
+
+    Every chunk is validated on its own and the drift report is created for
+    the first chunk in which drift was detected. All chunks are also
+    summarized in mergeable sketches, which are checked for drift over the
+    whole stream. Only the streamed rows are deleted afterwards, so rows
+    inserted while the stream runs are kept for the next run.
+
+    Args:
+    - cfg (dict): Configuration dictionary containing pipeline parameters.
+    - columns (list): Names of the selected and the rule columns.
+    - ref_profile (ReferenceProfile): Profile of the reference data.
+    - validated_ref (pandas.DataFrame): Cleaned reference data.
+
+    Returns:
+    - checks (set): Validation checks of all chunks and of the stream.
+    """
+    checks = set()
+    drift_detector = DataValidation().create_drift_detector(ref_profile)
+    duplicate_detector = DuplicateDetector()
+    rule_engine = DataValidation().create_rule_engine("predict")
+    with DataIngestion().consume_data(
+        cfg["historical_data"], cfg["chunksize"], columns, cfg["filters"]
+    ) as pred_chunks:
+        for pred_data in pred_chunks:
+            if check_rules(pred_data, rule_engine):
+                checks.add("rule_violations")
+            pred_data = drop_duplicates(
+                select_data(pred_data, ref_profile), duplicate_detector
+            )
+            validated_pred, chunk_checks = validate_data(pred_data, ref_profile)
+            drift_detector.update(validated_pred)
+            if "drift_detected" not in checks:
+                create_reports(chunk_checks, validated_pred, validated_ref)
+            checks.update(chunk_checks)
+        if check_stream_drift(drift_detector):
+            checks.add("drift_detected")
+    return checks
+
+
 @flow(name="monitoring_pipeline")
 def monitoring_pipeline(cfg, smtp_server="smtp.office365.com", smtp_port=587):
     """
     Prefect flow to monitor data quality and detect anomalies in predictions.
 
+    If ``watermark_column`` is set in the config, the predictions table is kept
+    and only the rows added since the last successful run are monitored.
+    Otherwise the table is emptied after reading. If ``chunksize`` is set,
+    the table is streamed and every chunk is validated on its own, and only
+    the rows seen at the start of the stream are deleted. The drift
+    report is then created for the first chunk in which drift was detected.
+    All chunks are also summarized in mergeable sketches, which are checked
+    for drift over the whole stream in constant memory. Rows already seen in an
+    earlier chunk are dropped by their row hashes.
+
+    Only the columns kept by ``select_data`` or read by the data quality rules,
+    which are checked before the selection, and the rows matching ``filters``
+    (``[column, operator, value]`` triples, e.g. a time window) are read.
+
     Args:
         cfg (dict): Configuration dictionary containing pipeline parameters.
         smtp_server (str, optional): Address of the SMTP server for email notifications.
         smtp_port (int, optional): Port number of the SMTP server. Defaults to 587.
     """
     ref_data = load_reference_data()
-    pred_data = load_predictions_data(cfg)
-    delete_data(cfg)
-    ref_data_selected = select_data(ref_data)
-    pred_data_selected = select_data(pred_data)
-    validated_pred, validated_ref, checks = validate_data(
-        pred_data_selected, ref_data_selected
-    )
-    create_reports(checks, validated_pred, validated_ref)
+    validated_ref, ref_digest = validate_reference_data(select_data(ref_data))
+    ref_profile = profile_reference_data(validated_ref, ref_digest)
+    columns = get_columns(cfg)
+
+    if cfg["watermark_column"]:
+        monitor_new_rows(
+            cfg, columns, ref_profile, validated_ref, (smtp_server, smtp_port)
+        )
+        return
+
+    if cfg["chunksize"]:
+        monitor_chunks(cfg, columns, ref_profile, validated_ref)
+    else:
+        pred_data = load_predictions_data(cfg, columns)
+        delete_data(cfg)
+        check_rules(pred_data, DataValidation().create_rule_engine("predict"))
+        validated_pred, checks = validate_data(
+            select_data(pred_data, ref_profile), ref_profile
+        )
+        create_reports(checks, validated_pred, validated_ref)
+
     alert(smtp_server, smtp_port)
     cleanup()
 
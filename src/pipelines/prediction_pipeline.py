@@ -9,24 +9,38 @@ Key tasks within this module:
 
 - load_model: Loads trained machine learning models according to configuration.
 - load_reference_data: Fetches reference data for prediction and validation.
+- load_stored_profile: Loads the reference profile stored by the training run.
 - get_pred_data: Retrieves data for prediction from the designated table.
+- check_rules: Checks the ingested prediction data against the data quality rules.
 - select_data: Selects relevant features or subsets from the prediction data.
+- validate_reference_data: Performs data quality checks on the reference data.
+- profile_reference_data: Computes the reference statistics used for drift checks.
+- get_feature_pipeline: Gets the feature pipeline the prediction data is prepared with.
+- select_features: Selects the feature columns of the prediction data.
 - validate_data: Performs data quality checks and applies necessary cleaning.
 - get_predictions: Generates predictions using the loaded model on validated data.
 - write_predictions: Writes the model's predictions to a specified table.
+- load_inputs: Loads the model, the reference and the prediction data concurrently.
 """
+import asyncio
+from dataclasses import replace
+
 import pandas as pd
 from prefect import flow, task
 
+from src.components.async_data_ingestion import AsyncDataIngestion
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.data_validation import DataValidation
+from src.components.feature_pipeline import FeaturePipeline
 from src.components.model_loader import get_models
+from src.components.validation_cache import ValidationCache
+from src.errors.data_transformation_errors import MissingFeaturePipelineError
 from src.utility import get_cfg
 
 
 @task
-def load_model(cfg):
+async def load_model(cfg):
     """
     Task to load machine learning models based on the provided configuration.
     If default, load ensemble
@@ -40,23 +54,39 @@ def load_model(cfg):
     model_names = cfg["model_names"]
     if model_names != "default":
         model_names = tuple(model_names)
-        return get_models(model_names)
-    return get_models()
+        return await asyncio.to_thread(get_models, model_names)
+    return await asyncio.to_thread(get_models)
 
 
 @task
-def load_reference_data():
+async def load_reference_data():
     """
     Task to load reference data for validation.
+    Only the columns kept by ``select_data`` with the targets are read.
 
     Returns:
     - ref_data (pandas.DataFrame): Reference data for validation.
     """
-    return DataIngestion().initiate_data_ingestion()
+    data_ingestion = AsyncDataIngestion()
+    columns = await data_ingestion.get_data_columns()
+    return await data_ingestion.initiate_data_ingestion(
+        DataTransformation().resolve_columns(columns)
+    )
 
 
 @task
-def get_pred_data(cfg):
+async def load_stored_profile():
+    """
+    Task to load the reference profile stored by the training run.
+
+    Returns:
+    - ref_profile (ReferenceProfile): Profile of the validated reference data.
+    """
+    return await asyncio.to_thread(DataValidation().load_reference_profile)
+
+
+@task
+async def get_pred_data(cfg):
     """
     Task to retrieve prediction data from the SQL table based on configuration.
 
@@ -67,7 +97,23 @@ def get_pred_data(cfg):
     - pred_data (pandas.DataFrame): Prediction data.
     """
     prediction_table = cfg["prediction_table"]
-    return DataIngestion().get_sql_table(prediction_table)
+    return await AsyncDataIngestion().get_sql_table(prediction_table)
+
+
+@task
+def check_rules(pred_data, rule_engine):
+    """
+    Task to check the ingested prediction data against the data quality rules.
+
+    Args:
+    - pred_data (pandas.DataFrame): Ingested prediction data.
+    - rule_engine (RuleEngine): Engine with the rules of prediction scope that
+      checked the previous batches.
+
+    Returns:
+    - rule_result (RuleResult): The violating rows of every violated rule.
+    """
+    return DataValidation().check_rules(pred_data, rule_engine)
 
 
 @task
@@ -86,23 +132,94 @@ def select_data(data):
 
 
 @task
-def validate_data(selected_pred, ref_data):
+def validate_reference_data(ref_data):
+    """
+    Task to validate reference data.
+    Results are cached by the content of the reference data.
+
+    Args:
+    - ref_data (pandas.DataFrame): Selected reference data.
+
+    Returns:
+    - validated_ref (pandas.DataFrame): Cleaned reference data.
+    - ref_digest (str): Digest of the cleaned reference data.
+    """
+    return ValidationCache().validate_reference_data(ref_data)
+
+
+@task
+def profile_reference_data(validated_ref, ref_digest, ref_columns):
+    """
+    Task to profile the validated reference data for drift checks.
+
+    Args:
+    - validated_ref (pandas.DataFrame): Validated reference data.
+    - ref_digest (str): Digest of the validated reference data.
+    - ref_columns (pandas.Index): Columns of the reference data with the targets.
+
+    Returns:
+    - ref_profile (ReferenceProfile): Profile of the reference data.
+    """
+    return replace(
+        DataValidation().get_reference_profile(validated_ref, ref_digest),
+        target_columns=DataTransformation().resolve_target_columns(ref_columns),
+    )
+
+
+@task
+def get_feature_pipeline(loaded_model, ref_profile=None):
+    """
+    Task to get the feature pipeline the prediction data is prepared with.
+
+    Args:
+    - loaded_model (Predictor): Ensemble machine learning model.
+    - ref_profile (ReferenceProfile): Profile of the validated reference data,
+      None to use the feature pipeline logged with the models.
+
+    Returns:
+    - feature_pipeline (FeaturePipeline): The feature pipeline.
+    """
+    if ref_profile is not None:
+        return FeaturePipeline(ref_profile, loaded_model.imputer)
+    if loaded_model.feature_pipeline is None:
+        raise MissingFeaturePipelineError()
+    return loaded_model.feature_pipeline
+
+
+@task
+def select_features(feature_pipeline, data):
+    """
+    Task to select the feature columns of the prediction data.
+
+    Args:
+    - feature_pipeline (FeaturePipeline): The feature pipeline.
+    - data (pandas.DataFrame): Prediction data.
+
+    Returns:
+    - selected_data (pandas.DataFrame): Feature columns in training order.
+    """
+    return feature_pipeline.select(data)
+
+
+@task
+def validate_data(selected_pred, ref_data, imputer=None):
     """
     Task to validate prediction data.
 
     Args:
     - selected_pred (pandas.DataFrame): Selected prediction data.
-    - ref_data (pandas.DataFrame): Reference data for validation.
+    - ref_data (ReferenceProfile): Profile of the validated reference data.
+    - imputer (Imputer): Imputer fitted on the training data, None to fit
+      one on the prediction data.
 
     Returns:
     - validated_data (pandas.DataFrame): Validated prediction data.
     """
-    train_checks = DataValidation().check_training_data(ref_data)
-    if train_checks:
-        ref_data = DataTransformation().clean_data(ref_data, train_checks)
     validation_checks = DataValidation().check_prediction_data(selected_pred, ref_data)
     if "nan_imputable" in validation_checks or "duplicates" in validation_checks:
-        return DataTransformation().clean_data(selected_pred, validation_checks)
+        return DataTransformation().clean_data(
+            selected_pred, validation_checks, imputer
+        )
     return selected_pred
 
 
@@ -122,29 +239,33 @@ def get_predictions(ensemble_model, validated_data):
 
 
 @task
-def write_predictions(cfg, predictions, ingested_data, ref_data):
+def write_predictions(cfg, predictions, ingested_data, target_columns, connection=None):
     """
     Task to write predictions to a specified table.
+    If ``bulk_write`` is set in the config, the rows are written with COPY.
 
     Args:
     - cfg (dict): Configuration containing table information.
     - predictions (numpy.ndarray): Array of predictions.
     - ingested_data (pandas.DataFrame): Ingested prediction data.
-    - ref_data (pandas.DataFrame): Reference data.
+    - target_columns (List[str]): Names of the predicted target columns.
+    - connection (sqlalchemy.engine.Connection): Connection of the claim the
+      data was taken from, None to write in a transaction of its own.
 
     Returns:
     - None
     """
     table_name = cfg["write_table"]
-    mapping = ref_data.columns.str.startswith(("Red KBE", "Energie"))
-    pred_col_names = ref_data.columns[mapping]
-    preds_df = pd.DataFrame(predictions, columns=pred_col_names)
+    preds_df = pd.DataFrame(predictions, columns=target_columns)
     dataframe = pd.concat(
         [ingested_data, preds_df],
         axis=1,
     )
 
-    DataIngestion().write_data(dataframe, table_name)
+    if cfg["bulk_write"]:
+        DataIngestion().bulk_write_data(dataframe, table_name, connection=connection)
+    else:
+        DataIngestion().write_data(dataframe, table_name, connection)
 
 
 @task
@@ -162,26 +283,132 @@ def delete_data(cfg):
     DataIngestion().delete_data(table_name)
 
 
+# pylint: disable=R0913
+def predict_batch(
+    config, loaded_model, pred_data, feature_pipeline, rule_engine, *, connection=None
+):
+    """
+    Run the prediction tasks for one batch of prediction data and write the results.
+
+    Args:
+    - config (dict): Configuration containing pipeline settings.
+    - loaded_model (Predictor): Ensemble machine learning model.
+    - pred_data (pandas.DataFrame): Ingested prediction data.
+    - feature_pipeline (FeaturePipeline): The feature pipeline.
+    - rule_engine (RuleEngine): Engine with the data quality rules, shared by
+      all batches.
+    - connection (sqlalchemy.engine.Connection): Connection of the claim the
+      batch was taken from, None to write in a transaction of its own.
+
+    Returns:
+    - None
+    """
+    check_rules(pred_data, rule_engine)
+    validated_data = validate_data(
+        select_features(feature_pipeline, pred_data),
+        feature_pipeline.reference_profile,
+        feature_pipeline.imputer,
+    )
+    predictions = get_predictions(loaded_model, validated_data)
+    write_predictions(
+        config, predictions, pred_data, feature_pipeline.target_columns, connection
+    )
+
+
+@flow(name="load_inputs")
+async def load_inputs(config, read_pred_data):
+    """
+    Prefect subflow that loads the pipeline inputs concurrently.
+
+    Loading the model, the reference and the prediction data mostly waits
+    on the MLflow registry, the disk and Postgres, so the three loads overlap
+    and take as long as the slowest of them. If ``use_feature_pipeline`` is
+    set in the config, no reference is loaded, as the feature pipeline is
+    loaded with the model. Otherwise, if ``use_stored_profile`` is set, the
+    reference profile stored by the training run is loaded instead of the
+    reference data.
+
+    Args:
+    - config (dict): Configuration containing pipeline settings.
+    - read_pred_data (bool): Whether the prediction table is read as well.
+
+    Returns:
+    - loaded_model (Predictor): Ensemble machine learning model.
+    - reference (pandas.DataFrame | ReferenceProfile): Reference data, the
+      stored reference profile, or None if the feature pipeline is used.
+    - pred_data (pandas.DataFrame): Prediction data, None if not read.
+    """
+    loads = [load_model(config)]
+    if config["use_stored_profile"] and not config["use_feature_pipeline"]:
+        loads.append(load_stored_profile())
+    elif not config["use_feature_pipeline"]:
+        loads.append(load_reference_data())
+    if read_pred_data:
+        loads.append(get_pred_data(config))
+    loaded_model, *loaded = await asyncio.gather(*loads)
+    reference = None if config["use_feature_pipeline"] else loaded.pop(0)
+    return loaded_model, reference, loaded[0] if loaded else None
+
+
 @flow(name="prediction_pipeline")
 def prediction_pipeline(config):
     """
     Prefect flow for orchestrating a machine learning prediction pipeline.
 
+    If ``claim_batch_size`` is set in the config, batches are claimed from the
+    prediction table until it is empty. A batch is removed from the table in
+    the same transaction its predictions are written in, so several flows can
+    drain the table concurrently and no batch is predicted twice, and rows
+    inserted during the run are predicted too. ``chunksize`` is used as the
+    batch size if ``claim_batch_size`` is not set. So memory usage does not
+    depend on the table size. Otherwise the whole table is read and emptied
+    before predicting. The inputs are loaded concurrently by the
+    ``load_inputs`` subflow. If ``use_feature_pipeline`` is set, the
+    prediction data is prepared with the feature pipeline logged with the
+    models, so the training data is not needed. Otherwise, if
+    ``use_stored_profile`` is set, the reference data is neither read nor
+    profiled. The data quality rules are checked on the ingested batches
+    before the features are selected, with one engine for all batches.
+
     Args:
     - config (dict): Configuration containing pipeline settings.
 
     Returns:
     - None
     """
-    loaded_model = load_model(config)
-    ref_data = load_reference_data()
-    pred_data = get_pred_data(config)
-    delete_data(config)
-    selected_pred = select_data(pred_data)
-    selected_ref = select_data(ref_data)
-    validated_data = validate_data(selected_pred, selected_ref)
-    predictions = get_predictions(loaded_model, validated_data)
-    write_predictions(config, predictions, pred_data, ref_data)
+    batch_size = config["claim_batch_size"] or config["chunksize"]
+    read_pred_data = not batch_size
+    loaded_model, reference, pred_data = load_inputs(config, read_pred_data)
+    if config["use_feature_pipeline"] or config["use_stored_profile"]:
+        ref_profile = reference
+    else:
+        validated_ref, ref_digest = validate_reference_data(select_data(reference))
+        ref_profile = profile_reference_data(
+            validated_ref, ref_digest, reference.columns
+        )
+    feature_pipeline = get_feature_pipeline(loaded_model, ref_profile)
+    rule_engine = DataValidation().create_rule_engine("predict")
+
+    if batch_size:
+        while True:
+            with DataIngestion().claim_data(config["prediction_table"], batch_size) as (
+                pred_data,
+                connection,
+            ):
+                if pred_data.empty:
+                    break
+                predict_batch(
+                    config,
+                    loaded_model,
+                    pred_data,
+                    feature_pipeline,
+                    rule_engine,
+                    connection=connection,
+                )
+
+    else:
+        delete_data(config)
+        predict_batch(config, loaded_model, pred_data, feature_pipeline, rule_engine)
 
 
 if __name__ == "__main__":
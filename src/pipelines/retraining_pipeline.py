@@ -2,15 +2,18 @@
 Module for defining a Prefect flow to orchestrate a machine learning retraining pipeline.
 
 This module includes tasks for data ingestion, transformation, validation,
-train-test split, and model retraining.
+feature pipeline fitting, reference profiling, train-test split, and model retraining.
 """
 
 from prefect import flow
 
 from src.pipelines.common.training_tasks import (
+    fit_feature_pipeline,
+    fit_imputer,
     get_data,
     retrain_model,
     select_data,
+    store_reference_profile,
     train_test_split,
     validate_data,
 )
@@ -28,9 +31,12 @@ def retraining_pipeline():
     cfg = get_cfg("pipelines/retraining_pipeline.yaml")
     data = get_data()
     selected_data = select_data(data)
-    validated_data = validate_data(selected_data)
+    imputer = fit_imputer(selected_data)
+    validated_data = validate_data(selected_data, imputer)
+    feature_pipeline = fit_feature_pipeline(validated_data, imputer)
     train_test_split_data = train_test_split(validated_data)
-    retrain_model(train_test_split_data, cfg)
+    retrain_model(train_test_split_data, cfg, feature_pipeline)
+    store_reference_profile(feature_pipeline)
 
 
 if __name__ == "__main__":
@@ -2,13 +2,16 @@
 Module for defining a Prefect flow to orchestrate a machine learning training pipeline.
 
 This module includes tasks for data ingestion, transformation, validation,
-train-test split, and model training.
+feature pipeline fitting, reference profiling, train-test split, and model training.
 """
 from prefect import flow
 
 from src.pipelines.common.training_tasks import (
+    fit_feature_pipeline,
+    fit_imputer,
     get_data,
     select_data,
+    store_reference_profile,
     train_model,
     train_test_split,
     validate_data,
@@ -25,9 +28,12 @@ def training_pipeline():
     """
     data = get_data()
     selected_data = select_data(data)
-    validated_data = validate_data(selected_data)
+    imputer = fit_imputer(selected_data)
+    validated_data = validate_data(selected_data, imputer)
     train_test_split_data = train_test_split(validated_data)
-    train_model(train_test_split_data)
+    feature_pipeline = fit_feature_pipeline(validated_data, imputer)
+    train_model(train_test_split_data, feature_pipeline)
+    store_reference_profile(feature_pipeline)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ Example:
     config_file = get_cfg("./.cfg/logger.yaml")
     print(f"The logger path is: {config_file['path']}")
 """
+import glob
 import os
 
 import yaml
@@ -49,3 +50,30 @@ def get_root() -> str:
         script_path = os.path.dirname(script_path)
 
     return script_path
+
+
+def prune_cache(folder, pattern, max_entries):
+    """
+    Delete the least recently used entries of a cache folder.
+
+    Only the ``max_entries`` files matching the pattern that were modified last
+    are kept. Cache hits touch their file, so these are the most recently used
+    entries. Files deleted concurrently by another process are skipped.
+
+    Args:
+        folder (str): Directory of the cache.
+        pattern (str): Glob pattern of the cache entries in the folder.
+        max_entries (int): Number of entries to keep.
+    """
+    entries = []
+    for path in glob.glob(os.path.join(glob.escape(os.fspath(folder)), pattern)):
+        try:
+            entries.append((os.stat(path).st_mtime_ns, path))
+        except FileNotFoundError:
+            continue
+
+    for _, path in sorted(entries, reverse=True)[max_entries:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
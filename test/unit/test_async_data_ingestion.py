@@ -0,0 +1,60 @@
+"""
+Test Async Data Ingestion.
+
+This module contains test cases for the AsyncDataIngestion class
+from the async_data_ingestion module.
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from src.components.async_data_ingestion import AsyncDataIngestion
+from src.utility import get_cfg
+
+
+@pytest.fixture(name="async_data_ingestion_object")
+def fixture_async_data_ingestion_object():
+    """
+    Fixture for AsyncDataIngestion Object.
+
+    This fixture creates and returns an instance of the AsyncDataIngestion class.
+    Changes the path of the data to the test file
+
+    Returns:
+        AsyncDataIngestion: An instance of the AsyncDataIngestion class.
+    """
+    async_data_ingestion_object = AsyncDataIngestion()
+    async_data_ingestion_object.data_ingestion.ingestion_config = get_cfg(
+        "test/unit/test_data_ingestion.yaml"
+    )
+    return async_data_ingestion_object
+
+
+def test_concurrent_ingestion(async_data_ingestion_object):
+    """
+    Tests that concurrent reads and writes return the same data as sequential ones.
+
+    Args:
+        async_data_ingestion_object (AsyncDataIngestion): An instance of the
+            AsyncDataIngestion class.
+    """
+    sample_data = pd.DataFrame({"preds": [1.2, 3.4], "tr_data": [1, 2]})
+
+    async def run():
+        await async_data_ingestion_object.bulk_write_data(
+            sample_data, "test_async_ingestion", replace=True
+        )
+        return await asyncio.gather(
+            async_data_ingestion_object.initiate_data_ingestion(),
+            async_data_ingestion_object.get_sql_table("test_async_ingestion"),
+            async_data_ingestion_object.get_sql_table("test_async_ingestion"),
+        )
+
+    file_data, *sql_data = asyncio.run(run())
+
+    assert isinstance(file_data, pd.DataFrame), "File data should be a DataFrame"
+    for data in sql_data:
+        pd.testing.assert_frame_equal(data, sample_data)
+
+    asyncio.run(async_data_ingestion_object.delete_data("test_async_ingestion"))
@@ -0,0 +1,42 @@
+"""
+Test Connection Manager.
+
+This module contains test cases for the ConnectionManager class
+from the connection_manager module.
+"""
+import pandas as pd
+
+from src.components.connection_manager import get_connection_manager
+from src.components.data_ingestion import DataIngestion
+
+
+def test_shared_manager():
+    """
+    Tests that all callers in a process share one connection manager.
+    """
+    assert (
+        get_connection_manager() is get_connection_manager()
+    ), "Connection manager should be shared within a process"
+
+
+def test_pool_stats():
+    """
+    Tests that checkouts are recorded and connections are returned to the pool.
+    """
+    manager = get_connection_manager()
+    checkouts = manager.get_stats().checkouts
+
+    with manager.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        stats = manager.get_stats()
+        assert stats.checked_out >= 1, "Connection should be checked out"
+        assert stats.saturation > 0, "Saturation should reflect the checkout"
+
+    data_ingestion_object = DataIngestion()
+    data_ingestion_object.write_data(pd.DataFrame({"a": [1]}), "test_pool_stats")
+    data_ingestion_object.delete_data("test_pool_stats")
+    stats = manager.get_stats()
+    assert stats.checkouts == checkouts + 3, "Every checkout should be recorded"
+    assert stats.checked_out == 0, "Connections should be returned to the pool"
+    assert stats.max_checkout_ms >= stats.avg_checkout_ms >= 0
@@ -6,11 +6,18 @@ This module contains test cases for the DataIngestion class
 """
 import os
 from test.test_utility import upload_data
+from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from src.components.connection_manager import get_connection_manager
 from src.components.data_ingestion import DataIngestion
+from src.errors.data_ingestion_errors import (
+    MultipleFilesError,
+    UnsupportedFilterError,
+)
 from src.utility import get_cfg
 
 
@@ -92,3 +99,404 @@ def test_write_delete(data_ingestion_object, sample_data):
     """
     data_ingestion_object.write_data(sample_data, "test_write_delete")
     data_ingestion_object.delete_data("test_write_delete")
+
+
+def test_sql_chunked_ingestion(data_ingestion_object):
+    """
+    Test the chunked SQL data ingestion method.
+
+    This function checks that the table is streamed in chunks no larger than
+    the configured chunksize and that the chunks add up to the whole table.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+    """
+    data_path = os.path.join(
+        data_ingestion_object.ingestion_config["training_data_folder_path"],
+        "synthetic_unformatted.xlsx",
+    )
+
+    upload_data(data_path, "synthetic_unformatted")
+    chunksize = data_ingestion_object.ingestion_config["chunksize"]
+    chunks = list(data_ingestion_object.get_sql_table_chunks("synthetic_unformatted"))
+    data = data_ingestion_object.get_sql_table("synthetic_unformatted")
+
+    assert all(len(chunk) <= chunksize for chunk in chunks), "Chunk is too large"
+    assert sum(len(chunk) for chunk in chunks) == len(data), "Rows are missing"
+    assert all(
+        chunk.columns.equals(data.columns) for chunk in chunks
+    ), "Chunk columns should match the table columns"
+
+
+def test_sql_projection_filters(data_ingestion_object):
+    """
+    Test column projection and row filters of the SQL ingestion methods.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+    """
+    data = pd.DataFrame(
+        {"batch": [1, 1, 2, 3], "a": [0.5, 1.5, 2.5, 3.5], "b": list("wxyz")}
+    )
+    data_ingestion_object.bulk_write_data(data, "test_projection", replace=True)
+
+    assert data_ingestion_object.get_table_columns("test_projection") == [
+        "batch",
+        "a",
+        "b",
+    ], "Table columns should be returned in table order"
+
+    projected = data_ingestion_object.get_sql_table(
+        "test_projection", columns=["b", "a"]
+    )
+    assert projected.columns.tolist() == [
+        "b",
+        "a",
+    ], "Only the requested columns should be read"
+
+    filtered = data_ingestion_object.get_sql_table(
+        "test_projection",
+        columns=["a"],
+        filters=[("batch", "in", [1, 3]), ("a", ">", 1)],
+    )
+    assert filtered["a"].tolist() == [1.5, 3.5], "Only the matching rows should be read"
+
+    chunks = data_ingestion_object.get_sql_table_chunks(
+        "test_projection", filters=[("a", "between", [1, 3])]
+    )
+    assert pd.concat(chunks)["b"].tolist() == ["x", "y"], "Chunks should be filtered"
+
+    with pytest.raises(UnsupportedFilterError):
+        data_ingestion_object.get_sql_table(
+            "test_projection", filters=[("a", "like", 1)]
+        )
+
+    data_ingestion_object.delete_data("test_projection", filters=[("batch", "=", 1)])
+    remaining = data_ingestion_object.get_sql_table("test_projection")
+    assert remaining["batch"].tolist() == [
+        2,
+        3,
+    ], "Only the matching rows should be deleted"
+
+    data_ingestion_object.delete_data("test_projection")
+
+
+def test_bulk_write(data_ingestion_object, sample_data):
+    """
+    Tests the COPY based bulk_write_data method of the DataIngestion class.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        sample_data (pd.DataFrame): A DataFrame for testing data writing.
+    """
+    sample_data = pd.concat([sample_data, sample_data.iloc[:1] * float("nan")])
+
+    data_ingestion_object.bulk_write_data(sample_data, "test_bulk_write", replace=True)
+    data = data_ingestion_object.get_sql_table("test_bulk_write")
+    assert len(data) == len(sample_data), "Table contents should be replaced"
+
+    data_ingestion_object.bulk_write_data(sample_data, "test_bulk_write")
+    data = data_ingestion_object.get_sql_table("test_bulk_write")
+    assert len(data) == 2 * len(sample_data), "Rows should be appended"
+    assert data["preds"].isna().sum() == 2, "NaN should be written as NULL"
+    data_ingestion_object.delete_data("test_bulk_write")
+
+
+def test_bulk_write_replace_keeps_table(data_ingestion_object, sample_data):
+    """
+    Tests that replacing the table contents keeps its sequences and views.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        sample_data (pd.DataFrame): A DataFrame for testing data writing.
+    """
+    with get_connection_manager().begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS test_bulk_replace CASCADE")
+        connection.exec_driver_sql(
+            "CREATE TABLE test_bulk_replace "
+            "(id serial, preds double precision, tr_data bigint)"
+        )
+        connection.exec_driver_sql(
+            "CREATE VIEW test_bulk_replace_view AS SELECT * FROM test_bulk_replace"
+        )
+
+    for _ in range(2):
+        data_ingestion_object.bulk_write_data(
+            sample_data, "test_bulk_replace", replace=True
+        )
+    data = data_ingestion_object.get_sql_table("test_bulk_replace_view")
+    assert len(data) == len(sample_data), "Table contents should be replaced"
+    assert data["id"].tolist() == [3, 4], "The serial sequence should be kept"
+
+    with get_connection_manager().begin() as connection:
+        connection.exec_driver_sql("DROP TABLE test_bulk_replace CASCADE")
+
+
+def test_claim_data(data_ingestion_object, sample_data):
+    """
+    Tests the claim_data method of the DataIngestion class.
+
+    Claimed rows should be removed from the queue only on success, together
+    with the results written through the claim connection, and concurrent
+    claims should never return the same rows.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        sample_data (pd.DataFrame): A DataFrame for testing the queue.
+    """
+    data_ingestion_object.bulk_write_data(sample_data, "test_claim_data", replace=True)
+    data_ingestion_object.bulk_write_data(
+        sample_data.head(0), "test_claim_results", replace=True
+    )
+
+    with pytest.raises(RuntimeError):
+        with data_ingestion_object.claim_data("test_claim_data", 1) as (
+            data,
+            connection,
+        ):
+            data_ingestion_object.bulk_write_data(
+                data, "test_claim_results", replace=True, connection=connection
+            )
+            raise RuntimeError
+    queue = data_ingestion_object.get_sql_table("test_claim_data")
+    assert len(queue) == len(sample_data), "Failed claim should be rolled back"
+    results = data_ingestion_object.get_sql_table("test_claim_results")
+    assert results.empty, "Results should roll back with the claim"
+
+    with data_ingestion_object.claim_data("test_claim_data", 1) as (first, connection):
+        data_ingestion_object.write_data(first, "test_claim_results", connection)
+        with data_ingestion_object.claim_data("test_claim_data", 1) as (second, _):
+            assert len(first) == len(second) == 1, "Claim should be bounded"
+            assert not first.equals(second), "Rows should not be claimed twice"
+    results = data_ingestion_object.get_sql_table("test_claim_results")
+    assert len(results) == 1, "Results should commit with the claim"
+
+    with data_ingestion_object.claim_data("test_claim_data", 1) as (data, _):
+        assert data.empty, "All rows should have been claimed"
+    data_ingestion_object.delete_data("test_claim_results")
+
+
+def test_consume_data(data_ingestion_object, sample_data):
+    """
+    Tests the consume_data method of the DataIngestion class.
+
+    Only the streamed rows should be deleted, so rows inserted while the
+    stream runs are kept, and a failed stream should not delete anything.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        sample_data (pd.DataFrame): A DataFrame for testing the table.
+    """
+    data_ingestion_object.bulk_write_data(
+        sample_data, "test_consume_data", replace=True
+    )
+
+    with pytest.raises(RuntimeError):
+        with data_ingestion_object.consume_data("test_consume_data", 1) as chunks:
+            next(chunks)
+            raise RuntimeError
+    table = data_ingestion_object.get_sql_table("test_consume_data")
+    assert len(table) == len(sample_data), "Failed stream should not delete rows"
+
+    with data_ingestion_object.consume_data("test_consume_data", 1) as chunks:
+        streamed = [next(chunks)]
+        data_ingestion_object.write_data(sample_data.head(1), "test_consume_data")
+        streamed.extend(chunks)
+    assert len(streamed) == len(sample_data), "Only the snapshot should be streamed"
+    table = data_ingestion_object.get_sql_table("test_consume_data")
+    pd.testing.assert_frame_equal(
+        table, data_ingestion_object.downcast_data(sample_data.head(1))
+    )
+
+    data_ingestion_object.delete_data("test_consume_data")
+
+
+def test_incremental_data(data_ingestion_object, sample_data, tmp_path):
+    """
+    Tests the watermark based incremental_data method of the DataIngestion class.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        sample_data (pd.DataFrame): A DataFrame for testing incremental reads.
+        tmp_path (pathlib.Path): Temporary directory for the watermark store.
+    """
+    data_ingestion_object.ingestion_config["watermark_store_path"] = str(
+        tmp_path / "watermarks.json"
+    )
+    data_ingestion_object.ingestion_config["watermark_lag"] = 86400
+    sample_data["timestamp"] = pd.to_datetime(["2024-01-01", "2024-01-02"])
+    data_ingestion_object.bulk_write_data(sample_data, "test_incremental", replace=True)
+
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert len(data) == len(sample_data), "First run should read all rows"
+
+    sample_data["timestamp"] += pd.Timedelta(days=2)
+    data_ingestion_object.bulk_write_data(sample_data.iloc[:1], "test_incremental")
+
+    with pytest.raises(RuntimeError):
+        with data_ingestion_object.incremental_data("test_incremental", "timestamp"):
+            raise RuntimeError
+
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert len(data) == 1, "Only rows after the watermark should be read"
+
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert data.empty, "No new rows should be read"
+
+    late_data = sample_data.iloc[:1].copy()
+    late_data["preds"] = 0.0
+    data_ingestion_object.bulk_write_data(late_data, "test_incremental")
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert len(data) == 1, "Late rows at the watermark should be read"
+
+    late_data["timestamp"] -= pd.Timedelta(hours=12)
+    data_ingestion_object.bulk_write_data(late_data, "test_incremental")
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert len(data) == 1, "Late rows within the lag should be read once"
+    with data_ingestion_object.incremental_data(
+        "test_incremental", "timestamp"
+    ) as data:
+        assert data.empty, "Processed rows within the lag should not be read again"
+
+
+def test_data_ingestion_cache(data_ingestion_object, tmp_path):
+    """
+    Tests that ingested files are cached as Parquet and read back from the cache.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        tmp_path (pathlib.Path): Temporary directory for the cache.
+    """
+    data_ingestion_object.ingestion_config["cache_folder"] = str(tmp_path)
+
+    df = data_ingestion_object.initiate_data_ingestion()
+    assert len(list(tmp_path.glob("*.parquet"))) == 1, "Parsed file should be cached"
+
+    with patch.object(DataIngestion, "_get_file_hash", side_effect=AssertionError):
+        cached_df = data_ingestion_object.initiate_data_ingestion()
+        assert data_ingestion_object.get_data_columns() == df.columns.tolist()
+    pd.testing.assert_frame_equal(df, cached_df)
+
+    # pylint: disable=W0212
+    os.utime(data_ingestion_object._get_supported_file())
+    with patch.object(
+        DataIngestion, "_get_file_hash", wraps=DataIngestion._get_file_hash
+    ) as get_file_hash:
+        data_ingestion_object.initiate_data_ingestion()
+        assert get_file_hash.call_count == 1, "Touched files should be hashed again"
+    assert len(list(tmp_path.glob("*.parquet"))) == 1, "Same content, same cache"
+
+    columns = list(df.columns[:3])
+    pruned_df = data_ingestion_object.initiate_data_ingestion(columns=columns)
+    assert list(pruned_df.columns) == columns, "Only requested columns should be read"
+
+
+def test_multiple_files_ingestion(data_ingestion_object, tmp_path):
+    """
+    Tests ingestion of a folder with several files and partitioned Parquet shards.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        tmp_path (pathlib.Path): Temporary training data folder.
+    """
+    pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}).to_csv(
+        tmp_path / "campaign_1.csv", index=False
+    )
+    shard_path = tmp_path / "campaign=2"
+    shard_path.mkdir()
+    pd.DataFrame({"a": [0.5], "c": [3]}).to_parquet(shard_path / "part-0.parquet")
+    data_ingestion_object.ingestion_config["training_data_folder_path"] = str(tmp_path)
+    data_ingestion_object.ingestion_config["cache_folder"] = str(tmp_path / ".cache")
+
+    df = data_ingestion_object.initiate_data_ingestion()
+    assert len(df) == 2, "Subfolders should only be searched for multiple files"
+
+    pd.DataFrame({"a": [3]}).to_csv(tmp_path / "campaign_3.csv", index=False)
+    with pytest.raises(MultipleFilesError):
+        data_ingestion_object.initiate_data_ingestion()
+
+    data_ingestion_object.ingestion_config["multiple_files"] = True
+    df = data_ingestion_object.initiate_data_ingestion()
+    assert set(df.columns) == {"a", "b", "c", "campaign"}, "Columns should be merged"
+    assert len(df) == 4, "Rows of all files should be read"
+    assert df["a"].dtype == "float64", "Numeric dtypes should be promoted"
+
+    frames = list(data_ingestion_object.iter_data_files(columns=["a", "c"]))
+    assert len(frames) == 3, "One frame per file should be yielded"
+    assert all(list(frame.columns) == ["a", "c"] for frame in frames)
+
+
+def test_same_name_files_cache(data_ingestion_object, tmp_path):
+    """
+    Tests that same-named files in different subfolders are cached separately.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+        tmp_path (pathlib.Path): Temporary training data folder.
+    """
+    for campaign, value in [("a", 1), ("b", 2)]:
+        (tmp_path / campaign).mkdir()
+        pd.DataFrame({"a": [value]}).to_csv(
+            tmp_path / campaign / "data.csv", index=False
+        )
+    data_ingestion_object.ingestion_config["training_data_folder_path"] = str(tmp_path)
+    data_ingestion_object.ingestion_config["cache_folder"] = str(tmp_path / ".cache")
+    data_ingestion_object.ingestion_config["multiple_files"] = True
+
+    df = data_ingestion_object.initiate_data_ingestion()
+    cached_df = data_ingestion_object.initiate_data_ingestion()
+    assert sorted(df["a"]) == sorted(cached_df["a"]) == [1, 2]
+    cache_folder = tmp_path / ".cache"
+    assert len(list(cache_folder.glob("*.parquet"))) == 2, "One cache per file"
+    assert len(list(cache_folder.glob("*.json"))) == 2, "One index per file"
+
+
+def test_downcast_data(data_ingestion_object):
+    """
+    Test the opt-in dtype downcasting of ingested data.
+
+    Args:
+        data_ingestion_object (DataIngestion): An instance of the DataIngestion class.
+    """
+    data = pd.DataFrame(
+        {
+            "exact": [0.5, 1.25, np.nan, 4.0],
+            "inexact": [0.1, 0.2, 0.3, 0.4],
+            "small_int": [1, 2, 3, 4],
+            "large_int": [1, 2, 3, 2**40],
+            "label": ["a", "b", "a", None],
+            "text": ["w", "x", "y", "z"],
+        }
+    )
+
+    assert data_ingestion_object.downcast_data(data) is data, "Downcasting is opt-in"
+
+    data_ingestion_object.ingestion_config["downcast"]["enabled"] = True
+    downcast = data_ingestion_object.downcast_data(data)
+
+    assert downcast.dtypes.astype(str).tolist() == [
+        "float32",
+        "float64",
+        "int32",
+        "int64",
+        "category",
+        "object",
+    ], "Only lossless casts should be applied"
+    pd.testing.assert_frame_equal(
+        downcast, data, check_dtype=False, check_categorical=False
+    )
+    assert downcast.memory_usage(deep=True).sum() < data.memory_usage(deep=True).sum()
+
+    data_ingestion_object.ingestion_config["downcast"]["float_tolerance"] = 1e-6
+    downcast = data_ingestion_object.downcast_data(data)
+    assert downcast["inexact"].dtype == np.float32, "Tolerance should allow float32"
@@ -10,6 +10,7 @@ from test.test_utility import (
     create_synthetic_data,
 )
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -59,6 +60,42 @@ def test_data_selection(data_transformation_object):
     # Check if dataframes of different length after selection
     assert len(synthetic_data.columns) > len(selected_data.columns)
 
+    # Check if the resolved columns match the selected ones
+    resolved_columns = data_transformation_object.resolve_columns(
+        synthetic_data.columns.tolist()
+    )
+    assert resolved_columns == selected_data.columns.tolist()
+
+
+def test_selection_plan(data_transformation_object):
+    """
+    Test Compiled Column Selection.
+
+    This test case verifies that the selection plan is compiled once per column
+    schema, selects the same columns of DataFrames and NumPy arrays and leaves
+    the config unchanged.
+
+    Args:
+        data_transformation_object (DataTransformation): An instance of the DataTransformation class
+    """
+    data_transformation_object.transformation_config["features"] = ["GH", "ph"]
+    synthetic_data = create_synthetic_data()
+
+    first_selection = data_transformation_object.select_data(synthetic_data)
+    second_selection = data_transformation_object.select_data(synthetic_data)
+    assert data_transformation_object.transformation_config["features"] == [
+        "GH",
+        "ph",
+    ], "select_data should not change the config"
+    assert first_selection.columns.tolist() == second_selection.columns.tolist()
+
+    plan = data_transformation_object.selection_plan(synthetic_data.columns)
+    assert plan is data_transformation_object.selection_plan(synthetic_data.columns)
+    assert plan.columns == first_selection.columns.tolist()
+    np.testing.assert_array_equal(
+        plan.apply(synthetic_data.to_numpy()), first_selection.to_numpy()
+    )
+
 
 def test_train_test_split(data_transformation_object):
     """
@@ -85,6 +122,38 @@ def test_train_test_split(data_transformation_object):
     ), "Wrong target selection"
 
 
+def test_view_train_test_split(data_transformation_object):
+    """
+    Test View Train Test Split Functionality.
+
+    This test case verifies that the view split mode returns views of a single
+    array with the same rows and columns as the copy split mode.
+
+    Args:
+        data_transformation_object (DataTransformation): An instance of the DataTransformation class
+    """
+    synthetic_data = create_synthetic_data()
+    data_transformation_object.transformation_config["split_mode"] = "view"
+    view_split = data_transformation_object.create_train_test_split(synthetic_data)
+    data_transformation_object.transformation_config["split_mode"] = "copy"
+    copy_split = data_transformation_object.create_train_test_split(synthetic_data)
+
+    for name in ["x_train", "y_train", "x_test", "y_test"]:
+        np.testing.assert_array_equal(
+            getattr(view_split, name), getattr(copy_split, name)
+        )
+        assert getattr(view_split, name).base is view_split.x_train.base
+    assert view_split.feature_names.tolist() == copy_split.feature_names.tolist()
+
+    np.testing.assert_array_equal(
+        view_split.x_test,
+        synthetic_data.iloc[view_split.test_index][view_split.feature_names],
+    )
+    assert len(view_split.train_index) + len(view_split.test_index) == len(
+        synthetic_data
+    )
+
+
 def test_clean_data(data_transformation_object):
     """
     Test Data Cleaning Functionality.
@@ -112,3 +181,42 @@ def test_clean_data(data_transformation_object):
     assert any(
         synthetic_data.columns == clean_data.columns
     ), "clean_data columns should not be changed"
+
+
+def test_clean_data_with_imputer(data_transformation_object):
+    """
+    Test Data Cleaning With a Fitted Imputer.
+
+    This test case verifies that clean_data applies an imputer fitted on the
+    feature columns of the training data to prediction data.
+
+    Args:
+        data_transformation_object (DataTransformation): An instance of the DataTransformation class
+    """
+    data_transformation_object.transformation_config["imputation"]["method"] = "median"
+    train_data = create_nan_data()
+    imputer = data_transformation_object.fit_imputer(train_data)
+    assert imputer.columns == data_transformation_object.resolve_columns(
+        train_data.columns, select_target=False
+    )
+
+    pred_data = create_nan_data()[imputer.columns]
+    clean_data = data_transformation_object.clean_data(
+        pred_data, ["nan_imputable"], imputer
+    )
+    assert not clean_data.isnull().values.any(), "clean_data should have no NaN values"
+    nan_mask = pred_data.isna().to_numpy()
+    assert (
+        clean_data.to_numpy()[nan_mask] == imputer.medians[nan_mask.nonzero()[1]]
+    ).all()
+
+    target_columns = train_data.columns.difference(imputer.columns)
+    clean_train_data = data_transformation_object.clean_data(
+        train_data, ["nan_imputable"], imputer
+    )
+    assert clean_train_data.columns.equals(train_data.columns), "Targets are kept"
+    assert not clean_train_data.isnull().values.any(), "NaN targets are dropped"
+    pd.testing.assert_frame_equal(
+        clean_train_data[target_columns],
+        train_data[target_columns].dropna().reset_index(drop=True),
+    )
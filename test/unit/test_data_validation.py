@@ -11,20 +11,31 @@ from test.test_utility import (
     create_synthetic_data,
 )
 
+import numpy as np
+import pandas as pd
 import pytest
 
 from src.components.data_validation import DataValidation
-from src.errors.data_validation_errors import ColumnsDiffError, DtypeDiffError, NanError
+from src.errors.data_validation_errors import (
+    ColumnsDiffError,
+    DtypeDiffError,
+    NanError,
+    ReferenceProfileNotFoundError,
+)
 from src.utility import get_cfg
 
 
 @pytest.fixture(name="data_validation_object")
-def fixture_validation_object():
+def fixture_validation_object(tmp_path):
     """
     Fixture for DataValidation Object.
 
     This fixture creates and returns an instance of the DataValidation class.
-    Changes the path of the config file to the test one
+    Changes the path of the config file to the test one and the cache folders
+    to a temporary directory.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the caches.
 
     Returns:
         DataValidation: An instance of the DataValidation class.
@@ -33,6 +44,8 @@ def fixture_validation_object():
     data_transformation_object.validation_config = get_cfg(
         "test/unit/test_data_validation.yaml"
     )
+    data_transformation_object.validation_config["reference_profile_folder"] = tmp_path
+    data_transformation_object.validation_config["validation_cache_folder"] = tmp_path
     return data_transformation_object
 
 
@@ -71,6 +84,160 @@ def test_train_validation(data_validation_object):
     ], "Test failed with data that has duplicates and nan values"
 
 
+def test_data_profile(data_validation_object):
+    """
+    Test Data Profile Functionality.
+
+    This test case verifies that the profile_data method of the DataValidation class
+    matches the NaN ratios of the unique rows and the duplicate mask of pandas.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+    """
+    data = create_duplicated_data(create_nan_data(nan_percent=0.1))
+    profile = data_validation_object.profile_data(data)
+
+    unique_data = data.drop_duplicates()
+    expected_ratios = unique_data.isna().sum() / len(unique_data)
+    pd.testing.assert_series_equal(profile.nan_ratios, expected_ratios)
+    assert (profile.duplicated == data.duplicated().to_numpy()).all()
+
+    empty_profile = data_validation_object.profile_data(data.head(0))
+    assert not empty_profile.nan_ratios.any(), "Empty data should have no NaN values"
+    assert data_validation_object.check_training_data(data.head(0)) == []
+
+
+def test_reference_profile_cache(data_validation_object, tmp_path):
+    """
+    Test Reference Profile Caching.
+
+    This test case verifies that the reference profile is stored once per dataset
+    and gives the same drift results as the reference data.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+        tmp_path (pathlib.Path): Temporary directory for the profile cache.
+    """
+    synthetic_data = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+
+    profile = data_validation_object.get_reference_profile(synthetic_data)
+    cached_profile = data_validation_object.get_reference_profile(synthetic_data)
+    assert cached_profile.signature == profile.signature
+    assert len(list(tmp_path.iterdir())) == 1, "Profile should be cached once"
+
+    data_validation_object.validation_config["max_cached_profiles"] = 1
+    other_profile = data_validation_object.get_reference_profile(
+        synthetic_data.head(500)
+    )
+    assert [path.name for path in tmp_path.iterdir()] == [
+        f"reference-{other_profile.signature}.pkl"
+    ], "Least recently used profile should be pruned"
+
+    pred_data = synthetic_data.head(200).copy()
+    assert data_validation_object.check_prediction_data(
+        pred_data, profile
+    ) == data_validation_object.check_prediction_data(pred_data, synthetic_data)
+
+
+def test_stored_reference_profile(data_validation_object, tmp_path):
+    """
+    Test Stored Reference Profile.
+
+    This test case verifies that a stored reference profile can be loaded and
+    used to validate prediction data without the reference data.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+        tmp_path (pathlib.Path): Temporary directory for the profiles.
+    """
+    data_validation_object.validation_config["stored_profile_path"] = str(
+        tmp_path / "state" / "reference_profile.pkl"
+    )
+    with pytest.raises(ReferenceProfileNotFoundError):
+        data_validation_object.load_reference_profile()
+
+    synthetic_data = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+    profile = data_validation_object.get_reference_profile(synthetic_data)
+    profile.target_columns = ["Red KBE"]
+    data_validation_object.store_reference_profile(profile)
+
+    stored_profile = data_validation_object.load_reference_profile()
+    assert stored_profile.schema == profile.schema
+    assert stored_profile.target_columns == ["Red KBE"]
+    assert data_validation_object.check_prediction_data(
+        synthetic_data.head(200), stored_profile
+    ) == data_validation_object.check_prediction_data(
+        synthetic_data.head(200), synthetic_data
+    )
+
+
+def test_parallel_drift_check(data_validation_object):
+    """
+    Test Parallel Drift Check Functionality.
+
+    This test case verifies that the drift check gives the same result and warnings
+    in the same order with several workers as with one.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+    """
+    synthetic_data = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+    drifted_data = create_cat_col(create_synthetic_data() + 1000, [0.65, 0.3, 0.05])
+
+    results = []
+    for drift_workers in [1, 4]:
+        data_validation_object.validation_config["drift_workers"] = drift_workers
+        with pytest.warns(UserWarning) as record:
+            drift_present = data_validation_object.check_data_drift(
+                drifted_data, synthetic_data
+            )
+        results.append((drift_present, [str(warning.message) for warning in record]))
+
+    assert results[0] == results[1], "Parallel drift check should match sequential"
+    assert results[0][0], "Drift should be detected"
+
+
+def test_sampled_drift_report(data_validation_object, tmp_path):
+    """
+    Test Sampled Drift Report Functionality.
+
+    This test case verifies that the drift report is created from a stratified
+    sample of the drifted columns.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+        tmp_path (pathlib.Path): Temporary directory for the report and profile cache.
+    """
+    data_validation_object.validation_config["drift_reports_folder"] = tmp_path
+    data_validation_object.validation_config["report"] = {
+        "sample_rows": 200,
+        "stratify_column": "test_cat_col",
+        "seed": 42,
+        "drifted_columns_only": True,
+    }
+    synthetic_data = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+
+    sample = data_validation_object.sample_rows(synthetic_data, 200, 42, "test_cat_col")
+    assert sample.equals(
+        data_validation_object.sample_rows(synthetic_data, 200, 42, "test_cat_col")
+    ), "Sampling should be reproducible"
+    assert len(sample) == 200, "Sample should use the row budget exactly"
+    pd.testing.assert_series_equal(
+        sample["test_cat_col"].value_counts(normalize=True),
+        synthetic_data["test_cat_col"].value_counts(normalize=True),
+        atol=0.01,
+    )
+    strata = pd.DataFrame({"stratum": np.repeat([1.0, 2.0, np.nan], 10)})
+    sample = data_validation_object.sample_rows(strata, 10, 42, "stratum")
+    assert len(sample) == 10, "Rounded shares should add up to the row budget"
+    assert sample["stratum"].value_counts(dropna=False).between(3, 4).all()
+
+    drifted_data = synthetic_data.copy()
+    drifted_data.iloc[:, 0] += 1000
+    data_validation_object.create_drift_reports(drifted_data, synthetic_data)
+    assert (tmp_path / "drift_report.html").exists(), "Report should be created"
+
+
 def test_prediction_validation(data_validation_object):
     """
     Test Prediction Validation Functionality.
@@ -91,12 +258,12 @@ def test_prediction_validation(data_validation_object):
     diff_cols_data = synthetic_data.rename(
         columns={synthetic_data.columns[0]: "diff_col_name"}
     )
-    with pytest.raises(ColumnsDiffError):
+    with pytest.raises(ColumnsDiffError, match="unexpected columns .'diff_col_name'"):
         data_validation_object.check_prediction_data(diff_cols_data, synthetic_data)
 
     diff_dtype_data = synthetic_data.copy()
     diff_dtype_data.iloc[:, 2] = diff_dtype_data.iloc[:, 2].astype(str)
-    with pytest.raises(DtypeDiffError):
+    with pytest.raises(DtypeDiffError, match="has dtype object instead of"):
         data_validation_object.check_prediction_data(diff_dtype_data, synthetic_data)
 
     nan_data_imputable = create_nan_data() + 1000
@@ -110,3 +277,14 @@ def test_prediction_validation(data_validation_object):
         )
     print(val_issues)
     assert "nan_imputable" in val_issues, "NaN imputable case failed"
+
+    downcast_data = synthetic_data.astype(
+        {
+            column: "float32" if dtype.kind == "f" else "int32"
+            for column, dtype in synthetic_data.dtypes.items()
+            if dtype.kind in "fi"
+        }
+    )
+    assert "drift_detected" not in data_validation_object.check_prediction_data(
+        downcast_data, synthetic_data
+    )
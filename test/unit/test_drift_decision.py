@@ -0,0 +1,109 @@
+"""
+Test Drift Decision.
+
+This module contains test cases for the DriftDecision class
+from the drift_decision module.
+"""
+from test.test_utility import create_synthetic_data
+
+import numpy as np
+import pytest
+from scipy.stats import false_discovery_control, wasserstein_distance
+
+from src.components.data_validation import DataValidation
+from src.components.drift_decision import ColumnDrift, DriftDecision
+from src.components.reference_profile import ReferenceProfile
+from src.errors.data_validation_errors import UnknownCorrectionError
+from src.utility import get_cfg
+
+
+def create_columns(p_values, effect_sizes=None):
+    """
+    Creates drift test results of columns with the given p-values.
+
+    Args:
+        p_values (List[float]): The p-values of the columns.
+        effect_sizes (List[float], optional): The effect sizes of the columns.
+
+    Returns:
+        List[ColumnDrift]: The drift test results.
+    """
+    effect_sizes = effect_sizes or [None] * len(p_values)
+    return [
+        ColumnDrift(f"col_{i}", "Numerical", 0.0, p_value, effect_size)
+        for i, (p_value, effect_size) in enumerate(zip(p_values, effect_sizes))
+    ]
+
+
+def test_corrections():
+    """
+    Tests the multiple testing corrections against their reference values.
+    """
+    p_values = [0.001, 0.008, 0.039, 0.041, 0.042, 0.06, 0.074, 0.205, np.nan]
+
+    result = DriftDecision(alpha=0.05).decide(create_columns(p_values))
+    assert [column.drifted for column in result.columns] == [True] * 5 + [False] * 4
+
+    result = DriftDecision(alpha=0.05, correction="bonferroni").decide(
+        create_columns(p_values)
+    )
+    assert [column.column for column in result.drifted_columns] == ["col_0"]
+
+    result = DriftDecision(alpha=0.05, correction="bh").decide(create_columns(p_values))
+    np.testing.assert_allclose(
+        [column.adjusted_p_value for column in result.columns[:-1]],
+        false_discovery_control(p_values[:-1]),
+    )
+    assert np.isnan(result.columns[-1].adjusted_p_value), "NaN should not be tested"
+
+    with pytest.raises(UnknownCorrectionError):
+        DriftDecision(alpha=0.05, correction="holm")
+
+
+def test_effect_size_and_drift_share():
+    """
+    Tests the effect-size floor and the drift-share threshold.
+    """
+    columns = create_columns([0.001, 0.001, 0.5, 0.5], [0.3, 0.01, 0.3, 0.01])
+
+    result = DriftDecision(alpha=0.05, effect_size_floor=0.1).decide(columns)
+    assert [column.column for column in result.drifted_columns] == ["col_0"]
+    assert result and result.drift_share == 0.25
+
+    result = DriftDecision(alpha=0.05, drift_share=0.5).decide(columns)
+    assert len(result.drifted_columns) == 2 and not result, "Share is not above 0.5"
+
+
+def test_evaluate_drift(tmp_path):
+    """
+    Tests the drift evaluation of the DataValidation class with effect sizes.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the profile cache.
+    """
+    data_validation_object = DataValidation()
+    data_validation_object.validation_config = get_cfg(
+        "test/unit/test_data_validation.yaml"
+    )
+    data_validation_object.validation_config["reference_profile_folder"] = tmp_path
+    data_validation_object.validation_config["cat_cols"] = [None]
+    data_validation_object.validation_config["drift_decision"].update(
+        {"effect_size": "wasserstein", "effect_size_floor": 100}
+    )
+
+    reference = create_synthetic_data()
+    pred_data = reference.copy()
+    pred_data.iloc[:, 0] += 1000
+    pred_data.iloc[:, 1] += 1e-3
+
+    result = data_validation_object.evaluate_drift(pred_data, reference)
+    assert [column.column for column in result.drifted_columns] == [
+        reference.columns[0]
+    ], "Only the column with a large shift should drift"
+
+    profile = ReferenceProfile.from_data(reference, [])
+    for column in reference.columns[:3]:
+        assert np.isclose(
+            profile.wasserstein_distance(column, pred_data[column]),
+            wasserstein_distance(pred_data[column], reference[column]),
+        )
@@ -0,0 +1,133 @@
+"""
+Test Drift Detector.
+
+This module contains test cases for the OnlineDriftDetector class
+from the drift_detector module.
+"""
+from test.test_utility import create_cat_col, create_synthetic_data
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import kruskal
+
+from src.components.data_validation import DataValidation
+from src.errors.data_validation_errors import SketchMergeError
+from src.utility import get_cfg
+
+
+@pytest.fixture(name="data_validation_object")
+def fixture_validation_object(tmp_path):
+    """
+    Fixture for DataValidation Object.
+
+    This fixture creates and returns an instance of the DataValidation class.
+    Changes the path of the config file to the test one
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the profile cache.
+
+    Returns:
+        DataValidation: An instance of the DataValidation class.
+    """
+    data_validation_object = DataValidation()
+    data_validation_object.validation_config = get_cfg(
+        "test/unit/test_data_validation.yaml"
+    )
+    data_validation_object.validation_config["reference_profile_folder"] = tmp_path
+    return data_validation_object
+
+
+def test_merge_sketches(data_validation_object):
+    """
+    Tests that merged partial sketches equal the sketch of the whole data.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+    """
+    reference = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+    pred_data = create_cat_col(create_synthetic_data(), [0.65, 0.3, 0.05])
+
+    full_detector = data_validation_object.create_drift_detector(reference)
+    full_detector.update(pred_data)
+
+    partial_detectors = []
+    for rows in np.array_split(np.arange(len(pred_data)), 3):
+        detector = data_validation_object.create_drift_detector(reference)
+        detector.update(pred_data.iloc[rows])
+        partial_detectors.append(detector)
+    merged_detector = partial_detectors[0]
+    for detector in partial_detectors[1:]:
+        merged_detector.merge(detector)
+
+    assert merged_detector.n_rows == len(pred_data)
+    pd.testing.assert_frame_equal(
+        merged_detector.get_statistics(), full_detector.get_statistics()
+    )
+
+    other_detector = data_validation_object.create_drift_detector(pred_data)
+    with pytest.raises(SketchMergeError):
+        merged_detector.merge(other_detector)
+
+
+def test_stream_drift(data_validation_object):
+    """
+    Tests the drift statistics and the stream drift check.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+    """
+    reference = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+    detector = data_validation_object.create_drift_detector(reference)
+    detector.update(reference)
+
+    statistics = detector.get_statistics()
+    assert (statistics.loc[statistics["test"] == "ks", "statistic"] == 0).all()
+    assert not data_validation_object.check_stream_drift(detector)
+
+    drifted_data = create_cat_col(create_synthetic_data() + 1000, [0.65, 0.3, 0.05])
+    detector = data_validation_object.create_drift_detector(reference)
+    for rows in np.array_split(np.arange(len(drifted_data)), 4):
+        detector.update(drifted_data.iloc[rows])
+
+    with pytest.warns(UserWarning, match="drift detected in column"):
+        assert data_validation_object.check_stream_drift(detector)
+
+    expected = kruskal(drifted_data["test_cat_col"], reference["test_cat_col"])
+    np.testing.assert_allclose(
+        detector.get_statistics()
+        .loc["test_cat_col", ["statistic", "p_value"]]
+        .astype(float),
+        [expected.statistic, expected.pvalue],
+        rtol=1e-9,
+    )
+
+
+def test_stream_drift_decision(data_validation_object):
+    """
+    Tests that the stream drift check follows the configured drift decision.
+
+    Args:
+        data_validation_object (DataValidation): An instance of the DataValidation class
+    """
+    reference = create_cat_col(create_synthetic_data(), [0.3, 0.05, 0.65])
+    drifted_data = create_cat_col(create_synthetic_data() + 1000, [0.65, 0.3, 0.05])
+    detector = data_validation_object.create_drift_detector(reference)
+    detector.update(drifted_data)
+    psi = detector.get_statistics()["psi"]
+
+    decision_config = data_validation_object.validation_config["drift_decision"]
+    decision_config.update(effect_size="psi", effect_size_floor=psi.max() + 1)
+    drift_result = data_validation_object.check_stream_drift(detector)
+    assert not drift_result, "Drift below the effect-size floor should be ignored"
+    assert [column.column for column in drift_result.columns] == psi.index.tolist()
+    assert [column.effect_size for column in drift_result.columns] == psi.tolist()
+
+    decision_config.update(effect_size_floor=psi.min())
+    with pytest.warns(UserWarning, match="drift detected in column"):
+        drift_result = data_validation_object.check_stream_drift(detector)
+    assert len(drift_result.drifted_columns) == len(psi)
+
+    decision_config.update(drift_share=1.0)
+    with pytest.warns(UserWarning, match="drift detected in column"):
+        assert not data_validation_object.check_stream_drift(detector)
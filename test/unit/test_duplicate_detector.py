@@ -0,0 +1,35 @@
+"""
+Test Duplicate Detector.
+
+This module contains test cases for the DuplicateDetector class
+from the duplicate_detector module.
+"""
+from test.test_utility import create_duplicated_data, create_nan_data
+
+import numpy as np
+
+from src.components.duplicate_detector import DuplicateDetector
+
+
+def test_duplicates_across_chunks():
+    """
+    Tests that the duplicate masks of the chunks match the one of the whole data.
+    """
+    data = create_duplicated_data(create_nan_data(nan_percent=0.1), fraction=0.3)
+    data = data.sample(frac=1, random_state=0, ignore_index=True)
+    expected = data.duplicated().to_numpy()
+
+    detector = DuplicateDetector()
+    np.testing.assert_array_equal(detector.update(data), expected)
+
+    detector = DuplicateDetector()
+    chunks = np.array_split(np.arange(len(data)), 7)
+    duplicated = np.concatenate([detector.update(data.iloc[rows]) for rows in chunks])
+    np.testing.assert_array_equal(duplicated, expected)
+    assert detector.n_unique == np.count_nonzero(~expected)
+    assert all(
+        len(older) > 2 * len(newer)
+        for older, newer in zip(detector.runs, detector.runs[1:])
+    ), "Runs should shrink geometrically"
+
+    assert detector.update(data.head(50)).all(), "Seen rows should be duplicates"
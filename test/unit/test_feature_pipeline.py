@@ -0,0 +1,89 @@
+"""
+Test Feature Pipeline.
+
+This module contains test cases for the FeaturePipeline class
+from the feature_pipeline module.
+"""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.feature_pipeline import FEATURE_PIPELINE_VERSION, FeaturePipeline
+from src.components.imputer import create_imputer
+from src.components.reference_profile import ReferenceProfile
+from src.errors.data_transformation_errors import FeaturePipelineVersionError
+from src.errors.data_validation_errors import ColumnsDiffError
+
+
+@pytest.fixture(name="feature_pipeline")
+def fixture_feature_pipeline():
+    """
+    Fixture for a FeaturePipeline fitted on small training data.
+
+    Returns:
+        FeaturePipeline: The fitted feature pipeline.
+    """
+    rng = np.random.default_rng(0)
+    train_data = pd.DataFrame(
+        {
+            "ph": rng.normal(7, 1, size=100),
+            "Temperatur": rng.integers(20, 90, size=100),
+        }
+    )
+    train_data.loc[rng.random(100) < 0.1, "ph"] = np.nan
+    profile = ReferenceProfile.from_data(train_data, [])
+    profile.target_columns = ["Red KBE", "Energie"]
+    return FeaturePipeline(
+        profile, create_imputer({"method": "median"}).fit(train_data)
+    )
+
+
+def test_select(feature_pipeline):
+    """
+    Test Feature Selection.
+
+    This test case verifies that the feature columns are selected in training
+    order and that missing feature columns raise an error.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The fitted feature pipeline.
+    """
+    pred_data = pd.DataFrame(
+        {"Temperatur": [25, 30], "id": [1, 2], "ph": [7.0, np.nan]}
+    )
+    selected = feature_pipeline.select(pred_data)
+    assert selected.columns.tolist() == ["ph", "Temperatur"]
+    assert feature_pipeline.dtypes == {"ph": "float64", "Temperatur": "int64"}
+    assert not feature_pipeline.imputer.transform(selected).isna().any().any()
+
+    with pytest.raises(ColumnsDiffError, match="missing columns \\['ph'\\]"):
+        feature_pipeline.select(pred_data.drop(columns="ph"))
+
+
+def test_save_load(feature_pipeline, tmp_path):
+    """
+    Test Feature Pipeline Persistence.
+
+    This test case verifies that a saved feature pipeline is loaded with its
+    columns, targets and imputer, and that incompatible versions are rejected.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The fitted feature pipeline.
+        tmp_path (pathlib.Path): Temporary directory for the feature pipeline.
+    """
+    feature_pipeline.save(tmp_path / "feature_pipeline.pkl")
+    loaded = FeaturePipeline.load(tmp_path / "feature_pipeline.pkl")
+    assert loaded.feature_columns == feature_pipeline.feature_columns
+    assert loaded.target_columns == ["Red KBE", "Energie"]
+    np.testing.assert_array_equal(
+        loaded.imputer.medians, feature_pipeline.imputer.medians
+    )
+
+    outdated = dataclasses.replace(
+        feature_pipeline, version=FEATURE_PIPELINE_VERSION - 1
+    )
+    outdated.save(tmp_path / "outdated.pkl")
+    with pytest.raises(FeaturePipelineVersionError):
+        FeaturePipeline.load(tmp_path / "outdated.pkl")
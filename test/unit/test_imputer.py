@@ -0,0 +1,111 @@
+"""
+Test Imputer.
+
+This module contains test cases for the imputers from the imputer module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.imputer import Imputer, create_imputer
+from src.errors.data_transformation_errors import UnknownImputerError
+
+
+def create_data(n_rows, seed):
+    """
+    Creates correlated data with NaN values in the first column.
+
+    Args:
+        n_rows (int): Number of rows.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: The data.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n_rows)
+    data = pd.DataFrame(
+        {
+            "a": base + rng.normal(scale=0.1, size=n_rows),
+            "b": base,
+            "c": rng.integers(0, 10, size=n_rows),
+        }
+    )
+    data.loc[rng.random(n_rows) < 0.1, "a"] = np.nan
+    return data
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"method": "median"},
+        {"method": "knn", "n_neighbors": 3},
+        {"method": "mice", "iterations": 2},
+        {
+            "method": "mice",
+            "iterations": 2,
+            "save_all_iterations": True,
+            "nan_columns_only": False,
+            "workers": 2,
+        },
+    ],
+)
+def test_imputers(config, tmp_path):
+    """
+    Tests that a fitted imputer fills the NaN values of new data and can be
+    persisted.
+
+    Args:
+        config (dict): The imputation config.
+        tmp_path (pathlib.Path): Temporary directory for the imputer.
+    """
+    train_data = create_data(300, seed=0)
+    imputer = create_imputer(config)
+    imputed_train = imputer.fit_transform(train_data)
+    assert not imputed_train.isna().any().any(), "Training data should be imputed"
+
+    new_data = create_data(50, seed=1)[["c", "b", "a"]]
+    new_data.loc[:4, "b"] = np.nan
+    imputed = imputer.transform(new_data)
+    assert imputed.columns.tolist() == ["a", "b", "c"]
+    assert not imputed.isna().any().any(), "New data should be imputed"
+    observed = new_data.notna().to_numpy()[:, [2, 1, 0]]
+    np.testing.assert_array_equal(
+        imputed.to_numpy()[observed], new_data[["a", "b", "c"]].to_numpy()[observed]
+    )
+
+    imputer.save(tmp_path / "imputer.pkl")
+    pd.testing.assert_frame_equal(
+        Imputer.load(tmp_path / "imputer.pkl").transform(new_data), imputed
+    )
+
+
+def test_median_imputer():
+    """
+    Tests that the median imputer fills the training medians.
+    """
+    train_data = create_data(300, seed=0)
+    imputer = create_imputer({"method": "median"}).fit(train_data)
+    new_data = pd.DataFrame({"a": [np.nan, 1.0], "b": [2.0, np.nan], "c": [1, 2]})
+
+    imputed = imputer.transform(new_data)
+    assert imputed.loc[0, "a"] == train_data["a"].median()
+    assert imputed.loc[1, "b"] == train_data["b"].median()
+
+    with pytest.raises(UnknownImputerError):
+        create_imputer({"method": "mean"})
+
+
+def test_mice_settings():
+    """
+    Tests that the MICE settings control the trained models and kept iterations.
+    """
+    train_data = create_data(300, seed=0)
+    imputer = create_imputer({"method": "mice", "iterations": 3}).fit(train_data)
+    assert list(imputer.kernel.variable_training_order) == [0], "Only a has NaN"
+    assert imputer.kernel.iteration_count() == 3
+
+    imputer = create_imputer(
+        {"method": "mice", "iterations": 3, "nan_columns_only": False}
+    ).fit(train_data)
+    assert sorted(imputer.kernel.variable_training_order) == [0, 1, 2]
@@ -0,0 +1,139 @@
+"""
+Test Model Loader.
+
+This module contains test cases for the get_models function
+from the model_loader module.
+"""
+import dataclasses
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.feature_pipeline import FeaturePipeline
+from src.components.imputer import create_imputer
+from src.components.model_loader import get_models
+from src.components.reference_profile import ReferenceProfile, SchemaFingerprint
+from src.errors.data_transformation_errors import FeaturePipelineMismatchError
+
+
+@pytest.fixture(name="feature_pipeline")
+def fixture_feature_pipeline():
+    """
+    Fixture for a FeaturePipeline without an imputer.
+
+    Returns:
+        FeaturePipeline: The feature pipeline.
+    """
+    train_data = pd.DataFrame({"ph": np.linspace(6, 8, 20), "Temperatur": 20})
+    return FeaturePipeline(ReferenceProfile.from_data(train_data, []))
+
+
+def load_models(run_pipelines):
+    """
+    Loads the xgb and rf models from mocked MLFlow runs.
+
+    Args:
+        run_pipelines (dict): Run ID and feature pipeline of every model.
+
+    Returns:
+        Predictor: The loaded models.
+    """
+    run_ids = {name: run_id for name, (run_id, _) in run_pipelines.items()}
+    pipelines = dict(run_pipelines.values())
+
+    def get_latest_versions(name):
+        return [SimpleNamespace(run_id=run_ids[name])]
+
+    def get_run(_):
+        return SimpleNamespace(
+            data=SimpleNamespace(params={"weights": "{'xgb': 0.5, 'rf': 0.5}"})
+        )
+
+    with patch("mlflow.tracking.MlflowClient") as client, patch(
+        "mlflow.xgboost.load_model"
+    ), patch("mlflow.sklearn.load_model"), patch(
+        "src.components.model_loader.load_feature_pipeline",
+        side_effect=pipelines.get,
+    ) as load_feature_pipeline:
+        client.return_value.get_latest_versions.side_effect = get_latest_versions
+        client.return_value.get_run.side_effect = get_run
+        predictor = get_models()
+    assert load_feature_pipeline.call_count == len(pipelines), "Once per run"
+    return predictor
+
+
+def test_get_models(feature_pipeline):
+    """
+    Tests that the feature pipeline is loaded from every run of the models and
+    that runs with different feature pipelines are rejected.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The feature pipeline.
+    """
+    predictor = load_models(
+        {"xgb": ("run", feature_pipeline), "rf": ("run", feature_pipeline)}
+    )
+    assert predictor.feature_pipeline is feature_pipeline
+
+    predictor = load_models(
+        {"xgb": ("run", feature_pipeline), "rf": ("rerun", feature_pipeline)}
+    )
+    assert predictor.feature_pipeline is feature_pipeline
+
+    schema = feature_pipeline.reference_profile.schema
+    retrained_pipeline = FeaturePipeline(
+        dataclasses.replace(
+            feature_pipeline.reference_profile,
+            schema=SchemaFingerprint(schema.columns, ("float64", "float64")),
+        )
+    )
+    for rerun_pipeline in [
+        retrained_pipeline,
+        dataclasses.replace(feature_pipeline, version=0),
+        None,
+    ]:
+        with pytest.raises(FeaturePipelineMismatchError):
+            load_models(
+                {"xgb": ("run", feature_pipeline), "rf": ("rerun", rerun_pipeline)}
+            )
+
+
+def test_feature_pipeline_identity(feature_pipeline):
+    """
+    Tests that runs whose feature pipelines share the schema but differ in the
+    fitted imputer, the targets or the reference data are rejected.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The feature pipeline.
+    """
+    train_data = pd.DataFrame({"ph": np.linspace(6, 8, 20), "Temperatur": 20})
+    run_pipeline, rerun_pipeline = (
+        dataclasses.replace(
+            feature_pipeline,
+            imputer=create_imputer({"method": "median"}).fit(train_data),
+        )
+        for _ in range(2)
+    )
+    predictor = load_models(
+        {"xgb": ("run", run_pipeline), "rf": ("rerun", rerun_pipeline)}
+    )
+    assert predictor.feature_pipeline is run_pipeline, "Same fit, same pipeline"
+
+    other_imputer = create_imputer({"method": "median"}).fit(train_data + 1)
+    other_targets = dataclasses.replace(
+        feature_pipeline.reference_profile, target_columns=["Red KBE"]
+    )
+    other_data = dataclasses.replace(
+        feature_pipeline.reference_profile, signature="other"
+    )
+    for other_pipeline in [
+        dataclasses.replace(run_pipeline, imputer=other_imputer),
+        dataclasses.replace(run_pipeline, reference_profile=other_targets),
+        dataclasses.replace(run_pipeline, reference_profile=other_data),
+    ]:
+        assert other_pipeline.feature_columns == run_pipeline.feature_columns
+        with pytest.raises(FeaturePipelineMismatchError):
+            load_models({"xgb": ("run", run_pipeline), "rf": ("rerun", other_pipeline)})
@@ -0,0 +1,206 @@
+"""
+Test Prediction Pipeline.
+
+This module contains test cases for the feature pipeline mode
+of the prediction_pipeline flow.
+"""
+import dataclasses
+from contextlib import nullcontext
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from prefect.testing.utilities import prefect_test_harness
+
+from src.components import data_validation
+from src.components.feature_pipeline import FeaturePipeline
+from src.components.imputer import create_imputer
+from src.components.model_loader import Predictor
+from src.components.reference_profile import ReferenceProfile
+from src.errors.data_transformation_errors import MissingFeaturePipelineError
+from src.pipelines import prediction_pipeline
+from src.utility import get_cfg
+
+
+@pytest.fixture(name="prefect_harness", scope="module", autouse=True)
+def fixture_prefect_harness():
+    """
+    Fixture that runs the flows against a temporary Prefect database.
+    """
+    with prefect_test_harness():
+        yield
+
+
+@pytest.fixture(name="feature_pipeline")
+def fixture_feature_pipeline():
+    """
+    Fixture for a FeaturePipeline fitted on small training data.
+
+    Returns:
+        FeaturePipeline: The fitted feature pipeline.
+    """
+    rng = np.random.default_rng(0)
+    train_data = pd.DataFrame(
+        {
+            "ph": rng.normal(7, 1, size=200),
+            "Temperatur": rng.integers(20, 90, size=200),
+        }
+    )
+    profile = dataclasses.replace(
+        ReferenceProfile.from_data(train_data, []),
+        target_columns=["Red KBE", "Energie"],
+    )
+    return FeaturePipeline(
+        profile, create_imputer({"method": "median"}).fit(train_data)
+    )
+
+
+@pytest.fixture(name="pred_data")
+def fixture_pred_data():
+    """
+    Fixture for downcast prediction data with an extra column and NaN values,
+    without duplicated feature rows.
+
+    Returns:
+        pandas.DataFrame: The prediction data.
+    """
+    rng = np.random.default_rng(1)
+    pred_data = pd.DataFrame(
+        {
+            "id": np.arange(200),
+            "Temperatur": rng.permutation(200).astype(np.int32),
+            "ph": rng.normal(7, 1, size=200).astype(np.float32),
+        }
+    )
+    pred_data.loc[:9, "ph"] = np.nan
+    return pred_data
+
+
+def run_pipeline(loaded_model, pred_data, claim_batch_size=None):
+    """
+    Runs the prediction pipeline in feature pipeline mode with mocked tables.
+
+    Args:
+        loaded_model (Predictor): The model returned by the model registry.
+        pred_data (pandas.DataFrame): The content of the prediction table.
+        claim_batch_size (int, optional): Size of the claimed batches, None to
+            read the whole table.
+
+    Returns:
+        MagicMock: The mocked DataIngestion class.
+    """
+    config = get_cfg("test/integration/test_prediction_pipeline.yaml")
+    config["use_feature_pipeline"] = True
+    config["claim_batch_size"] = claim_batch_size
+    reference_read = AssertionError("the reference should not be read")
+    batches = iter(
+        [
+            pred_data.iloc[start : start + claim_batch_size]
+            for start in range(0, len(pred_data), claim_batch_size)
+        ]
+        + [pred_data.head(0)]
+        if claim_batch_size
+        else []
+    )
+
+    with patch.object(
+        prediction_pipeline, "get_models", return_value=loaded_model
+    ), patch.object(
+        prediction_pipeline.AsyncDataIngestion,
+        "get_sql_table",
+        AsyncMock(return_value=pred_data),
+    ), patch.object(
+        prediction_pipeline, "load_reference_data", side_effect=reference_read
+    ), patch.object(
+        prediction_pipeline, "load_stored_profile", side_effect=reference_read
+    ), patch.object(
+        prediction_pipeline, "DataIngestion"
+    ) as data_ingestion:
+        data_ingestion.return_value.claim_data.side_effect = lambda *_: nullcontext(
+            (next(batches), None)
+        )
+        prediction_pipeline.prediction_pipeline(config)
+    return data_ingestion
+
+
+def test_feature_pipeline_mode(feature_pipeline, pred_data):
+    """
+    Tests that the prediction data is prepared with the feature pipeline
+    logged with the models and that the predictions are written.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The fitted feature pipeline.
+        pred_data (pandas.DataFrame): The prediction data.
+    """
+    model = MagicMock()
+    model.predict.side_effect = lambda data: np.ones((len(data), 2))
+    loaded_model = Predictor({"xgb": model}, {"xgb": 1.0}, feature_pipeline)
+
+    data_ingestion = run_pipeline(loaded_model, pred_data)
+
+    model_input = model.predict.call_args.args[0]
+    assert model_input.columns.tolist() == feature_pipeline.feature_columns
+    assert not model_input.isna().any().any(), "NaN should be imputed"
+    np.testing.assert_array_equal(
+        model_input["ph"].iloc[:10], feature_pipeline.imputer.medians[0]
+    )
+
+    written = data_ingestion.return_value.bulk_write_data.call_args.args[0]
+    assert written.columns.tolist() == pred_data.columns.tolist() + [
+        "Red KBE",
+        "Energie",
+    ]
+    assert len(written) == len(pred_data)
+    data_ingestion.return_value.delete_data.assert_called_once_with("predict_data_test")
+
+
+def test_missing_feature_pipeline(pred_data):
+    """
+    Tests that models without a feature pipeline are rejected in feature
+    pipeline mode.
+
+    Args:
+        pred_data (pandas.DataFrame): The prediction data.
+    """
+    loaded_model = Predictor({"xgb": MagicMock()}, {"xgb": 1.0})
+    with pytest.raises(MissingFeaturePipelineError):
+        run_pipeline(loaded_model, pred_data)
+
+
+def test_timestamp_rule(feature_pipeline, pred_data):
+    """
+    Tests that the rules are checked on the ingested batches, so a timestamp
+    rule can run although the timestamp is not a feature, that the rules of
+    the training data are skipped and that the order is checked across batches.
+
+    Args:
+        feature_pipeline (FeaturePipeline): The fitted feature pipeline.
+        pred_data (pandas.DataFrame): The prediction data.
+    """
+    model = MagicMock()
+    model.predict.side_effect = lambda data: np.ones((len(data), 2))
+    loaded_model = Predictor({"xgb": model}, {"xgb": 1.0}, feature_pipeline)
+    pred_data["timestamp"] = pd.date_range(
+        "2024-01-01", periods=len(pred_data), freq="min"
+    )
+    pred_data.loc[100, "timestamp"] = pred_data.loc[0, "timestamp"]
+
+    validation_config = get_cfg("components/data_validation.yaml")
+    validation_config["rules"] = [
+        {"kind": "monotonic", "column": "timestamp", "scope": "predict"},
+        {"kind": "range", "column": "Red KBE", "min": 0, "scope": "train"},
+    ]
+    with patch.object(
+        data_validation, "get_cfg", return_value=validation_config
+    ), pytest.warns(UserWarning) as record:
+        data_ingestion = run_pipeline(loaded_model, pred_data, claim_batch_size=100)
+
+    rule_warnings = [
+        str(warning.message) for warning in record if "Rule" in str(warning.message)
+    ]
+    assert rule_warnings == [
+        "Rule monotonic:timestamp violated by 1 rows. Proceeding..."
+    ], "The first row of the second batch should violate the rule"
+    assert data_ingestion.return_value.bulk_write_data.call_count == 2
+    data_ingestion.return_value.delete_data.assert_not_called()
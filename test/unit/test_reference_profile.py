@@ -0,0 +1,110 @@
+"""
+Test Reference Profile.
+
+This module contains test cases for the ReferenceProfile class
+from the reference_profile module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import kruskal, ks_2samp
+
+from src.components.reference_profile import (
+    MAX_EXACT_KS_SIZE,
+    ReferenceProfile,
+    SchemaFingerprint,
+)
+
+
+@pytest.mark.parametrize("n_reference", [500, MAX_EXACT_KS_SIZE + 5000])
+def test_profile_tests_match_scipy(n_reference):
+    """
+    Tests that the profile tests return the same results as scipy.
+
+    Args:
+        n_reference (int): Number of reference rows, for the exact and the
+            asymptotic KS regime.
+    """
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame(
+        {
+            "num": rng.normal(size=n_reference),
+            "tied": rng.integers(0, 20, size=n_reference),
+            "cat": rng.integers(0, 4, size=n_reference),
+        }
+    )
+    batch = pd.DataFrame(
+        {
+            "num": rng.normal(0.1, 1, size=300),
+            "tied": rng.integers(0, 22, size=300),
+            "cat": rng.integers(0, 5, size=300),
+        }
+    )
+    profile = ReferenceProfile.from_data(reference, ["cat"])
+
+    for column in ["num", "tied"]:
+        expected = ks_2samp(batch[column], reference[column])
+        np.testing.assert_allclose(
+            profile.ks_test(column, batch[column]),
+            (expected.statistic, expected.pvalue),
+            rtol=1e-12,
+        )
+
+    expected = kruskal(batch["cat"], reference["cat"])
+    np.testing.assert_allclose(
+        profile.kruskal_test("cat", batch["cat"]),
+        (expected.statistic, expected.pvalue),
+        rtol=1e-9,
+    )
+
+
+def test_kruskal_test_undefined():
+    """
+    Tests that the Kruskal-Wallis test returns NaN instead of raising when it
+    is undefined.
+    """
+    reference = pd.DataFrame({"cat": [1, 1, 1], "nan_cat": [1.0, np.nan, 2.0]})
+    profile = ReferenceProfile.from_data(reference, ["cat", "nan_cat"])
+
+    for column, values in [
+        ("cat", np.array([1, 1])),
+        ("cat", np.array([1.0, np.nan])),
+        ("cat", np.array([], dtype=int)),
+        ("nan_cat", np.array([1.0, 2.0])),
+    ]:
+        assert np.isnan(profile.kruskal_test(column, values)).all()
+
+
+def test_profile_signature():
+    """
+    Tests that the signature depends on the content and the schema of the data.
+    """
+    data = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [1, 2, 3]})
+    signature = ReferenceProfile.compute_signature(data, [])
+
+    assert signature == ReferenceProfile.compute_signature(data.copy(), [])
+    assert signature != ReferenceProfile.compute_signature(data.astype(float), [])
+    assert signature != ReferenceProfile.compute_signature(data.iloc[::-1], [])
+    assert signature != ReferenceProfile.compute_signature(data, ["b"])
+
+
+def test_schema_fingerprint():
+    """
+    Tests that the schema fingerprint describes every difference.
+    """
+    data = pd.DataFrame({"a": [1.0, 2.0], "b": [1, 2], "c": ["x", "y"]})
+    expected = SchemaFingerprint.from_data(data)
+
+    assert SchemaFingerprint.from_data(data.copy()) == expected
+    assert hash(SchemaFingerprint.from_data(data.copy())) == hash(expected)
+    assert not expected.diff(expected)
+
+    changed = data.drop(columns="c").assign(b=data["b"].astype(float), d=1)
+    assert SchemaFingerprint.from_data(changed).diff(expected) == [
+        "missing columns ['c']",
+        "unexpected columns ['d']",
+        "column b has dtype float64 instead of int64",
+    ]
+    assert SchemaFingerprint.from_data(data[["b", "a", "c"]]).diff(expected) == [
+        "columns are in a different order"
+    ]
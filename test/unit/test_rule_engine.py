@@ -0,0 +1,114 @@
+"""
+Test Rule Engine.
+
+This module contains test cases for the RuleEngine class
+from the rule_engine module.
+"""
+from test.test_utility import create_synthetic_data
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_validation import DataValidation
+from src.components.rule_engine import RuleEngine
+from src.errors.data_validation_errors import RuleColumnError, UnknownRuleError
+from src.utility import get_cfg
+
+
+def test_rules():
+    """
+    Tests that every rule kind finds exactly the violating rows.
+    """
+    data = pd.DataFrame(
+        {
+            "ph": [7.0, -1.0, 15.0, np.nan, 3.0],
+            "category": ["a", "b", "c", None, "a"],
+            "timestamp": pd.to_datetime(
+                ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-01", "2024-01-03"]
+            ),
+            "low": [1, 2, 3, 4, 5],
+            "high": [2, 2, 1, 5, 6],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+    engine = RuleEngine(
+        [
+            {"kind": "range", "column": "ph", "min": 0, "max": 14},
+            {"kind": "allowed", "column": "category", "values": ["a", "b"]},
+            {"kind": "monotonic", "column": "timestamp"},
+            {"kind": "monotonic", "column": "timestamp", "strict": True, "name": "ts"},
+            {"kind": "compare", "left": "low", "op": "<", "right": "high"},
+            {"kind": "compare", "left": "low", "op": "<=", "value": 4},
+        ]
+    )
+    result = engine.evaluate(data)
+
+    assert {rule: rows.tolist() for rule, rows in result.violations.items()} == {
+        "range:ph": [11, 12],
+        "allowed:category": [12],
+        "monotonic:timestamp": [13],
+        "ts": [12, 13],
+        "compare:low < high": [11, 12],
+        "compare:low <= 4": [14],
+    }
+    assert result.mask.tolist() == [False, True, True, True, True]
+
+    assert not RuleEngine(
+        [{"kind": "monotonic", "column": "timestamp", "strict": True}]
+    ).evaluate(data.head(1)), "First row violates no rule"
+
+    with pytest.raises(UnknownRuleError):
+        RuleEngine([{"kind": "regex", "column": "category"}])
+    with pytest.raises(UnknownRuleError):
+        RuleEngine([{"kind": "range", "column": "ph", "scope": "serve"}])
+    with pytest.raises(RuleColumnError):
+        RuleEngine([{"kind": "range", "column": "missing", "min": 0}]).evaluate(data)
+
+
+def test_rule_state_and_scope():
+    """
+    Tests that monotonic rules are checked across batches and that rules are
+    compiled for their scope only.
+    """
+    timestamps = pd.Series(
+        pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-02", "2024-01-04"])
+    )
+    engine = RuleEngine([{"kind": "monotonic", "column": "timestamp"}])
+    assert not engine.evaluate(timestamps.head(2).to_frame("timestamp"))
+    assert not engine.evaluate(timestamps.head(0).to_frame("timestamp"))
+    result = engine.evaluate(timestamps.tail(2).to_frame("timestamp"))
+    assert result.violations["monotonic:timestamp"].tolist() == [
+        2
+    ], "The first row of a batch should be compared to the previous batch"
+
+    rules_config = [
+        {"kind": "range", "column": "Red KBE", "min": 0, "scope": "train"},
+        {"kind": "monotonic", "column": "timestamp", "scope": "predict"},
+        {"kind": "range", "column": "ph", "min": 0},
+    ]
+    assert RuleEngine(rules_config, "train").columns == ["Red KBE", "ph"]
+    assert RuleEngine(rules_config, "predict").columns == ["timestamp", "ph"]
+    assert RuleEngine(rules_config).columns == ["Red KBE", "timestamp", "ph"]
+
+
+def test_rule_validation():
+    """
+    Tests the rule check of the DataValidation class.
+    """
+    data_validation_object = DataValidation()
+    data_validation_object.validation_config = get_cfg(
+        "test/unit/test_data_validation.yaml"
+    )
+    synthetic_data = create_synthetic_data()
+    column = synthetic_data.columns[0]
+    assert not data_validation_object.check_rules(synthetic_data)
+
+    data_validation_object.validation_config["rules"] = [
+        {"kind": "range", "column": column, "max": synthetic_data[column].median()}
+    ]
+    with pytest.warns(UserWarning, match=f"Rule range:{column} violated"):
+        result = data_validation_object.check_rules(synthetic_data)
+    assert result.violations[f"range:{column}"].equals(
+        synthetic_data.index[synthetic_data[column] > synthetic_data[column].median()]
+    )
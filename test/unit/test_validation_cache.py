@@ -0,0 +1,68 @@
+"""
+Test Validation Cache.
+
+This module contains test cases for the ValidationCache class
+from the validation_cache module.
+"""
+from test.test_utility import create_nan_data, create_synthetic_data
+
+import pandas as pd
+import pytest
+
+from src.components.reference_profile import hash_data
+from src.components.validation_cache import ValidationCache
+from src.utility import get_cfg
+
+
+@pytest.fixture(name="validation_cache")
+def fixture_validation_cache(tmp_path):
+    """
+    Fixture for ValidationCache Object.
+
+    This fixture creates and returns an instance of the ValidationCache class
+    with the test validation config and a temporary cache folder.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the cache.
+
+    Returns:
+        ValidationCache: An instance of the ValidationCache class.
+    """
+    validation_cache = ValidationCache()
+    validation_cache.data_validation.validation_config = get_cfg(
+        "test/unit/test_data_validation.yaml"
+    )
+    validation_cache.folder = tmp_path
+    return validation_cache
+
+
+def test_validation_cache(validation_cache, tmp_path):
+    """
+    Tests that identical data is validated and cleaned once.
+
+    Args:
+        validation_cache (ValidationCache): An instance of the ValidationCache class.
+        tmp_path (pathlib.Path): Temporary directory for the cache.
+    """
+    hits, misses = ValidationCache.stats.hits, ValidationCache.stats.misses
+    nan_data = create_nan_data()
+
+    cleaned, cleaned_digest = validation_cache.validate_reference_data(nan_data.copy())
+    assert not cleaned.isna().any().any(), "NaN should be imputed"
+    assert cleaned_digest == hash_data(cleaned)
+    cached, cached_digest = validation_cache.validate_reference_data(nan_data.copy())
+    pd.testing.assert_frame_equal(cached, cleaned)
+    assert cached_digest == cleaned_digest
+
+    clean_data = create_synthetic_data()
+    validated, digest = validation_cache.validate_reference_data(clean_data)
+    assert validated is clean_data
+    assert digest == hash_data(clean_data)
+
+    assert ValidationCache.stats.hits - hits == 1
+    assert ValidationCache.stats.misses - misses == 2
+    assert len(list(tmp_path.iterdir())) == 2, "One entry per dataset"
+
+    validation_cache.data_validation.validation_config["max_cached_validations"] = 1
+    validation_cache.validate_reference_data(clean_data.head(100))
+    assert len(list(tmp_path.iterdir())) == 1, "Old entries should be pruned"